@@ -0,0 +1,220 @@
+"""
+Création automatique des événements
+===================================
+
+Modèles déclaratifs d'événements hebdomadaires (EVENT_TEMPLATES_FILE) et
+création, correction ou suppression de leurs occurrences sur les N prochaines
+semaines (AUTO_CREATE_WEEKS). Chaque occurrence est suivie par l'ID de
+l'événement créé, conservé sur disque (AUTO_CREATE_FILE).
+"""
+
+import asyncio
+import json
+import logging
+import os
+from collections import Counter
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+
+@dataclass
+class EventTemplate:
+    """Événement programmé hebdomadaire créé par le bot (définition déclarative)"""
+    kind: str
+    name: str
+    weekday: int
+    time: Tuple[int, int]
+    duration: timedelta
+    location: str
+    description: str = ""
+    # Identifiant stable du modèle (défaut : le nom) ; renseigné, il permet de renommer ou de
+    # déplacer le modèle en modifiant ses événements existants plutôt qu'en créant de nouveaux
+    id: str = ""
+    
+    def __post_init__(self):
+        if not self.id:
+            self.id = self.name
+    
+    def start_in_week(self, week_start: datetime) -> datetime:
+        """Début de l'occurrence dans la semaine commençant à `week_start` (lundi 00:00, heure locale)"""
+        day = week_start + timedelta(days=self.weekday)
+        return day.replace(hour=self.time[0], minute=self.time[1], second=0, microsecond=0)
+    
+    def key(self, start: datetime) -> str:
+        """Identifiant stable d'une occurrence : modèle et semaine (lundi), indépendant du nom et du jour"""
+        return occurrence_key(self.id, start.date() - timedelta(days=start.weekday()))
+
+
+def occurrence_key(template_id: str, week: date) -> str:
+    return f"{template_id}|{week.isoformat()}"
+
+
+class EventAutoCreator:
+    """Crée et tient à jour les événements programmés des N prochaines semaines à partir des modèles
+
+    Chaque occurrence (ID du modèle, semaine) est associée à l'ID de l'événement créé, conservé
+    sur disque : une occurrence n'est créée qu'une fois, n'est modifiée que si sa définition change
+    (y compris son nom ou son jour), et un événement supprimé à la main n'est pas recréé. Les
+    événements d'un modèle retiré ou d'un créneau disparu sont supprimés. Les liens sont construits
+    depuis ces IDs.
+
+    `bot` est l'EventBot (serveur principal, gestionnaire d'événements, état et droit d'écriture).
+    """
+    
+    def __init__(self, bot: Any, templates: List[EventTemplate], weeks: int, concurrency: int,
+                 path: str, logger: logging.Logger):
+        self.bot = bot
+        self.templates = templates
+        self.weeks = weeks
+        self.path = path
+        self.logger = logger
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._templates_by_id = {template.id: template for template in templates}
+        # Clé d'occurrence -> ID de l'événement créé
+        self.created: Dict[str, int] = {}
+        self.stats: Counter = Counter()
+    
+    def load(self) -> None:
+        try:
+            with open(self.path, encoding='utf-8') as created_file:
+                created = {key: int(event_id) for key, event_id in json.load(created_file).items()}
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            self.logger.error(f"Erreur lecture des événements créés: {e}")
+            return
+        # Ancien format "nom|date" : converti en (ID du modèle, semaine)
+        ids_by_name = {template.name: template.id for template in self.templates}
+        for key, event_id in created.items():
+            template_id, day = key.rsplit('|', 1)
+            day = date.fromisoformat(day)
+            if template_id not in self._templates_by_id and template_id in ids_by_name:
+                template_id = ids_by_name[template_id]
+            self.created[occurrence_key(template_id, day - timedelta(days=day.weekday()))] = event_id
+    
+    def save(self) -> None:
+        try:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as created_file:
+                json.dump(self.created, created_file)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            self.logger.error(f"Erreur sauvegarde des événements créés: {e}")
+    
+    def occurrences(self, now: datetime) -> List[Tuple[EventTemplate, datetime]]:
+        """Occurrences à venir des N prochaines semaines (semaine courante comprise)"""
+        week_start = (now - timedelta(days=now.weekday())).replace(hour=0, minute=0, second=0, microsecond=0)
+        result = []
+        for week in range(self.weeks):
+            for template in self.templates:
+                start = template.start_in_week(week_start + timedelta(weeks=week))
+                if start > now:
+                    result.append((template, start))
+        return result
+    
+    @staticmethod
+    def _changes(template: EventTemplate, start: datetime, event: Dict[str, Any]) -> Dict[str, Any]:
+        """Champs à modifier pour aligner l'événement existant sur sa définition"""
+        desired = {
+            'name': template.name,
+            'start_time': start,
+            'end_time': start + template.duration,
+            'location': template.location,
+            'description': template.description,
+        }
+        # Discord renvoie None pour un lieu ou une description vides
+        return {field: value for field, value in desired.items() if (event.get(field) or None) != (value or None)}
+    
+    async def sync(self, existing: Dict[int, Dict], now: datetime) -> Counter:
+        """Crée les occurrences manquantes, corrige celles dont la définition a changé et supprime
+        celles dont le modèle ou le créneau n'existe plus (appels bornés)
+
+        `existing` est le cache des événements indexé par ID : les occurrences d'un même modèle
+        portent le même nom.
+        """
+        guild = self.bot.primary_guild()
+        if not self.bot.write_allowed():
+            return Counter()
+        if guild is None:
+            self.logger.error("Aucun serveur pour la création des événements")
+            return Counter()
+        by_id = existing
+        by_occurrence = {(event['name'], event['start_time']): event for event in existing.values()}
+        
+        async def _sync_one(template: EventTemplate, start: datetime) -> str:
+            key = template.key(start)
+            event_id = self.created.get(key)
+            event = by_id.get(event_id) if event_id else by_occurrence.get((template.name, start))
+            if event is None and event_id is not None:
+                # Supprimé ou annulé par un administrateur : la décision est respectée
+                return 'skipped'
+            async with self._semaphore:
+                if event is None:
+                    event = await self.bot.event_manager.create_event(guild, template, start)
+                    outcome = 'created'
+                else:
+                    changes = self._changes(template, start, event)
+                    if not changes:
+                        outcome = 'unchanged'
+                    else:
+                        event = await self.bot.event_manager.edit_event(guild, event['id'], changes)
+                        outcome = 'updated'
+            if event is None:
+                return 'failed'
+            self.created[key] = event['id']
+            return outcome
+        
+        async def _remove_one(key: str, event: Dict) -> str:
+            async with self._semaphore:
+                removed = await self.bot.event_manager.delete_event(guild, event['id'])
+            if not removed:
+                return 'failed'
+            del self.created[key]
+            return 'removed'
+        
+        wanted = {template.key(start): (template, start) for template, start in self.occurrences(now)}
+        outcomes = Counter(await asyncio.gather(*(
+            _sync_one(template, start) for template, start in wanted.values()
+        )))
+        
+        # Suivis hors de la liste voulue : modèle retiré, jour déplacé avant maintenant, horizon réduit
+        this_week = (now.date() - timedelta(days=now.weekday())).isoformat()
+        stale = []
+        for key, event_id in list(self.created.items()):
+            if key in wanted:
+                continue
+            event = by_id.get(event_id)
+            if event is not None and event['start_time'] > now:
+                stale.append((key, event))
+            elif event is None or key.rsplit('|', 1)[1] < this_week:
+                # Supprimé, ou semaine terminée : plus de suivi nécessaire
+                del self.created[key]
+        outcomes.update(await asyncio.gather(*(_remove_one(key, event) for key, event in stale)))
+        self.save()
+        self.stats.update(outcomes)
+        if outcomes['created'] or outcomes['updated'] or outcomes['removed'] or outcomes['failed']:
+            self.bot.state.touch()
+            self.logger.info(f"Événements programmés: {dict(outcomes)}")
+        return outcomes
+    
+    def kinds(self) -> Set[str]:
+        return {template.kind for template in self.templates}
+    
+    def selection(self, events: Iterable[Dict], start: datetime, end: datetime) -> Dict[str, List[Dict]]:
+        """Événements créés par type sur [start, end), retrouvés par leur ID : aucune recherche par nom"""
+        by_id = {event['id']: event for event in events}
+        selected: Dict[str, List[Dict]] = {kind: [] for kind in self.kinds()}
+        for key, event_id in self.created.items():
+            event = by_id.get(event_id)
+            template = self._templates_by_id.get(key.rsplit('|', 1)[0])
+            if event is not None and template is not None and start <= event['start_time'] < end:
+                selected[template.kind].append(event)
+        for kind_events in selected.values():
+            kind_events.sort(key=lambda event: event['start_time'])
+        return selected
+    
+    def describe(self) -> str:
+        return (f"{len(self.templates)} modèle(s) sur {self.weeks} semaine(s), {len(self.created)} suivi(s) — "
+                f"{self.stats['created']} créé(s), {self.stats['updated']} modifié(s), "
+                f"{self.stats['removed']} supprimé(s)")
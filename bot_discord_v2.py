@@ -11,18 +11,47 @@ License: MIT
 """
 
 import asyncio
+import contextlib
+import contextvars
+import gzip
+import hashlib
+import json
 import logging
 import os
-from datetime import datetime, timedelta
+import re
+import signal
+import socket
+import time
+from collections import Counter, deque
+from datetime import date, datetime, timedelta, timezone, tzinfo
 from enum import Enum
-from typing import Dict, List, Optional, Union
+from types import SimpleNamespace
+from urllib.parse import urlsplit
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Literal, Optional, Set, Tuple, Union
 from dataclasses import dataclass
 
+import aiohttp
 import discord
+from aiohttp import web
+from discord import app_commands
 from discord.ext import commands, tasks
 from dotenv import load_dotenv
 from zoneinfo import ZoneInfo
 
+from auto_events import EventAutoCreator, EventTemplate
+from deadline_queue import DeadlineQueue
+from event_archive import EventArchive
+from event_recurrence import OccurrenceCache, next_occurrence, rule_from_event
+from event_search import EventSearchIndex
+from job_queue import JobQueueClient, JobQueueServer
+from leader_lease import LeaderLease
+from loop_profiler import EventLoopProfiler
+from memory_guard import MemoryGuard
+from resilience import CircuitBreaker, RetryPolicy, TokenBucket
+from status_dashboard import StatusDashboard
+from calendar_feed import CalendarFeed
+from timezone_renderer import TimezoneRenderer
+
 # ======================== CONFIGURATION ET CONSTANTES ========================
 
 class EventType(Enum):
@@ -52,27 +81,242 @@ class BotConfiguration:
     timezone: str = "Europe/Paris"
     weekly_update_day: int = 0  # Lundi
     
-    # Templates de messages
-    boss_template: str = """Présence pour l'événement Boss du weekend (samedi et dimanche) à 21h00 (heure de Paris) - 15h00 (heure du Québec).
+    # Fuseaux d'affichage des horaires : (libellé, fuseau IANA)
+    display_timezones: List[Tuple[str, str]] = None
+    # Heure du Donjon Party (pas d'événement programmé associé)
+    poll_event_time: Tuple[int, int] = (21, 0)
+    
+    # Templates de messages ({times} : horaire rendu dans chaque fuseau d'affichage)
+    boss_template: str = """Présence pour l'événement Boss du weekend (samedi et dimanche) à {times}.
 Merci de venir 15 minutes avant l'événement.
 {boss_links}"""
     
-    siege_template: str = """Présence pour le siège du donjon de la Grotte de Cristal le dimanche à 15h00 (heure de Paris) - 9h00 (heure du Québec).
+    siege_template: str = """Présence pour le siège du donjon de la Grotte de Cristal le dimanche à {times}.
 Merci de venir 15 minutes avant l'événement.
 {siege_links}"""
     
-    poll_question: str = "Présence pour le 👥Donjon Party👥 du soir à 21h (heure de Paris) - 15h (heure du Québec)."
+    poll_question: str = "Présence pour le 👥Donjon Party👥 du soir à {times}."
     notification_message: str = "⬆️⬆️⬆️⬆️⬆️⬆️⬆️⬆️@everyone⬆️⬆️⬆️⬆️⬆️⬆️⬆️⬆️"
     
     # Filtres d'événements
     boss_keywords: List[str] = None
     siege_keywords: List[str] = None
+    # Types d'événements supplémentaires (EVENT_KINDS_FILE), en plus de boss et siege
+    extra_kinds: List['EventKind'] = None
+    # Événements programmés créés par le bot (EVENT_TEMPLATES_FILE) sur les N prochaines semaines
+    event_templates: List['EventTemplate'] = None
+    auto_create_weeks: int = 2
+    auto_create_file: str = "/home/discord/discord-bot-created-events.json"
+    
+    # Groupes de canaux (diffusion multi-canaux)
+    dp_channels: List[int] = None
+    boss_channels: List[int] = None
+    siege_channels: List[int] = None
+    fanout_concurrency: int = 5
+    
+    # Résilience des appels REST (retries et disjoncteur)
+    retry_max_attempts: int = 4
+    retry_base_delay: float = 0.5
+    retry_max_delay: float = 8.0
+    breaker_failure_threshold: int = 5
+    breaker_reset_timeout: float = 60.0
+    
+    # Enregistrement / rejeu du trafic Discord ("record", "replay" ou vide)
+    cassette_mode: str = ""
+    cassette_path: str = "discord-cassette.jsonl.gz"
+    cassette_speed: float = 1.0
+    
+    # Persistance de l'état et arrêt gracieux
+    state_file: str = "/home/discord/discord-bot-state.json"
+    shutdown_drain_timeout: float = 25.0
+    
+    # Tableau de bord HTTP local (désactivé si le port vaut 0)
+    dashboard_host: str = "127.0.0.1"
+    dashboard_port: int = 0
+    # URL publique du flux iCal (proxy inverse) ; par défaut l'adresse du serveur local
+    calendar_url: str = ""
+    
+    # Commandes slash (le préfixe "!" exige l'intent privilégié message_content)
+    prefix_commands: bool = False
+    command_guild_id: int = 0
+    command_sync_file: str = "/home/discord/discord-bot-commands.sha256"
+    
+    # Mode de présence du Donjon Party : "poll" (sondage Discord) ou "buttons" (boutons persistants)
+    attendance_mode: str = "poll"
+    attendance_roles: List[str] = None
+    attendance_file: str = "/home/discord/discord-bot-attendance.json"
+    # Fenêtre de regroupement des écritures disque et des mises à jour du message
+    attendance_flush_delay: float = 2.0
+    
+    # Rappels en message privé aux membres ayant répondu "Oui" (0 = désactivés)
+    reminder_minutes: int = 0
+    reminder_message: str = "🔔 Rappel : le 👥Donjon Party👥 commence à {times}. À tout à l'heure !"
+    reminder_workers: int = 4
+    reminder_rate: float = 2.0  # messages privés par seconde, tous envois confondus
+    reminder_journal: str = "/home/discord/discord-bot-reminders.json"
+    
+    # Profilage de la boucle d'événements (fichiers au format "folded" des flamegraphs)
+    profile_dir: str = "/home/discord/profiles"
+    profile_on_start: float = 0.0  # durée en secondes, 0 = pas de profilage au démarrage
+    profile_interval_ms: float = 5.0
+    slow_callback_ms: float = 100.0
+    
+    # Surveillance mémoire (0 = désactivée) et budget RSS (0 = sans limite)
+    memory_guard_minutes: int = 0
+    memory_budget_mb: int = 0
+    
+    # Haute disponibilité : fichier SQLite partagé du bail de leader (vide = instance unique)
+    ha_lease_file: str = ""
+    ha_lease_ttl: float = 10.0
+    
+    # Topologie : "" (processus unique), "gateway" (connexion Discord) ou "worker" (travaux, REST seul)
+    process_role: str = ""
+    ipc_socket: str = "/home/discord/discord-bot-jobs.sock"
+    worker_concurrency: int = 4
+    # Planificateur exécuté par ce worker : un seul worker doit l'activer (toujours actif en mode HA,
+    # où le bail désigne le worker qui exécute les travaux)
+    worker_scheduler: bool = False
+    
+    # Archive en ajout seul des versions des événements (vide = désactivée)
+    archive_file: str = "/home/discord/discord-bot-events.jsonl"
+    archive_retention_days: int = 90
+    
+    # Fenêtre de regroupement des modifications d'événements avant réconciliation des liens
+    reconcile_debounce: float = 5.0
+    
+    # Notifications N minutes avant le début de chaque événement (None = créneaux fixes des types)
+    event_notify_offset: Optional[int] = None
     
     def __post_init__(self):
         if self.boss_keywords is None:
             self.boss_keywords = ["boss", "samedi", "dimanche"]
         if self.siege_keywords is None:
             self.siege_keywords = ["siège", "grotte", "cristal"]
+        if self.attendance_roles is None:
+            self.attendance_roles = []
+        if self.extra_kinds is None:
+            self.extra_kinds = []
+        if self.event_templates is None:
+            self.event_templates = []
+        if not self.display_timezones:
+            self.display_timezones = [("heure de Paris", "Europe/Paris"),
+                                      ("heure du Québec", "America/Toronto")]
+        # Par défaut, chaque groupe ne contient que le canal principal
+        if not self.dp_channels:
+            self.dp_channels = [self.channel_dp]
+        if not self.boss_channels:
+            self.boss_channels = [self.channel_boss]
+        if not self.siege_channels:
+            self.siege_channels = [self.channel_siege]
+    
+    def channels_for(self, event_type: EventType) -> List[int]:
+        """Retourne le groupe de canaux associé à un type d'événement"""
+        groups = {
+            EventType.BOSS: self.boss_channels,
+            EventType.SIEGE: self.siege_channels,
+            EventType.POLL: self.dp_channels,
+        }
+        return groups[event_type]
+    
+    def event_kinds(self) -> List['EventKind']:
+        """Types d'événements publiés : boss et siege, puis les types déclarés en configuration"""
+        return [
+            EventKind(EventType.BOSS.value, [5, 6], self.boss_keywords, self.boss_template,
+                      self.boss_channels, TimeSlot.BOSS_NOTIFICATION.value,
+                      marker="Présence pour l'événement Boss", group_by_day=True),
+            EventKind(EventType.SIEGE.value, [6], self.siege_keywords, self.siege_template,
+                      self.siege_channels, TimeSlot.SIEGE_NOTIFICATION.value,
+                      marker="Présence pour le siège"),
+        ] + self.extra_kinds
+
+@dataclass
+class EventKind:
+    """Type d'événement récurrent : règles de classement, message de liens, canaux et notification"""
+    name: str
+    weekdays: List[int]
+    keywords: List[str]
+    # {links} (ou {<nom>_links}) : liens des événements ; {times} : horaire rendu
+    template: str
+    channels: List[int]
+    notification_slot: Optional[Tuple[int, int]] = None
+    # Texte identifiant les messages de liens lors de la récupération (défaut : début du template)
+    marker: str = ""
+    # True : un message par jour, le premier avec le texte complet ; False : un message par événement
+    group_by_day: bool = False
+    
+    def __post_init__(self):
+        if not self.marker:
+            self.marker = self.template.split('{', 1)[0].strip()
+    
+    def format(self, links: str, times: str) -> str:
+        return self.template.format(links=links, times=times, **{f"{self.name}_links": links})
+    
+    def notification_marker(self, channel_id: int, day: date) -> str:
+        """Dernière ligne (texte discret) d'une notification : propre au type, au canal et au jour,
+        les types qui partagent un canal ne récupèrent pas les notifications des autres"""
+        return f"-# notif:{self.name}:{channel_id}:{day.isoformat()}"
+    
+    def owns_notification(self, content: str, channel_id: int) -> bool:
+        """Vrai si le message est une notification de ce type dans ce canal (quel que soit le jour)"""
+        return f"-# notif:{self.name}:{channel_id}:" in content
+
+class EventKindRegistry:
+    """Registre des types d'événements ; classe tous les événements en une seule passe"""
+    
+    def __init__(self, kinds: List[EventKind]):
+        self.kinds: Dict[str, EventKind] = {kind.name: kind for kind in kinds}
+        # Jour -> expression unique couvrant les mots-clés de tous les types de ce jour
+        self._patterns: Dict[int, re.Pattern] = {}
+        # Jour -> mot-clé -> types concernés (y compris ceux des mots-clés qui en sont des préfixes)
+        self._keyword_kinds: Dict[int, Dict[str, Set[str]]] = {}
+        
+        for weekday in range(7):
+            owners: Dict[str, Set[str]] = {}
+            for kind in kinds:
+                if weekday in kind.weekdays:
+                    for keyword in kind.keywords:
+                        owners.setdefault(keyword.lower(), set()).add(kind.name)
+            if not owners:
+                continue
+            # L'alternative la plus longue l'emporte à une position donnée : les mots-clés plus
+            # courts qui y commencent en sont des préfixes et leurs types sont ajoutés d'office
+            self._keyword_kinds[weekday] = {
+                keyword: set().union(*(kinds_ for other, kinds_ in owners.items() if keyword.startswith(other)))
+                for keyword in owners
+            }
+            alternatives = "|".join(re.escape(keyword) for keyword in sorted(owners, key=len, reverse=True))
+            self._patterns[weekday] = re.compile(f"(?=({alternatives}))")
+    
+    def __iter__(self):
+        return iter(self.kinds.values())
+    
+    def __contains__(self, name: str) -> bool:
+        return name in self.kinds
+    
+    def __getitem__(self, name: str) -> EventKind:
+        return self.kinds[name]
+    
+    def names(self) -> List[str]:
+        return list(self.kinds)
+    
+    def classify(self, events: Iterable[Dict]) -> Dict[str, List[Dict]]:
+        """Répartit les événements par type (jour de la semaine et mots-clés du nom)"""
+        selected: Dict[str, List[Dict]] = {name: [] for name in self.kinds}
+        for event_data in events:
+            start_time = event_data.get('start_time')
+            if not start_time:
+                continue
+            weekday = start_time.weekday()
+            pattern = self._patterns.get(weekday)
+            if pattern is None:
+                continue
+            
+            matched: Set[str] = set()
+            for match in pattern.finditer(event_data.get('name', '').lower()):
+                matched |= self._keyword_kinds[weekday][match.group(1)]
+            for name in matched:
+                selected[name].append(event_data)
+        return selected
 
 class LoggerManager:
     """Gestionnaire de logging centralisé"""
@@ -112,56 +356,402 @@ class MessageState:
             self.event_messages = []
         if not hasattr(self, 'notification_messages'):
             self.notification_messages = []
+    
+    def message_ids_by_channel(self) -> Dict[int, List[int]]:
+        """Regroupe les IDs des messages suivis par canal"""
+        by_channel: Dict[int, List[int]] = {}
+        for msg in self.event_messages + self.notification_messages:
+            by_channel.setdefault(msg.channel.id, []).append(msg.id)
+        return by_channel
+
+@dataclass
+class FanOutResult:
+    """Résultat d'un envoi pour un canal d'un groupe"""
+    channel_id: int
+    message: Optional[discord.Message] = None
+    error: Optional[str] = None
+    
+    @property
+    def ok(self) -> bool:
+        return self.message is not None
+    
+    @property
+    def message_id(self) -> Optional[int]:
+        return self.message.id if self.message else None
+
+@dataclass
+class StagedUpdate:
+    """Messages de liens de la semaine suivante, préparés avant l'échéance du lundi"""
+    week_start: datetime
+    contents: Dict[str, List[str]]
+    event_names: Dict[str, List[str]]
+    prepared_at: datetime
+    
+    def describe(self) -> str:
+        """Aperçu lisible pour !status"""
+        parts = [
+            f"{kind}: {len(contents)} msg ({len(self.event_names[kind])} événement(s))"
+            for kind, contents in self.contents.items()
+        ]
+        return (f"{self.week_start.strftime('%d/%m %H:%M')} — {', '.join(parts)} "
+                f"(préparée à {self.prepared_at.strftime('%H:%M')})")
 
 class BotState:
     """Gestionnaire d'état centralisé du bot"""
     
     def __init__(self):
-        # Messages de sondages
-        self.poll_message: Optional[discord.Message] = None
-        self.text_message: Optional[discord.Message] = None
+        # Messages de sondages (un par canal du groupe DP)
+        self.poll_messages: Dict[int, discord.Message] = {}
+        self.text_messages: Dict[int, discord.Message] = {}
         
-        # Messages par type d'événement
-        self.boss_state = MessageState([], [])
-        self.siege_state = MessageState([], [])
+        # Messages par type d'événement (nom du type -> état)
+        self.kind_states: Dict[str, MessageState] = {}
         
-        # Tracking des exécutions
+        # Tracking des exécutions ('<type>_event' pour les notifications)
         self.last_executions: Dict[str, Optional[Union[datetime, datetime.date]]] = {
             'poll_creation': None,
             'poll_deletion': None,
-            'boss_event': None,
-            'siege_event': None,
             'weekly_update': None
         }
         
-        # Cache des événements
-        self.cached_events: Dict[str, Dict] = {}
+        # Cache des événements, indexé par ID (les occurrences d'un modèle partagent le même nom)
+        self.cached_events: Dict[int, Dict] = {}
+        
+        # Version incrémentée à chaque modification (instantanés et caches de rendu)
+        self.version = 0
+        self.events_version = 0
+    
+    def touch(self) -> None:
+        """Signale une modification de l'état"""
+        self.version += 1
+    
+    def kind_state(self, kind: str) -> MessageState:
+        """État des messages d'un type d'événement (créé à la première utilisation)"""
+        state = self.kind_states.get(kind)
+        if state is None:
+            state = self.kind_states[kind] = MessageState([], [])
+        return state
+    
+    def set_cached_events(self, events: Dict[int, Dict]) -> None:
+        """Remplace le cache des événements"""
+        self.cached_events = events
+        self.events_version += 1
+        self.touch()
+    
+    def events_by_name(self) -> Dict[str, Dict]:
+        """Événements en cache par nom ; pour un nom partagé par plusieurs occurrences, la plus proche"""
+        by_name: Dict[str, Dict] = {}
+        for event in self.cached_events.values():
+            current = by_name.get(event['name'])
+            if current is None or event['start_time'] < current['start_time']:
+                by_name[event['name']] = event
+        return by_name
     
     def update_last_execution(self, action: str, timestamp: Union[datetime, datetime.date]) -> None:
         """Met à jour le timestamp d'une action"""
         self.last_executions[action] = timestamp
+        self.touch()
     
     def get_last_execution(self, action: str) -> Optional[Union[datetime, datetime.date]]:
         """Récupère le timestamp d'une action"""
         return self.last_executions.get(action)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Sérialise l'état persistant (exécutions et IDs des messages suivis)"""
+        def _ids(messages: List[discord.Message]) -> List[Tuple[int, int]]:
+            return [(msg.channel.id, msg.id) for msg in messages]
+        
+        return {
+            'last_executions': {
+                action: {'type': 'datetime' if isinstance(value, datetime) else 'date',
+                         'value': value.isoformat()}
+                for action, value in self.last_executions.items() if value is not None
+            },
+            'poll_messages': {str(cid): msg.id for cid, msg in self.poll_messages.items()},
+            'text_messages': {str(cid): msg.id for cid, msg in self.text_messages.items()},
+            'kind_states': {
+                kind: {'event': _ids(state.event_messages), 'notification': _ids(state.notification_messages)}
+                for kind, state in self.kind_states.items()
+            },
+        }
+    
+    def restore(self, data: Dict[str, Any],
+                resolve: Callable[[int, int], discord.PartialMessage]) -> None:
+        """Recharge un état sérialisé ; `resolve` convertit (canal, message) en message partiel"""
+        for action, entry in data.get('last_executions', {}).items():
+            parse = datetime.fromisoformat if entry['type'] == 'datetime' else date.fromisoformat
+            self.last_executions[action] = parse(entry['value'])
+        
+        self.poll_messages = {int(cid): resolve(int(cid), mid) for cid, mid in data.get('poll_messages', {}).items()}
+        self.text_messages = {int(cid): resolve(int(cid), mid) for cid, mid in data.get('text_messages', {}).items()}
+        # Fichiers antérieurs au registre des types : clés boss_state / siege_state
+        kind_states = data.get('kind_states') or {
+            key[:-len('_state')]: data[key] for key in ('boss_state', 'siege_state') if key in data
+        }
+        for kind, saved in kind_states.items():
+            state = self.kind_state(kind)
+            state.event_messages = [resolve(cid, mid) for cid, mid in saved.get('event', [])]
+            state.notification_messages = [resolve(cid, mid) for cid, mid in saved.get('notification', [])]
+        self.touch()
+
+class ShutdownInProgressError(RuntimeError):
+    """Levée quand un nouveau travail est soumis pendant l'arrêt du bot"""
+
+# Nom du travail suivi en cours dans la tâche courante (travaux imbriqués)
+_current_job: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar('current_job', default=None)
+
+class ShutdownCoordinator:
+    """Arrêt gracieux : refus des nouveaux travaux, drainage, sauvegarde de l'état"""
+    
+    def __init__(self, bot: 'EventBot', logger: logging.Logger, drain_timeout: float):
+        self.bot = bot
+        self.logger = logger
+        self.drain_timeout = drain_timeout
+        self.accepting = True
+        self._jobs: Set[asyncio.Future] = set()
+        self._shutdown_task: Optional[asyncio.Future] = None
+    
+    def install_signal_handlers(self) -> None:
+        """Déclenche l'arrêt gracieux sur SIGTERM (systemctl stop/restart) et SIGINT"""
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            try:
+                loop.add_signal_handler(sig, self.request_shutdown, sig.name)
+            except (NotImplementedError, RuntimeError):
+                # Signaux non gérés par la boucle (Windows) : arrêt par défaut
+                pass
+    
+    def request_shutdown(self, reason: str) -> None:
+        if self._shutdown_task is None:
+            self._shutdown_task = asyncio.ensure_future(self.shutdown(reason))
+    
+    @property
+    def in_flight(self) -> int:
+        return len(self._jobs)
+    
+    async def run_job(self, name: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Exécute un travail suivi ; refusé pendant l'arrêt, protégé de l'annulation de l'appelant"""
+        if _current_job.get() is not None:
+            # Travail imbriqué : déjà couvert par le travail englobant
+            return await factory()
+        if not self.accepting:
+            self.logger.warning(f"Arrêt en cours: travail '{name}' refusé")
+            raise ShutdownInProgressError(name)
+        
+        async def _runner() -> Any:
+            _current_job.set(name)
+            return await factory()
+        
+        job = asyncio.ensure_future(_runner())
+        self._jobs.add(job)
+        job.add_done_callback(self._jobs.discard)
+        return await asyncio.shield(job)
+    
+    async def shutdown(self, reason: str) -> None:
+        """Arrête les planificateurs, draine les travaux en cours, sauvegarde l'état et se déconnecte"""
+        self.accepting = False
+        self.logger.info(f"Arrêt demandé ({reason}): {self.in_flight} travail(aux) en cours")
+        
+        # stop() laisse l'itération en cours se terminer
+        self.bot.schedule_checker.stop()
+        self.bot.staging_refresher.stop()
+        self.bot.memory_guard_loop.cancel()
+        # Notifications déjà échues terminées (leur envoi est aussi un travail suivi ci-dessous)
+        await self.bot.deadlines.stop(self.drain_timeout)
+        # Plus de nouveaux travaux du gateway ; ceux non acquittés y seront remis en file
+        if self.bot.job_client_task is not None:
+            self.bot.job_client_task.cancel()
+        
+        if self._jobs:
+            _, pending = await asyncio.wait(set(self._jobs), timeout=self.drain_timeout)
+            if pending:
+                self.logger.warning(f"{len(pending)} travail(aux) non terminé(s) après "
+                                    f"{self.drain_timeout:.0f}s, arrêt forcé")
+        
+        self.bot.save_state()
+        self.bot.attendance.flush()
+        self.bot.profiler.stop()
+        # Le bail est renouvelé pendant le drainage puis libéré pour une bascule immédiate
+        if self.bot.lease is not None:
+            self.bot.lease_keeper.cancel()
+            self.bot.lease.release()
+        if self.bot.job_queue is not None:
+            await self.bot.job_queue.stop()
+        if self.bot.dashboard is not None:
+            await self.bot.dashboard.stop()
+        if self.bot.cassette:
+            self.bot.cassette.flush()
+        await self.bot.close()
+        self.logger.info("Arrêt gracieux terminé")
+
+class CircuitOpenError(discord.DiscordException):
+    """Levée quand le disjoncteur d'une route refuse un appel"""
+    
+    def __init__(self, route: str):
+        super().__init__(f"Disjoncteur ouvert pour la route {route}")
+        self.route = route
+
+class ResilienceManager:
+    """Retries, backoff et disjoncteurs par route autour des appels REST Discord"""
+    
+    def __init__(self, logger: logging.Logger, policy: RetryPolicy,
+                 failure_threshold: int = 5, reset_timeout: float = 60.0):
+        self.logger = logger
+        self.policy = policy
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.stats: Dict[str, Dict[str, int]] = {}
+    
+    def _route(self, route: str) -> CircuitBreaker:
+        if route not in self.breakers:
+            self.breakers[route] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            self.stats[route] = {'calls': 0, 'retries': 0, 'failures': 0, 'shed': 0, 'recovered': 0}
+        return self.breakers[route]
+    
+    @staticmethod
+    def is_transient(error: Exception) -> bool:
+        """Erreurs pour lesquelles un nouvel essai a du sens (5xx, 429, réseau)"""
+        if isinstance(error, discord.HTTPException):
+            return error.status >= 500 or error.status == 429
+        return isinstance(error, (discord.RateLimited, asyncio.TimeoutError, aiohttp.ClientError, OSError))
+    
+    @staticmethod
+    def is_rejected(error: Exception) -> bool:
+        """429 : la requête a été refusée sans être traitée, la rejouer ne crée pas de doublon"""
+        return (isinstance(error, discord.RateLimited)
+                or (isinstance(error, discord.HTTPException) and error.status == 429))
+    
+    @classmethod
+    def is_ambiguous(cls, error: Exception) -> bool:
+        """Erreur transitoire après laquelle la requête a pu aboutir côté Discord (5xx, réseau)"""
+        return cls.is_transient(error) and not cls.is_rejected(error)
+    
+    def retry_delay(self, error: Exception, attempt: int) -> float:
+        """Délai avant le nouvel essai : celui demandé par Discord pour un 429, sinon le backoff"""
+        retry_after = getattr(error, 'retry_after', None)
+        response = getattr(error, 'response', None)
+        if retry_after is None and response is not None:
+            with contextlib.suppress(TypeError, ValueError):
+                retry_after = float(response.headers.get('Retry-After'))
+        if retry_after is not None and self.is_rejected(error):
+            return float(retry_after)
+        return self.policy.backoff(attempt)
+    
+    def is_degraded(self) -> bool:
+        """Vrai si au moins une route a son disjoncteur ouvert"""
+        return any(breaker.state == CircuitBreaker.OPEN for breaker in self.breakers.values())
+    
+    async def call(self, route: str, func: Callable[[], Awaitable[Any]], *, idempotent: bool = True,
+                   on_ambiguous: Optional[Callable[[], Awaitable[Any]]] = None) -> Any:
+        """Exécute un appel REST avec retries ; les appels non idempotents ne sont
+        rejoués qu'après vérification (on_ambiguous) que le premier essai n'a pas abouti"""
+        breaker = self._route(route)
+        stats = self.stats[route]
+        
+        for attempt in range(self.policy.max_attempts):
+            if not breaker.allow():
+                stats['shed'] += 1
+                raise CircuitOpenError(route)
+            
+            stats['calls'] += 1
+            try:
+                result = await func()
+            except Exception as e:
+                if not self.is_transient(e):
+                    # La route a répondu (erreur fonctionnelle) : l'appel d'essai est concluant
+                    breaker.record_success()
+                    raise
+                breaker.record_failure()
+                stats['failures'] += 1
+                
+                if not idempotent and self.is_ambiguous(e):
+                    # La requête a pu aboutir côté Discord : vérifier avant de rejouer
+                    if on_ambiguous is None:
+                        raise
+                    existing = await on_ambiguous()
+                    if existing is not None:
+                        stats['recovered'] += 1
+                        breaker.record_success()
+                        return existing
+                
+                if attempt + 1 >= self.policy.max_attempts:
+                    raise
+                delay = self.retry_delay(e, attempt)
+                stats['retries'] += 1
+                self.logger.warning(f"Route {route}: erreur transitoire ({e}), "
+                                    f"nouvel essai dans {delay:.1f}s")
+                await asyncio.sleep(delay)
+                continue
+            
+            breaker.record_success()
+            return result
+    
+    def summary(self) -> List[str]:
+        """Lignes de statistiques par route pour !status"""
+        lines = []
+        for route, breaker in sorted(self.breakers.items()):
+            stats = self.stats[route]
+            lines.append(f"• {route}: {stats['calls']} appel(s), {stats['retries']} retry, "
+                         f"{stats['failures']} échec(s), {stats['recovered']} dédoublonné(s), "
+                         f"{stats['shed']} délesté(s) — disjoncteur {breaker.state}")
+        return lines
+
+# ======================== HAUTE DISPONIBILITÉ (BAIL DE LEADER) ========================
+
+class NotLeaderError(discord.DiscordException):
+    """Écriture refusée : cette instance ne détient plus le bail de leader"""
+    
+    def __init__(self):
+        super().__init__("Bail de leader perdu, écriture refusée")
+
+# ======================== RÉPARTITION GATEWAY / WORKERS (FILE LOCALE) ========================
+
+class RemoteContext:
+    """Contexte minimal d'une commande transmise par le gateway : réponses via le webhook de l'interaction
+
+    Les permissions de l'interaction sont transmises par le gateway : les vérifications de la
+    commande (`has_permissions`, vérifications globales du bot) sont rejouées sur le worker.
+    """
+    
+    def __init__(self, bot: 'EventBot', job: Dict[str, Any], command: commands.Command):
+        self.bot = bot
+        self.command = command
+        self.author = job.get('author', 'gateway')
+        self.permissions = discord.Permissions(job.get('permissions', 0))
+        self._webhook = discord.Webhook.partial(job['application_id'], job['token'], client=bot)
+    
+    async def defer(self) -> None:
+        """Réponse déjà différée par le gateway"""
+    
+    async def send(self, content: str) -> None:
+        await self._webhook.send(content)
+
+class EventCommandTree(app_commands.CommandTree):
+    """Arbre des commandes slash ; en mode gateway, les commandes lourdes partent vers les workers"""
+    
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        return await self.client.route_interaction(interaction)
 
 class EventManager:
     """Gestionnaire d'événements Discord"""
     
-    def __init__(self, bot: commands.Bot, config: BotConfiguration, logger: logging.Logger):
+    def __init__(self, bot: commands.Bot, config: BotConfiguration, logger: logging.Logger,
+                 resilience: ResilienceManager):
         self.bot = bot
         self.config = config
         self.logger = logger
+        self.resilience = resilience
     
     async def fetch_server_events(self) -> List[discord.ScheduledEvent]:
         """Récupère tous les événements du serveur"""
         try:
-            guild = self.bot.guilds[0] if self.bot.guilds else None
+            guild = self.bot.primary_guild()
             if not guild:
                 self.logger.error("Aucun serveur trouvé pour le bot")
                 return []
 
-            events = await guild.fetch_scheduled_events()
+            events = await self.resilience.call('events.fetch', guild.fetch_scheduled_events)
             self.logger.info(f"Récupération de {len(events)} événement(s) sur {guild.name}")
             return events
             
@@ -173,8 +763,9 @@ class EventManager:
         """Construit le lien direct vers un événement"""
         return f"https://discord.com/events/{guild_id}/{event_id}"
     
-    async def get_all_events(self) -> Dict[str, Dict]:
-        """Récupère et formate tous les événements"""
+    async def get_all_events(self) -> Dict[int, Dict]:
+        """Récupère et formate tous les événements, indexés par ID : les occurrences créées
+        depuis un même modèle portent le même nom"""
         events = await self.fetch_server_events()
         if not events:
             return {}
@@ -184,15 +775,7 @@ class EventManager:
 
         for event in events:
             try:
-                event_link = self.construct_event_link(guild_id, event.id)
-                formatted_events[event.name] = {
-                    'id': event.id,
-                    'name': event.name,
-                    'link': event_link,
-                    'start_time': event.start_time,
-                    'description': event.description,
-                    'status': event.status.name
-                }
+                formatted_events[event.id] = self.format_event(guild_id, event)
                 self.logger.debug(f"Événement traité: {event.name}")
                 
             except Exception as e:
@@ -201,55 +784,136 @@ class EventManager:
 
         return formatted_events
     
-    def filter_events_by_criteria(self, events: Dict[str, Dict], 
-                                 weekdays: List[int], keywords: List[str]) -> List[Dict]:
-        """Filtre les événements selon des critères"""
-        filtered = []
-        
-        for event_name, event_data in events.items():
-            start_time = event_data.get('start_time')
-            if not start_time:
-                continue
-                
-            # Filtre par jour de la semaine
-            if start_time.weekday() not in weekdays:
-                continue
-                
-            # Filtre par mots-clés
-            name_lower = event_name.lower()
-            if any(keyword.lower() in name_lower for keyword in keywords):
-                filtered.append(event_data)
-                self.logger.info(f"Événement filtré: {event_name} (jour {start_time.weekday()})")
+    def format_event(self, guild_id: int, event: discord.ScheduledEvent) -> Dict:
+        """Représentation d'un événement dans le cache"""
+        return {
+            'id': event.id,
+            'name': event.name,
+            'link': self.construct_event_link(guild_id, event.id),
+            'start_time': event.start_time,
+            'end_time': event.end_time,
+            'location': event.location,
+            'description': event.description,
+            'status': event.status.name,
+            'recurrence': rule_from_event(event)
+        }
+    
+    async def create_event(self, guild: discord.Guild, template: EventTemplate,
+                           start: datetime) -> Optional[Dict]:
+        """Crée un événement programmé externe (vérifié dans la liste en cas de réponse ambiguë)"""
+        async def _find_created() -> Optional[discord.ScheduledEvent]:
+            for event in await guild.fetch_scheduled_events():
+                if event.name == template.name and event.start_time == start:
+                    return event
+            return None
         
-        return filtered
-
+        extra = {'description': template.description} if template.description else {}
+        try:
+            event = await self.resilience.call(
+                'events.create',
+                lambda: guild.create_scheduled_event(
+                    name=template.name, start_time=start, end_time=start + template.duration,
+                    entity_type=discord.EntityType.external, privacy_level=discord.PrivacyLevel.guild_only,
+                    location=template.location, **extra
+                ),
+                idempotent=False,
+                on_ambiguous=_find_created
+            )
+            self.logger.info(f"Événement créé: {template.name} ({start.strftime('%d/%m %H:%M')})")
+            return self.format_event(guild.id, event)
+        except discord.DiscordException as e:
+            self.logger.error(f"Erreur création de l'événement {template.name}: {e}")
+            return None
+    
+    async def edit_event(self, guild: discord.Guild, event_id: int, changes: Dict[str, Any]) -> Optional[Dict]:
+        """Aligne un événement existant sur sa définition (champs modifiés uniquement)"""
+        try:
+            event = guild.get_scheduled_event(event_id) or await self.resilience.call(
+                'events.fetch', lambda: guild.fetch_scheduled_event(event_id)
+            )
+            event = await self.resilience.call('events.edit', lambda: event.edit(**changes))
+            self.logger.info(f"Événement modifié: {event.name} ({', '.join(changes)})")
+            return self.format_event(guild.id, event)
+        except discord.DiscordException as e:
+            self.logger.error(f"Erreur modification de l'événement {event_id}: {e}")
+            return None
+    
+    async def delete_event(self, guild: discord.Guild, event_id: int) -> bool:
+        """Supprime un événement créé par le bot (déjà supprimé : considéré comme fait)"""
+        try:
+            event = guild.get_scheduled_event(event_id) or await self.resilience.call(
+                'events.fetch', lambda: guild.fetch_scheduled_event(event_id)
+            )
+            await self.resilience.call('events.delete', lambda: event.delete())
+            self.logger.info(f"Événement supprimé: {event.name}")
+            return True
+        except discord.NotFound:
+            return True
+        except discord.DiscordException as e:
+            self.logger.error(f"Erreur suppression de l'événement {event_id}: {e}")
+            return False
+    
 class MessageManager:
     """Gestionnaire de messages Discord"""
     
-    def __init__(self, bot: commands.Bot, logger: logging.Logger):
+    def __init__(self, bot: commands.Bot, logger: logging.Logger, resilience: ResilienceManager,
+                 max_concurrency: int = 5, write_guard: Optional[Callable[[], bool]] = None):
         self.bot = bot
         self.logger = logger
+        self.resilience = resilience
+        # Vérification du bail de leader avant chaque écriture (mode haute disponibilité)
+        self.write_guard = write_guard
+        # Borne globale du nombre d'envois simultanés lors des diffusions
+        self._fanout_semaphore = asyncio.Semaphore(max_concurrency)
+    
+    def _ensure_writable(self) -> None:
+        if self.write_guard is not None and not self.write_guard():
+            raise NotLeaderError()
     
     async def delete_messages(self, messages: List[discord.Message]) -> None:
         """Supprime une liste de messages"""
         for msg in messages[:]:
             if msg:
                 try:
-                    await msg.delete()
+                    self._ensure_writable()
+                    await self.resilience.call('messages.delete', msg.delete)
                     messages.remove(msg)
                     self.logger.info(f"Message supprimé: {msg.id}")
+                except discord.NotFound:
+                    # Déjà supprimé (par un modérateur ou un essai précédent)
+                    messages.remove(msg)
                 except discord.DiscordException as e:
                     self.logger.error(f"Erreur suppression message {msg.id}: {e}")
     
-    async def send_message(self, channel_id: int, content: str) -> Optional[discord.Message]:
-        """Envoie un message dans un canal"""
-        channel = self.bot.get_channel(channel_id)
+    async def _find_sent_message(self, channel: discord.abc.Messageable, since: datetime,
+                                 predicate: Callable[[discord.Message], bool]) -> Optional[discord.Message]:
+        """Cherche dans l'historique récent un message du bot envoyé depuis `since`
+        (une erreur de vérification est propagée pour ne jamais risquer de doublon)"""
+        async for message in channel.history(limit=10, after=since - timedelta(seconds=5)):
+            if message.author == self.bot.user and predicate(message):
+                self.logger.info(f"Envoi déjà abouti malgré l'erreur: {message.id}")
+                return message
+        return None
+    
+    async def send_message(self, channel_id: int, content: str,
+                           view: Optional[discord.ui.View] = None) -> Optional[discord.Message]:
+        """Envoie un message dans un canal (avec boutons si `view` est fourni)"""
+        channel = self.bot.resolve_channel(channel_id)
         if not channel:
             self.logger.error(f"Canal {channel_id} introuvable")
             return None
         
         try:
-            message = await channel.send(content)
+            self._ensure_writable()
+            started_at = discord.utils.utcnow()
+            message = await self.resilience.call(
+                'messages.send',
+                lambda: channel.send(content, view=view),
+                idempotent=False,
+                on_ambiguous=lambda: self._find_sent_message(
+                    channel, started_at, lambda m: m.content == content
+                )
+            )
             self.logger.info(f"Message envoyé dans le canal {channel_id}")
             return message
         except discord.DiscordException as e:
@@ -259,232 +923,1786 @@ class MessageManager:
     async def send_poll(self, channel_id: int, question: str, 
                        duration: timedelta) -> Optional[discord.Message]:
         """Crée et envoie un sondage"""
-        channel = self.bot.get_channel(channel_id)
+        channel = self.bot.resolve_channel(channel_id)
         if not channel:
             self.logger.error(f"Canal {channel_id} introuvable")
             return None
         
         try:
+            self._ensure_writable()
             poll = discord.Poll(question=question, duration=duration)
             poll.add_answer(text="Oui", emoji="✅")
             poll.add_answer(text="Non", emoji="❌")
             
-            message = await channel.send(poll=poll)
+            started_at = discord.utils.utcnow()
+            message = await self.resilience.call(
+                'polls.send',
+                lambda: channel.send(poll=poll),
+                idempotent=False,
+                on_ambiguous=lambda: self._find_sent_message(
+                    channel, started_at, lambda m: m.poll is not None and m.poll.question == question
+                )
+            )
             self.logger.info(f"Sondage créé dans le canal {channel_id}")
             return message
         except discord.DiscordException as e:
             self.logger.error(f"Erreur création sondage: {e}")
             return None
-
-class EventBot(commands.Bot):
-    """Bot Discord principal avec logique métier"""
     
-    def __init__(self):
-        # Chargement de la configuration
-        load_dotenv()
-        self.config = self._load_configuration()
-        self.logger = LoggerManager.setup_logging()
+    async def edit_message(self, message: discord.Message, content: str) -> Optional[discord.Message]:
+        """Modifie le contenu d'un message ; None si le message n'existe plus"""
+        try:
+            self._ensure_writable()
+            edited = await self.resilience.call('messages.edit', lambda: message.edit(content=content))
+            self.logger.info(f"Message modifié: {message.id}")
+            return edited or message
+        except discord.NotFound:
+            return None
+        except discord.DiscordException as e:
+            # Le message reste suivi (contenu périmé) plutôt que d'être dupliqué
+            self.logger.error(f"Erreur modification message {message.id}: {e}")
+            return message
+    
+    async def sync_channel_messages(self, channel_id: int, existing: List[discord.Message],
+                                    contents: List[str]) -> List[discord.Message]:
+        """Aligne les messages d'un canal sur les contenus voulus : modification sur place,
+        envoi des messages manquants puis suppression du surplus"""
+        async with self._fanout_semaphore:
+            current = sorted(existing, key=lambda msg: msg.id)
+            synced: List[discord.Message] = []
+            
+            for index, content in enumerate(contents):
+                message = None
+                if index < len(current):
+                    previous = current[index]
+                    if getattr(previous, 'content', None) == content:
+                        synced.append(previous)
+                        continue
+                    message = await self.edit_message(previous, content)
+                if message is None:
+                    message = await self.send_message(channel_id, content)
+                if message is not None:
+                    synced.append(message)
+            
+            # Les messages en surplus dont la suppression échoue restent suivis
+            surplus = current[len(contents):]
+            await self.delete_messages(surplus)
+            return synced + surplus
+    
+    async def fan_out(self, channel_ids: List[int],
+                      sender: Callable[[int], Awaitable[Optional[discord.Message]]]) -> Dict[int, FanOutResult]:
+        """Exécute un envoi sur tous les canaux d'un groupe en parallèle (parallélisme borné)"""
+        async def _send_one(channel_id: int) -> FanOutResult:
+            async with self._fanout_semaphore:
+                try:
+                    message = await sender(channel_id)
+                except Exception as e:
+                    self.logger.error(f"Erreur diffusion canal {channel_id}: {e}")
+                    return FanOutResult(channel_id, error=str(e))
+            if message is None:
+                return FanOutResult(channel_id, error="envoi impossible")
+            return FanOutResult(channel_id, message=message)
         
-        # Initialisation du bot
-        intents = discord.Intents.default()
-        intents.message_content = True
-        super().__init__(command_prefix='!', intents=intents)
+        # dict.fromkeys : dédoublonnage en conservant l'ordre du groupe
+        results = await asyncio.gather(*(_send_one(cid) for cid in dict.fromkeys(channel_ids)))
+        succeeded = sum(1 for result in results if result.ok)
+        self.logger.info(f"Diffusion terminée: {succeeded}/{len(results)} canal(aux)")
+        return {result.channel_id: result for result in results}
+    
+    async def broadcast_message(self, channel_ids: List[int], content: str,
+                                view: Optional[discord.ui.View] = None) -> Dict[int, FanOutResult]:
+        """Envoie le même message dans tous les canaux d'un groupe"""
+        return await self.fan_out(channel_ids, lambda cid: self.send_message(cid, content, view))
+    
+    async def broadcast_poll(self, channel_ids: List[int], question: str,
+                             duration: timedelta) -> Dict[int, FanOutResult]:
+        """Envoie le même sondage dans tous les canaux d'un groupe"""
+        return await self.fan_out(channel_ids, lambda cid: self.send_poll(cid, question, duration))
+    
+    @staticmethod
+    def sent_messages(results: Dict[int, FanOutResult]) -> List[discord.Message]:
+        """Extrait les messages envoyés avec succès d'un résultat de diffusion"""
+        return [result.message for result in results.values() if result.ok]
+
+# ======================== ENREGISTREMENT / REJEU DU TRAFIC ========================
+
+class CassetteRecorder:
+    """Enregistre les échanges REST et les événements gateway dans un fichier compact (JSONL gzip)"""
+    
+    # Clés supprimées des payloads enregistrés
+    SENSITIVE_KEYS = {'token', 'email', 'phone', 'ip', 'session_id', 'resume_gateway_url',
+                      'mfa_enabled', 'verified', 'avatar', 'banner', 'bio'}
+    # Clés remplacées par un pseudonyme stable (pour garder des données cohérentes)
+    PSEUDONYM_KEYS = {'username', 'global_name', 'nick', 'display_name'}
+    # Champs d'un message vidés quand il n'a pas été écrit par le bot (texte, intégrations, fichiers)
+    MEMBER_CONTENT_KEYS = {'content': "", 'embeds': [], 'attachments': []}
+    FLUSH_EVERY = 200
+    
+    def __init__(self, path: str, logger: logging.Logger):
+        self.path = path
+        self.logger = logger
+        self.bot_user_id: Optional[int] = None
+        self._started = time.monotonic()
+        self._buffer: List[str] = []
+        self.frames_written = 0
+    
+    def attach(self, bot: commands.Bot) -> None:
+        """Intercepte la couche transport du bot (HTTPClient.request et socket gateway)"""
+        original_request = bot.http.request
         
-        # Gestionnaires
-        self.state = BotState()
-        self.event_manager = EventManager(self, self.config, self.logger)
-        self.message_manager = MessageManager(self, self.logger)
+        async def recording_request(route, **kwargs):
+            started = time.monotonic()
+            frame = {
+                'kind': 'rest',
+                'method': route.method,
+                'path': route.path,
+                'url': urlsplit(route.url).path,
+                'body': self.scrub(kwargs.get('json')),
+            }
+            try:
+                response = await original_request(route, **kwargs)
+            except discord.HTTPException as e:
+                frame.update(status=e.status, error=e.text, code=e.code)
+                self._record(frame, started)
+                raise
+            if route.path == '/users/@me' and isinstance(response, dict):
+                self.bot_user_id = int(response['id'])
+            frame.update(status=200, response=self.scrub(response))
+            self._record(frame, started)
+            return response
         
-        self.logger.info("Bot initialisé avec succès")
+        bot.http.request = recording_request
+        bot.add_listener(self.on_socket_raw_receive, 'on_socket_raw_receive')
+        self.logger.info(f"Enregistrement du trafic Discord dans {self.path}")
     
-    def _load_configuration(self) -> BotConfiguration:
-        """Charge la configuration depuis les variables d'environnement"""
-        required_vars = ['TOKEN_DISCORD', 'CHANNEL_ID_DP', 'CHANNEL_ID_BOSS', 'CHANNEL_ID_SIEGE']
+    async def on_socket_raw_receive(self, raw: Union[str, bytes]) -> None:
+        """Enregistre les événements gateway (op 0 uniquement)"""
+        try:
+            payload = json.loads(raw)
+        except (TypeError, ValueError):
+            return
+        if payload.get('op') != 0:
+            return
+        if payload.get('t') == 'READY':
+            self.bot_user_id = int(payload['d']['user']['id'])
+        self._record({'kind': 'gateway', 't': payload['t'], 'd': self.scrub(payload['d'])})
+    
+    def scrub(self, value: Any) -> Any:
+        """Supprime ou pseudonymise les données sensibles d'un payload"""
+        if isinstance(value, list):
+            return [self.scrub(item) for item in value]
+        if not isinstance(value, dict):
+            return value
         
-        for var in required_vars:
-            if not os.getenv(var):
-                raise ValueError(f"Variable d'environnement manquante: {var}")
+        scrubbed = {}
+        for key, item in value.items():
+            if key in self.SENSITIVE_KEYS:
+                continue
+            if key in self.PSEUDONYM_KEYS and isinstance(item, str):
+                scrubbed[key] = "user-" + hashlib.sha256(item.encode()).hexdigest()[:8]
+            else:
+                scrubbed[key] = self.scrub(item)
         
-        return BotConfiguration(
-            discord_token=os.getenv('TOKEN_DISCORD'),
-            channel_dp=int(os.getenv('CHANNEL_ID_DP')),
-            channel_boss=int(os.getenv('CHANNEL_ID_BOSS')),
-            channel_siege=int(os.getenv('CHANNEL_ID_SIEGE'))
-        )
+        # Contenu des messages des autres membres (texte, intégrations, pièces jointes) :
+        # seul celui du bot est conservé
+        author = value.get('author')
+        if isinstance(author, dict) and self.bot_user_id is not None:
+            if int(author.get('id', 0)) != self.bot_user_id:
+                for key, empty in self.MEMBER_CONTENT_KEYS.items():
+                    if key in scrubbed:
+                        scrubbed[key] = empty
+        return scrubbed
     
-    def get_current_time(self) -> datetime:
-        """Retourne l'heure actuelle dans le timezone configuré"""
-        return datetime.now(ZoneInfo(self.config.timezone))
+    def _record(self, frame: Dict, started: Optional[float] = None) -> None:
+        now = time.monotonic()
+        frame['at'] = round(now - self._started, 4)
+        if started is not None:
+            frame['duration'] = round(now - started, 4)
+        self._buffer.append(json.dumps(frame, separators=(',', ':'), ensure_ascii=False, default=str))
+        if len(self._buffer) >= self.FLUSH_EVERY:
+            self.flush()
     
-    async def setup_hook(self) -> None:
-        """Configuration initiale du bot"""
-        self.logger.info("Configuration du bot...")
-        await self.recover_existing_messages()
-        await self.update_events_cache()
-        
-        # Démarrage des tâches automatiques
-        if not self.schedule_checker.is_running():
-            self.schedule_checker.start()
-            self.logger.info("Planificateur démarré")
+    def flush(self) -> None:
+        """Écrit les trames en attente sur disque"""
+        if not self._buffer:
+            return
+        with gzip.open(self.path, 'at', encoding='utf-8') as cassette:
+            cassette.write("\n".join(self._buffer) + "\n")
+        self.frames_written += len(self._buffer)
+        self._buffer.clear()
+
+class CassettePlayer:
+    """Rejoue une cassette sans réseau, à vitesse d'origine (1.0) ou accélérée (0 = sans attente)"""
     
-    # ======================== GESTION DES SONDAGES ========================
+    def __init__(self, path: str, speed: float, logger: logging.Logger):
+        self.path = path
+        self.speed = speed
+        self.logger = logger
+        self.gateway_frames: List[Dict] = []
+        # Réponses REST par URL exacte, puis par gabarit de route en secours
+        self._by_url: Dict[tuple, deque] = {}
+        self._by_template: Dict[tuple, deque] = {}
+        self._last_response: Dict[tuple, Dict] = {}
+        self.rest_served = 0
+        self._load()
     
-    async def create_daily_poll(self) -> None:
-        """Crée le sondage quotidien"""
-        try:
-            # Suppression des anciens sondages
-            await self.delete_poll_messages()
-            
-            # Création du nouveau sondage
-            poll_msg = await self.message_manager.send_poll(
-                self.config.channel_dp, 
-                self.config.poll_question,
-                timedelta(hours=8)
-            )
-            
-            # Message d'accompagnement
-            text_msg = await self.message_manager.send_message(
-                self.config.channel_dp,
-                self.config.notification_message
-            )
-            
-            self.state.poll_message = poll_msg
-            self.state.text_message = text_msg
-            self.logger.info("Sondage quotidien créé avec succès")
-            
-        except Exception as e:
-            self.logger.error(f"Erreur création sondage: {e}")
+    def _load(self) -> None:
+        with gzip.open(self.path, 'rt', encoding='utf-8') as cassette:
+            for line in cassette:
+                if not line.strip():
+                    continue
+                frame = json.loads(line)
+                if frame['kind'] == 'gateway':
+                    self.gateway_frames.append(frame)
+                else:
+                    self._by_url.setdefault((frame['method'], frame['url']), deque()).append(frame)
+                    self._by_template.setdefault((frame['method'], frame['path']), deque()).append(frame)
+        self.logger.info(f"Cassette chargée: {len(self.gateway_frames)} événement(s) gateway, "
+                         f"{sum(len(q) for q in self._by_url.values())} requête(s) REST")
     
-    async def delete_poll_messages(self) -> None:
-        """Supprime les messages de sondage"""
-        messages_to_delete = [
-            msg for msg in [self.state.poll_message, self.state.text_message] 
-            if msg is not None
-        ]
+    async def _wait(self, seconds: float) -> None:
+        if self.speed > 0 and seconds > 0:
+            await asyncio.sleep(seconds / self.speed)
+    
+    def _next_frame(self, method: str, url: str, template: str) -> Dict:
+        """Réponse enregistrée suivante pour cette requête (la dernière est réutilisée une fois épuisées)"""
+        for key, table in (((method, url), self._by_url), ((method, template), self._by_template)):
+            queue = table.get(key)
+            if queue:
+                frame = queue.popleft()
+                self._last_response[key] = frame
+                return frame
+            if key in self._last_response:
+                return self._last_response[key]
+        raise RuntimeError(f"Requête absente de la cassette: {method} {url}")
+    
+    def attach(self, bot: commands.Bot) -> None:
+        """Remplace la couche REST du bot par les réponses enregistrées"""
+        async def replaying_request(route, **kwargs):
+            frame = self._next_frame(route.method, urlsplit(route.url).path, route.path)
+            await self._wait(frame.get('duration', 0))
+            self.rest_served += 1
+            if 'error' in frame:
+                response = SimpleNamespace(status=frame['status'], reason="replay")
+                raise discord.HTTPException(response, {'message': frame['error'], 'code': frame.get('code', 0)})
+            return frame.get('response')
         
-        if messages_to_delete:
-            await self.message_manager.delete_messages(messages_to_delete)
-            self.state.poll_message = None
-            self.state.text_message = None
+        bot.http.request = replaying_request
     
-    # ======================== GESTION DES ÉVÉNEMENTS ========================
+    async def replay_gateway(self, bot: commands.Bot) -> None:
+        """Injecte les événements gateway enregistrés dans l'état de connexion du bot"""
+        previous_at = self.gateway_frames[0]['at'] if self.gateway_frames else 0
+        for frame in self.gateway_frames:
+            await self._wait(frame['at'] - previous_at)
+            previous_at = frame['at']
+            parser = bot._connection.parsers.get(frame['t'])
+            if parser is None:
+                continue
+            try:
+                parser(frame['d'])
+            except Exception as e:
+                self.logger.error(f"Rejeu: erreur sur l'événement {frame['t']}: {e}")
+        self.logger.info(f"Rejeu gateway terminé ({len(self.gateway_frames)} événement(s), "
+                         f"{self.rest_served} réponse(s) REST servie(s))")
+
+# ======================== COORDINATION DES OPÉRATIONS ========================
+
+class SingleFlight:
+    """Coalescence des opérations concurrentes (single-flight) et verrous par ressource"""
     
-    async def update_events_cache(self) -> Dict[str, Dict]:
-        """Met à jour le cache des événements"""
-        try:
-            events = await self.event_manager.get_all_events()
-            self.state.cached_events = events
-            self.logger.info(f"Cache mis à jour: {len(events)} événement(s)")
-            return events
-        except Exception as e:
-            self.logger.error(f"Erreur mise à jour cache: {e}")
-            return {}
+    def __init__(self, logger: logging.Logger):
+        self.logger = logger
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
     
-    async def update_boss_messages(self) -> None:
-        """Met à jour les messages d'événements boss"""
-        try:
-            events = await self.event_manager.get_all_events()
-            if not events:
-                self.logger.info("Aucun événement pour mise à jour boss")
-                return
-            
-            # Filtrage des événements boss
-            boss_events = self.event_manager.filter_events_by_criteria(
-                events, [5, 6], self.config.boss_keywords
-            )
-            
-            if not boss_events:
-                self.logger.info("Aucun événement boss trouvé")
-                return
-            
-            # Nettoyage des anciens messages
-            await self.message_manager.delete_messages(self.state.boss_state.event_messages)
-            await self.message_manager.delete_messages(self.state.boss_state.notification_messages)
-            
-            # Séparation par jour
-            saturday_events = [e for e in boss_events if e['start_time'].weekday() == 5]
-            sunday_events = [e for e in boss_events if e['start_time'].weekday() == 6]
-            
-            # Création des nouveaux messages
-            if saturday_events:
-                saturday_links = "\n".join(e['link'] for e in saturday_events)
-                content = self.config.boss_template.format(boss_links=saturday_links)
-                
-                msg = await self.message_manager.send_message(self.config.channel_boss, content)
-                if msg:
-                    self.state.boss_state.event_messages.append(msg)
-                    self.logger.info(f"Message boss samedi créé")
-            
-            if sunday_events:
-                sunday_links = "\n".join(e['link'] for e in sunday_events)
-                msg = await self.message_manager.send_message(self.config.channel_boss, sunday_links)
-                if msg:
-                    self.state.boss_state.event_messages.append(msg)
-                    self.logger.info(f"Message boss dimanche créé")
-            
-            self.logger.info("Mise à jour boss terminée avec succès")
-            
-        except Exception as e:
-            self.logger.error(f"Erreur mise à jour boss: {e}")
+    def is_running(self, key: str) -> bool:
+        """Indique si une exécution est en cours pour cette clé"""
+        return key in self._inflight
     
-    async def update_siege_messages(self) -> None:
-        """Met à jour les messages d'événements siege"""
-        try:
-            events = await self.event_manager.get_all_events()
-            if not events:
-                self.logger.info("Aucun événement pour mise à jour siege")
-                return
-            
-            # Filtrage des événements siege
-            siege_events = self.event_manager.filter_events_by_criteria(
-                events, [6], self.config.siege_keywords
+    def lock(self, key: str) -> asyncio.Lock:
+        """Verrou d'exclusion mutuelle pour une ressource (ex. un groupe de canaux)"""
+        if key not in self._locks:
+            self._locks[key] = asyncio.Lock()
+        return self._locks[key]
+    
+    async def run(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Exécute l'opération, ou rejoint l'exécution en cours et partage son résultat"""
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(factory())
+            self._inflight[key] = future
+            future.add_done_callback(lambda done: self._release(key, done))
+        else:
+            self.logger.info(f"Opération '{key}' déjà en cours, résultat partagé")
+        
+        # shield : l'annulation d'un appelant n'interrompt pas l'exécution partagée
+        return await asyncio.shield(future)
+    
+    def _release(self, key: str, future: asyncio.Future) -> None:
+        """Libère la clé une fois l'exécution terminée"""
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+
+class RenderCache:
+    """Réponses de commandes déjà rendues, réutilisées tant que leur clé de version est inchangée"""
+    
+    def __init__(self):
+        # Nom du rendu -> (clé, résultat)
+        self._entries: Dict[str, Tuple[Any, Any]] = {}
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, name: str, key: Any, render: Callable[[], Any]) -> Any:
+        entry = self._entries.get(name)
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        value = render()
+        self._entries[name] = (key, value)
+        return value
+    
+    def trim(self) -> None:
+        self._entries.clear()
+
+# ======================== SUIVI DES PRÉSENCES (BOUTONS) ========================
+
+class AttendanceTracker:
+    """Réponses de présence en mémoire ; écritures disque regroupées après une courte fenêtre"""
+    
+    # (clé, libellé, emoji)
+    STATUSES = (("yes", "Présent", "✅"), ("late", "En retard", "⏰"),
+                ("maybe", "Peut-être", "❔"), ("no", "Absent", "❌"))
+    # Une rangée de boutons Discord contient au plus 5 boutons
+    MAX_ROLES = 5
+    
+    def __init__(self, path: str, flush_delay: float, roles: List[str], logger: logging.Logger):
+        self.path = path
+        self.flush_delay = flush_delay
+        self.logger = logger
+        if len(roles) > self.MAX_ROLES:
+            self.logger.warning(f"ATTENDANCE_ROLES: {len(roles)} rôles, seuls les {self.MAX_ROLES} premiers "
+                                f"sont proposés (ignorés: {', '.join(roles[self.MAX_ROLES:])})")
+        self.roles = roles[:self.MAX_ROLES]
+        # ID du message -> question affichée
+        self.questions: Dict[int, str] = {}
+        # ID du message -> ID du membre -> {"status": ..., "role": ...}
+        self.responses: Dict[int, Dict[int, Dict[str, str]]] = {}
+        # Compteurs tenus à jour à chaque clic (jamais recalculés)
+        self.counts: Dict[int, Counter] = {}
+        self.version = 0
+        self._dirty = False
+        self._flush_task: Optional[asyncio.Task] = None
+    
+    def open(self, message_id: int, question: str) -> None:
+        self.questions[message_id] = question
+        self.responses.setdefault(message_id, {})
+        self.counts.setdefault(message_id, Counter())
+        self._mark_dirty()
+    
+    def close(self, message_ids: List[int]) -> None:
+        """Oublie les messages supprimés"""
+        for message_id in message_ids:
+            self.questions.pop(message_id, None)
+            self.responses.pop(message_id, None)
+            self.counts.pop(message_id, None)
+        self._mark_dirty()
+    
+    def record(self, message_id: int, user_id: int, status: Optional[str] = None,
+               role: Optional[str] = None) -> Dict[str, str]:
+        """Enregistre un clic ; un clic sur un rôle sans statut vaut présence"""
+        entries = self.responses.setdefault(message_id, {})
+        counts = self.counts.setdefault(message_id, Counter())
+        entry = entries.setdefault(user_id, {})
+        previous = entry.get('status')
+        
+        if status is not None:
+            entry['status'] = status
+        elif previous is None:
+            entry['status'] = 'yes'
+        if role is not None:
+            entry['role'] = role
+        
+        if entry['status'] != previous:
+            if previous is not None:
+                counts[previous] -= 1
+            counts[entry['status']] += 1
+        self._mark_dirty()
+        return entry
+    
+    def tally(self, message_id: int) -> Dict[str, int]:
+        """Nombre de réponses par libellé de statut"""
+        counts = self.counts.get(message_id, Counter())
+        return {label: counts[key] for key, label, _ in self.STATUSES}
+    
+    def describe(self, entry: Dict[str, str]) -> str:
+        labels = {key: f"{emoji} {label}" for key, label, emoji in self.STATUSES}
+        text = labels.get(entry.get('status'), '')
+        return f"{text} ({entry['role']})" if entry.get('role') else text
+    
+    def render(self, message_id: int) -> str:
+        """Contenu du message : question, compteurs et répartition des rôles des présents"""
+        counts = self.counts.get(message_id, Counter())
+        lines = [self.questions.get(message_id, ""), ""]
+        lines.append(" • ".join(f"{emoji} {label} : {counts[key]}" for key, label, emoji in self.STATUSES))
+        if self.roles:
+            roles = Counter(entry.get('role') for entry in self.responses.get(message_id, {}).values()
+                            if entry.get('status') in ('yes', 'late') and entry.get('role'))
+            lines.append(" • ".join(f"{role} : {roles[role]}" for role in self.roles))
+        return "\n".join(lines)
+    
+    def _mark_dirty(self) -> None:
+        self.version += 1
+        self._dirty = True
+        if self._flush_task is None or self._flush_task.done():
+            try:
+                self._flush_task = asyncio.get_running_loop().create_task(self._flush_later())
+            except RuntimeError:
+                # Hors boucle (chargement, tests) : écriture immédiate
+                self.flush()
+    
+    async def _flush_later(self) -> None:
+        # La fenêtre court depuis le premier clic : une rafale donne une seule écriture
+        await asyncio.sleep(self.flush_delay)
+        self.flush()
+    
+    def flush(self) -> None:
+        """Écrit les réponses sur disque de manière atomique si elles ont changé"""
+        if not self._dirty:
+            return
+        self._dirty = False
+        data = {
+            str(message_id): {
+                'question': self.questions.get(message_id, ""),
+                'responses': {str(user_id): entry for user_id, entry in entries.items()},
+            }
+            for message_id, entries in self.responses.items()
+        }
+        try:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as attendance_file:
+                json.dump(data, attendance_file)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            self.logger.error(f"Erreur sauvegarde des présences: {e}")
+    
+    def load(self) -> None:
+        try:
+            with open(self.path, encoding='utf-8') as attendance_file:
+                data = json.load(attendance_file)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            self.logger.error(f"Erreur lecture des présences: {e}")
+            return
+        
+        for message_id, record in data.items():
+            message_id = int(message_id)
+            self.questions[message_id] = record.get('question', "")
+            entries = {int(user_id): entry for user_id, entry in record.get('responses', {}).items()}
+            self.responses[message_id] = entries
+            self.counts[message_id] = Counter(entry.get('status') for entry in entries.values())
+        self.logger.info(f"Présences restaurées: {len(self.questions)} message(s)")
+
+class AttendanceView(discord.ui.View):
+    """Boutons de présence persistants : custom_id fixes, la vue est réenregistrée au démarrage
+    et sert tous les messages de présence (le message est identifié par l'interaction).
+    Les boutons de rôle sont identifiés par leur position dans ATTENDANCE_ROLES, le libellé
+    libre n'entre pas dans le custom_id (limité à 100 caractères)"""
+    
+    def __init__(self, tracker: AttendanceTracker,
+                 on_change: Optional[Callable[[discord.Message], None]] = None):
+        super().__init__(timeout=None)
+        self.tracker = tracker
+        self.on_change = on_change
+        
+        for key, label, emoji in tracker.STATUSES:
+            button = discord.ui.Button(label=label, emoji=emoji, row=0,
+                                       style=discord.ButtonStyle.secondary,
+                                       custom_id=f"attendance:status:{key}")
+            button.callback = self._callback(status=key)
+            self.add_item(button)
+        for index, role in enumerate(tracker.roles):
+            button = discord.ui.Button(label=role, row=1, style=discord.ButtonStyle.primary,
+                                       custom_id=f"attendance:role:{index}")
+            button.callback = self._callback(role=role)
+            self.add_item(button)
+    
+    @staticmethod
+    def is_attendance_message(message: discord.Message) -> bool:
+        """Vrai si le message porte les boutons de présence"""
+        for row in getattr(message, 'components', None) or []:
+            for component in getattr(row, 'children', []):
+                if (getattr(component, 'custom_id', None) or '').startswith('attendance:'):
+                    return True
+        return False
+    
+    def _callback(self, status: Optional[str] = None, role: Optional[str] = None):
+        async def callback(interaction: discord.Interaction) -> None:
+            entry = self.tracker.record(interaction.message.id, interaction.user.id, status, role)
+            # Accusé de réception immédiat ; disque et message sont mis à jour par lots
+            await interaction.response.send_message(
+                f"Réponse enregistrée : {self.tracker.describe(entry)}", ephemeral=True
             )
+            if self.on_change is not None:
+                self.on_change(interaction.message)
+        return callback
+
+# ======================== RAPPELS EN MESSAGE PRIVÉ ========================
+
+class ReminderDispatcher:
+    """Envoi des rappels en MP par un pool de workers borné, débit global limité ;
+    un journal sur disque permet de reprendre un envoi interrompu sans doublon"""
+    
+    JOURNAL_EVERY = 20
+    
+    def __init__(self, bot: 'EventBot', path: str, workers: int, rate: float, logger: logging.Logger):
+        self.bot = bot
+        self.path = path
+        self.workers = workers
+        self.rate = rate
+        self.logger = logger
+        self.last_stats: Dict[str, Any] = {}
+        self._journal: Dict[str, Any] = {}
+    
+    def _load_journal(self) -> Dict[str, Any]:
+        try:
+            with open(self.path, encoding='utf-8') as journal_file:
+                return json.load(journal_file)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            self.logger.error(f"Erreur lecture du journal des rappels: {e}")
+            return {}
+    
+    def _write_journal(self) -> None:
+        try:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as journal_file:
+                json.dump(self._journal, journal_file)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            self.logger.error(f"Erreur écriture du journal des rappels: {e}")
+    
+    def is_unfinished(self, key: str) -> bool:
+        """Vrai si l'envoi `key` a été interrompu (arrêt ou crash)"""
+        journal = self._load_journal()
+        return journal.get('key') == key and not journal.get('done', False)
+    
+    async def collect_recipients(self) -> Set[int]:
+        """Membres ayant répondu "Oui" (ou "En retard") dans les sondages du jour"""
+        attendance = self.bot.attendance
+        recipients: Set[int] = set()
+        for message in list(self.bot.state.poll_messages.values()):
+            if message.id in attendance.questions:
+                recipients.update(user_id for user_id, entry in attendance.responses.get(message.id, {}).items()
+                                  if entry.get('status') in ('yes', 'late'))
+                continue
+            try:
+                fetched = await self.bot.resilience.call('messages.fetch', lambda m=message: m.fetch())
+                poll = fetched.poll
+                if poll is None:
+                    continue
+                for answer in poll.answers:
+                    if answer.text == "Oui":
+                        async for voter in answer.voters(limit=None):
+                            recipients.add(voter.id)
+            except discord.DiscordException as e:
+                self.logger.error(f"Erreur lecture des votes du sondage {message.id}: {e}")
+        if self.bot.user is not None:
+            recipients.discard(self.bot.user.id)
+        return recipients
+    
+    async def run(self, key: str, content: str) -> Dict[str, Any]:
+        """Envoie (ou reprend) les rappels identifiés par `key` (la date du jour)"""
+        journal = self._load_journal()
+        if journal.get('key') == key and journal.get('done'):
+            self.logger.info(f"Rappels {key} déjà envoyés")
+            return self.last_stats
+        if journal.get('key') == key:
+            self.logger.info(f"Reprise des rappels {key} interrompus")
+            recipients = set(journal.get('recipients', []))
+        else:
+            recipients = await self.collect_recipients()
+            journal = {'key': key, 'recipients': sorted(recipients), 'delivered': [], 'refused': [],
+                       'ambiguous': [], 'done': False}
+        self._journal = journal
+        self._write_journal()
+        
+        # Issue inconnue (erreur après envoi possible) : jamais rejouée, pour éviter les doublons
+        journal.setdefault('ambiguous', [])
+        handled = set(journal['delivered']) | set(journal['refused']) | set(journal['ambiguous'])
+        queue: asyncio.Queue = asyncio.Queue()
+        for user_id in sorted(recipients - handled):
+            queue.put_nowait(user_id)
+        
+        stats = {'key': key, 'total': len(recipients), 'skipped': len(handled),
+                 'sent': 0, 'refused': 0, 'ambiguous': 0, 'failed': 0}
+        bucket = TokenBucket(self.rate)
+        started = time.perf_counter()
+        unsaved = 0
+        
+        async def _worker() -> None:
+            nonlocal unsaved
+            while True:
+                try:
+                    user_id = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                await bucket.acquire()
+                outcome = await self._deliver(user_id, content)
+                stats[outcome] += 1
+                if outcome != 'failed':
+                    journal['delivered' if outcome == 'sent' else outcome].append(user_id)
+                    unsaved += 1
+                    if unsaved >= self.JOURNAL_EVERY:
+                        unsaved = 0
+                        self._write_journal()
+        
+        try:
+            await asyncio.gather(*(_worker() for _ in range(max(1, self.workers))))
+            journal['done'] = True
+        finally:
+            # Écrit aussi en cas d'annulation : la reprise n'enverra que les rappels manquants
+            self._write_journal()
+            stats['duration'] = round(time.perf_counter() - started, 1)
+            self.last_stats = stats
+            self.bot.state.touch()
+            self.logger.info(f"Rappels {key}: {stats['sent']} envoyé(s), {stats['refused']} refusé(s), "
+                             f"{stats['ambiguous']} incertain(s), {stats['failed']} échec(s), "
+                             f"{stats['skipped']} déjà traité(s) "
+                             f"sur {stats['total']} en {stats['duration']}s")
+        return stats
+    
+    async def _deliver(self, user_id: int, content: str) -> str:
+        """Envoie un rappel ; 'sent', 'refused' (MP fermés), 'ambiguous' (a pu être reçu, jamais
+        rejoué) ou 'failed' (non envoyé, rejoué à la reprise)"""
+        try:
+            if not self.bot.write_allowed():
+                raise NotLeaderError()
+            user = self.bot.get_user(user_id) or await self.bot.fetch_user(user_id)
+        except discord.DiscordException as e:
+            self.logger.warning(f"Rappel non envoyé à {user_id}: {e}")
+            return 'failed'
+        try:
+            # Les 429 sont rejoués après le délai demandé ; pas de nouvel essai sur erreur ambiguë :
+            # un rappel manqué vaut mieux qu'un doublon
+            await self.bot.resilience.call('dm.send', lambda: user.send(content), idempotent=False)
+            return 'sent'
+        except discord.Forbidden:
+            return 'refused'
+        except Exception as e:
+            if ResilienceManager.is_ambiguous(e):
+                self.logger.warning(f"Rappel à {user_id} peut-être reçu, non rejoué: {e}")
+                return 'ambiguous'
+            if not isinstance(e, discord.DiscordException):
+                raise
+            self.logger.warning(f"Rappel non envoyé à {user_id}: {e}")
+            return 'failed'
+    
+    def describe(self) -> str:
+        """Résumé du dernier envoi pour !status"""
+        stats = self.last_stats
+        if not stats:
+            return "Aucun envoi"
+        return (f"{stats['key']} — {stats['sent']} envoyé(s), {stats['refused']} MP fermé(s), "
+                f"{stats.get('ambiguous', 0)} incertain(s), {stats['failed']} échec(s) / {stats['total']} "
+                f"({stats['duration']}s)")
+
+class EventBot(commands.Bot):
+    """Bot Discord principal avec logique métier"""
+    
+    def __init__(self):
+        # Chargement de la configuration
+        load_dotenv()
+        self.config = self._load_configuration()
+        self.logger = LoggerManager.setup_logging()
+        self.tz = ZoneInfo(self.config.timezone)
+        self.time_renderer = TimezoneRenderer(self.config.display_timezones)
+        
+        # Initialisation du bot
+        intents = discord.Intents.default()
+        # Les commandes slash se passent du contenu des messages : sans cet intent le gateway
+        # n'envoie plus le texte de chaque message du serveur (le bot lit toujours les siens)
+        intents.message_content = self.config.prefix_commands
+        prefix = commands.when_mentioned_or('!') if self.config.prefix_commands else commands.when_mentioned
+        # Les trames gateway brutes ne sont émises qu'en mode enregistrement
+        super().__init__(command_prefix=prefix, intents=intents, tree_cls=EventCommandTree,
+                         enable_debug_events=self.config.cassette_mode == 'record')
+        
+        # Gestionnaires
+        self.kinds = EventKindRegistry(self.config.event_kinds())
+        self.state = BotState()
+        self.resilience = ResilienceManager(
+            self.logger,
+            RetryPolicy(self.config.retry_max_attempts, self.config.retry_base_delay,
+                        self.config.retry_max_delay),
+            self.config.breaker_failure_threshold,
+            self.config.breaker_reset_timeout
+        )
+        self.lease: Optional[LeaderLease] = None
+        if self.config.ha_lease_file:
+            self.lease = LeaderLease(self.config.ha_lease_file, f"{socket.gethostname()}:{os.getpid()}",
+                                     self.config.ha_lease_ttl, self.logger)
+        self.event_manager = EventManager(self, self.config, self.logger, self.resilience)
+        self.auto_events: Optional[EventAutoCreator] = None
+        templates = []
+        for template in self.config.event_templates:
+            if template.kind in self.kinds:
+                templates.append(template)
+            else:
+                self.logger.warning(f"Modèle '{template.name}' ignoré: type d'événement inconnu '{template.kind}'")
+        if templates:
+            self.auto_events = EventAutoCreator(self, templates, self.config.auto_create_weeks,
+                                                self.config.fanout_concurrency, self.config.auto_create_file,
+                                                self.logger)
+        self.message_manager = MessageManager(self, self.logger, self.resilience,
+                                              self.config.fanout_concurrency, self.write_allowed)
+        # Tâches de maintenance différées pendant une dégradation de Discord
+        self.deferred_maintenance: Dict[str, Callable[[], Awaitable[Any]]] = {}
+        self.flights = SingleFlight(self.logger)
+        # Minuteurs des notifications par événement
+        self.deadlines = DeadlineQueue(self.logger)
+        # Réponses de /status et /events, rendues à nouveau seulement si l'état change
+        self.render_cache = RenderCache()
+        # Mise à jour hebdomadaire préparée à l'avance
+        self.staged_update: Optional[StagedUpdate] = None
+        self.shutdown = ShutdownCoordinator(self, self.logger, self.config.shutdown_drain_timeout)
+        self.dashboard: Optional[StatusDashboard] = None
+        self.calendar = CalendarFeed(self.logger)
+        self.event_index = EventSearchIndex()
+        # Occurrences des séries récurrentes, développées à la demande sur une fenêtre bornée
+        self.occurrences = OccurrenceCache(self.tz)
+        self.archive: Optional[EventArchive] = None
+        if self.config.archive_file:
+            self.archive = EventArchive(self.config.archive_file, self.config.archive_retention_days, self.logger)
+        self.attendance = AttendanceTracker(self.config.attendance_file, self.config.attendance_flush_delay,
+                                            self.config.attendance_roles, self.logger)
+        # Messages de présence dont le contenu doit être rafraîchi (regroupés par fenêtre)
+        self._attendance_refresh: Dict[int, discord.Message] = {}
+        self._attendance_refresh_task: Optional[asyncio.Task] = None
+        # Types dont les liens sont à réconcilier après des modifications d'événements (None = rien)
+        self._pending_reconcile: Optional[Set[str]] = None
+        self._reconcile_task: Optional[asyncio.Task] = None
+        self.reminders = ReminderDispatcher(self, self.config.reminder_journal, self.config.reminder_workers,
+                                            self.config.reminder_rate, self.logger)
+        self._reminder_task: Optional[asyncio.Task] = None
+        self.memory_guard: Optional[MemoryGuard] = None
+        if self.config.memory_guard_minutes:
+            self.memory_guard = MemoryGuard(self.config.memory_budget_mb, self.logger,
+                                            self.trim_caches, self.shutdown.request_shutdown)
+        self.profiler = EventLoopProfiler(self.config.profile_dir, self.config.profile_interval_ms,
+                                          self.config.slow_callback_ms, self.logger)
+        if self.config.dashboard_port:
+            self.dashboard = StatusDashboard(self, self.config.dashboard_host,
+                                             self.config.dashboard_port, self.logger)
+            self.dashboard.app.router.add_get('/calendar.ics', self._serve_calendar)
+        self.add_check(self._accepting_commands)
+        
+        # Topologie gateway / workers (file de travaux locale sur socket Unix)
+        self.job_queue: Optional[JobQueueServer] = None
+        self.job_client: Optional[JobQueueClient] = None
+        self.job_client_task: Optional[asyncio.Task] = None
+        # Serveur géré récupéré par REST (worker sans cache gateway)
+        self.remote_guild: Optional[discord.Guild] = None
+        self._worker_ready = asyncio.Event()
+        if self.config.process_role and self.config.attendance_mode == 'buttons':
+            # Clics reçus par le gateway, messages créés par un worker : un seul fichier de présences
+            # ne peut pas être partagé entre les deux processus
+            self.logger.warning("ATTENDANCE_MODE=buttons non pris en charge avec PROCESS_ROLE: sondages utilisés")
+            self.config.attendance_mode = 'poll'
+        if self.config.process_role == 'gateway':
+            self.job_queue = JobQueueServer(self.config.ipc_socket, self.logger)
+        elif self.config.process_role == 'worker':
+            self.job_client = JobQueueClient(self.config.ipc_socket, self.handle_job,
+                                             self.config.worker_concurrency, self.logger)
+        
+        # Enregistrement du trafic (le rejeu est piloté par run_replay)
+        self.cassette: Optional[CassetteRecorder] = None
+        if self.config.cassette_mode == 'record':
+            self.cassette = CassetteRecorder(self.config.cassette_path, self.logger)
+            self.cassette.attach(self)
+        
+        self.logger.info("Bot initialisé avec succès")
+    
+    def _load_configuration(self) -> BotConfiguration:
+        """Charge la configuration depuis les variables d'environnement"""
+        required_vars = ['TOKEN_DISCORD', 'CHANNEL_ID_DP', 'CHANNEL_ID_BOSS', 'CHANNEL_ID_SIEGE']
+        
+        for var in required_vars:
+            if not os.getenv(var):
+                raise ValueError(f"Variable d'environnement manquante: {var}")
+        
+        return BotConfiguration(
+            discord_token=os.getenv('TOKEN_DISCORD'),
+            channel_dp=int(os.getenv('CHANNEL_ID_DP')),
+            channel_boss=int(os.getenv('CHANNEL_ID_BOSS')),
+            channel_siege=int(os.getenv('CHANNEL_ID_SIEGE')),
+            dp_channels=self._parse_channel_group(os.getenv('CHANNEL_GROUP_DP')),
+            boss_channels=self._parse_channel_group(os.getenv('CHANNEL_GROUP_BOSS')),
+            siege_channels=self._parse_channel_group(os.getenv('CHANNEL_GROUP_SIEGE')),
+            fanout_concurrency=int(os.getenv('FANOUT_CONCURRENCY', '5')),
+            retry_max_attempts=int(os.getenv('RETRY_MAX_ATTEMPTS', '4')),
+            breaker_failure_threshold=int(os.getenv('BREAKER_FAILURE_THRESHOLD', '5')),
+            breaker_reset_timeout=float(os.getenv('BREAKER_RESET_SECONDS', '60')),
+            cassette_mode=os.getenv('DISCORD_CASSETTE_MODE', ''),
+            cassette_path=os.getenv('DISCORD_CASSETTE_PATH', 'discord-cassette.jsonl.gz'),
+            cassette_speed=float(os.getenv('DISCORD_CASSETTE_SPEED', '1.0')),
+            state_file=os.getenv('BOT_STATE_FILE', '/home/discord/discord-bot-state.json'),
+            shutdown_drain_timeout=float(os.getenv('SHUTDOWN_DRAIN_TIMEOUT', '25')),
+            display_timezones=self._parse_display_timezones(os.getenv('DISPLAY_TIMEZONES')),
+            dashboard_host=os.getenv('DASHBOARD_HOST', '127.0.0.1'),
+            dashboard_port=int(os.getenv('DASHBOARD_PORT', '0')),
+            calendar_url=os.getenv('CALENDAR_URL', ''),
+            prefix_commands=os.getenv('PREFIX_COMMANDS', '').lower() in ('1', 'true', 'yes'),
+            command_guild_id=int(os.getenv('COMMAND_GUILD_ID', '0')),
+            command_sync_file=os.getenv('COMMAND_SYNC_FILE', '/home/discord/discord-bot-commands.sha256'),
+            attendance_mode=os.getenv('ATTENDANCE_MODE', 'poll'),
+            attendance_roles=[role.strip() for role in os.getenv('ATTENDANCE_ROLES', '').split(',') if role.strip()],
+            attendance_file=os.getenv('ATTENDANCE_FILE', '/home/discord/discord-bot-attendance.json'),
+            attendance_flush_delay=float(os.getenv('ATTENDANCE_FLUSH_SECONDS', '2')),
+            reminder_minutes=int(os.getenv('REMINDER_MINUTES_BEFORE', '0')),
+            reminder_workers=int(os.getenv('REMINDER_WORKERS', '4')),
+            reminder_rate=float(os.getenv('REMINDER_RATE', '2')),
+            reminder_journal=os.getenv('REMINDER_JOURNAL', '/home/discord/discord-bot-reminders.json'),
+            profile_dir=os.getenv('PROFILE_DIR', '/home/discord/profiles'),
+            profile_on_start=float(os.getenv('PROFILE_ON_START', '0')),
+            profile_interval_ms=float(os.getenv('PROFILE_INTERVAL_MS', '5')),
+            slow_callback_ms=float(os.getenv('SLOW_CALLBACK_MS', '100')),
+            memory_guard_minutes=int(os.getenv('MEMORY_GUARD_MINUTES', '0')),
+            memory_budget_mb=int(os.getenv('MEMORY_BUDGET_MB', '0')),
+            extra_kinds=self._load_event_kinds(os.getenv('EVENT_KINDS_FILE')),
+            event_templates=self._load_event_templates(os.getenv('EVENT_TEMPLATES_FILE')),
+            auto_create_weeks=int(os.getenv('AUTO_CREATE_WEEKS', '2')),
+            auto_create_file=os.getenv('AUTO_CREATE_FILE', '/home/discord/discord-bot-created-events.json'),
+            ha_lease_file=os.getenv('HA_LEASE_FILE', ''),
+            ha_lease_ttl=float(os.getenv('HA_LEASE_TTL', '10')),
+            process_role=os.getenv('PROCESS_ROLE', ''),
+            ipc_socket=os.getenv('IPC_SOCKET', '/home/discord/discord-bot-jobs.sock'),
+            worker_concurrency=int(os.getenv('WORKER_CONCURRENCY', '4')),
+            worker_scheduler=os.getenv('WORKER_SCHEDULER', '0').lower() in ('1', 'true', 'yes'),
+            archive_file=os.getenv('EVENT_ARCHIVE_FILE', '/home/discord/discord-bot-events.jsonl'),
+            archive_retention_days=int(os.getenv('EVENT_ARCHIVE_RETENTION_DAYS', '90')),
+            reconcile_debounce=float(os.getenv('RECONCILE_DEBOUNCE_SECONDS', '5')),
+            event_notify_offset=self._parse_optional_int(os.getenv('EVENT_NOTIFY_OFFSET_MINUTES'))
+        )
+    
+    @staticmethod
+    def _parse_optional_int(value: Optional[str]) -> Optional[int]:
+        """Entier optionnel : variable absente ou vide -> None"""
+        return int(value) if value else None
+    
+    @staticmethod
+    def _parse_channel_group(value: Optional[str]) -> List[int]:
+        """Convertit une liste d'IDs séparés par des virgules ("123,456")"""
+        if not value:
+            return []
+        return [int(part) for part in value.split(',') if part.strip()]
+    
+    @staticmethod
+    def _load_event_kinds(path: Optional[str]) -> List[EventKind]:
+        """Charge les types d'événements supplémentaires depuis un fichier JSON (liste d'objets)"""
+        if not path:
+            return []
+        with open(path, encoding='utf-8') as kinds_file:
+            declared = json.load(kinds_file)
+        
+        kinds = []
+        for entry in declared:
+            try:
+                slot = entry.get('notification_time')
+                kinds.append(EventKind(
+                    name=entry['name'],
+                    weekdays=[int(day) for day in entry['weekdays']],
+                    keywords=list(entry['keywords']),
+                    template=entry['template'],
+                    channels=[int(cid) for cid in entry['channels']],
+                    notification_slot=tuple(int(part) for part in slot.split(':')) if slot else None,
+                    marker=entry.get('marker', ""),
+                    group_by_day=bool(entry.get('group_by_day', False)),
+                ))
+            except (KeyError, TypeError, ValueError) as e:
+                raise ValueError(f"Type d'événement invalide dans {path}: {entry!r} ({e})")
+        return kinds
+    
+    @staticmethod
+    def _load_event_templates(path: Optional[str]) -> List[EventTemplate]:
+        """Charge les définitions des événements hebdomadaires à créer (liste d'objets JSON)"""
+        if not path:
+            return []
+        with open(path, encoding='utf-8') as templates_file:
+            declared = json.load(templates_file)
+        
+        templates = []
+        for entry in declared:
+            try:
+                templates.append(EventTemplate(
+                    kind=entry['kind'],
+                    name=entry['name'],
+                    weekday=int(entry['weekday']),
+                    time=tuple(int(part) for part in entry['time'].split(':')),
+                    duration=timedelta(minutes=int(entry.get('duration', 60))),
+                    location=entry['location'],
+                    description=entry.get('description', ""),
+                    id=str(entry.get('id', "")),
+                ))
+            except (KeyError, TypeError, ValueError) as e:
+                raise ValueError(f"Modèle d'événement invalide dans {path}: {entry!r} ({e})")
+        return templates
+    
+    @staticmethod
+    def _parse_display_timezones(value: Optional[str]) -> List[Tuple[str, str]]:
+        """Convertit une liste "libellé=fuseau" séparée par des points-virgules"""
+        if not value:
+            return []
+        zones = []
+        for entry in value.split(';'):
+            if '=' in entry:
+                label, key = entry.split('=', 1)
+                zones.append((label.strip(), key.strip()))
+        return zones
+    
+    def get_current_time(self) -> datetime:
+        """Retourne l'heure actuelle dans le timezone configuré"""
+        return datetime.now(self.tz)
+    
+    def poll_event_start(self) -> datetime:
+        """Heure de début du Donjon Party du jour"""
+        hour, minute = self.config.poll_event_time
+        return self.get_current_time().replace(hour=hour, minute=minute, second=0, microsecond=0)
+    
+    def poll_question(self) -> str:
+        """Question du sondage du jour, horaire rendu dans les fuseaux d'affichage"""
+        return self.config.poll_question.format(times=self.time_renderer.render(self.poll_event_start()))
+    
+    async def setup_hook(self) -> None:
+        """Configuration initiale du bot"""
+        self.logger.info("Configuration du bot...")
+        if self.config.profile_on_start:
+            self.profiler.start(self.config.profile_on_start)
+        self.shutdown.install_signal_handlers()
+        self.load_state()
+        self.attendance.load()
+        if self.archive is not None:
+            self.archive.load()
+        if self.auto_events is not None:
+            self.auto_events.load()
+        role = self.config.process_role
+        if role == 'worker':
+            # Sans gateway : la récupération et le cache attendent le serveur transmis par le gateway
+            self.job_client_task = asyncio.create_task(self.job_client.run(self._should_consume_jobs))
+        else:
+            # Vue persistante : les boutons des messages existants restent actifs après un redémarrage
+            self.add_view(AttendanceView(self.attendance, self.schedule_attendance_refresh))
+            await self.sync_command_tree()
+            await self.recover_existing_messages()
+            await self.update_events_cache()
+            await self.ensure_scheduled_events()
+        
+        # Démarrage des tâches automatiques (le gateway les laisse aux workers)
+        if role != 'gateway':
+            self.start_background_tasks()
+        
+        if self.dashboard is not None:
+            try:
+                await self.dashboard.start()
+            except OSError as e:
+                self.logger.error(f"Impossible de démarrer le tableau de bord: {e}")
+    
+    def scheduler_enabled(self) -> bool:
+        """Un worker n'exécute le planificateur que s'il est désigné (WORKER_SCHEDULER) ou en mode HA :
+        plusieurs workers planificateurs publieraient chaque sondage et notification plusieurs fois"""
+        return self.config.process_role != 'worker' or self.config.worker_scheduler or self.lease is not None
+    
+    def start_background_tasks(self) -> None:
+        """Planificateur, préparation hebdomadaire, surveillance mémoire et bail de leader"""
+        if not self.scheduler_enabled():
+            self.logger.warning("Planificateur désactivé sur ce worker (WORKER_SCHEDULER=1 sur un seul worker, "
+                                "ou HA_LEASE_FILE)")
+        else:
+            if not self.schedule_checker.is_running():
+                self.schedule_checker.start()
+                self.logger.info("Planificateur démarré")
+            if not self.staging_refresher.is_running():
+                self.staging_refresher.start()
+            if self.config.event_notify_offset is not None:
+                self.deadlines.start()
+                self.arm_event_timers()
+        if self.memory_guard is not None and not self.memory_guard_loop.is_running():
+            self.memory_guard.start()
+            self.memory_guard_loop.change_interval(minutes=self.config.memory_guard_minutes)
+            self.memory_guard_loop.start()
+        
+        if self.lease is None:
+            # Rappels repris par le seul processus planificateur
+            if self.scheduler_enabled():
+                self.resume_interrupted_work()
+        elif not self.lease_keeper.is_running():
+            # Renouvellement au tiers de la durée du bail
+            self.lease_keeper.change_interval(seconds=self.config.ha_lease_ttl / 3)
+            self.lease_keeper.start()
+    
+    def resume_interrupted_work(self) -> None:
+        """Reprend les rappels interrompus par un arrêt, si l'événement n'a pas commencé"""
+        today = self.get_current_time().date()
+        if (self.config.reminder_minutes and self.get_current_time() < self.poll_event_start()
+                and self.reminders.is_unfinished(today.isoformat())):
+            self.start_reminders(today)
+    
+    # ======================== GATEWAY / WORKERS ========================
+    
+    # Commandes exécutées par les workers en mode gateway (les autres restent locales)
+    FORWARDED_COMMANDS = frozenset({
+        'events', 'force_poll', 'notify', 'force_boss', 'force_siege', 'update_all_links',
+        'update_events', 'update_links', 'update_boss_links', 'update_siege_links', 'recover', 'create_events'
+    })
+    
+    def primary_guild(self) -> Optional[discord.Guild]:
+        """Serveur géré : cache gateway, ou serveur récupéré par REST en mode worker"""
+        return self.guilds[0] if self.guilds else self.remote_guild
+    
+    def resolve_channel(self, channel_id: int) -> Optional[discord.abc.Messageable]:
+        """Canal du cache gateway ; un worker sans cache utilise un canal partiel (REST)"""
+        channel = self.get_channel(channel_id)
+        if channel is None and self.config.process_role == 'worker':
+            channel = self.get_partial_messageable(channel_id)
+        return channel
+    
+    async def wait_until_ready(self) -> None:
+        """Un worker n'a pas de gateway : il est prêt dès que le serveur géré est connu"""
+        if self.config.process_role == 'worker':
+            await self._worker_ready.wait()
+        else:
+            await super().wait_until_ready()
+    
+    async def start_job_queue(self) -> None:
+        """Ouvre la file aux workers une fois le serveur géré connu (premier on_ready)"""
+        if self.job_queue is None or self.job_queue.is_serving or not self.guilds:
+            return
+        self.job_queue.hello = {'guild_id': self.guilds[0].id}
+        try:
+            await self.job_queue.start()
+        except OSError as e:
+            self.logger.error(f"Impossible d'ouvrir la file de travaux: {e}")
+    
+    def _should_consume_jobs(self) -> bool:
+        # Un worker en attente du bail laisse les travaux au leader
+        return self.shutdown.accepting and self.is_leader()
+    
+    async def route_interaction(self, interaction: discord.Interaction) -> bool:
+        """Transmet les commandes lourdes aux workers (mode gateway) ; True pour une exécution locale"""
+        command = interaction.command
+        if (self.job_queue is None or not self.shutdown.accepting
+                or interaction.type != discord.InteractionType.application_command
+                or command is None or command.name not in self.FORWARDED_COMMANDS
+                or not interaction.permissions.administrator):
+            # Refus éventuels (droits, arrêt) laissés aux vérifications locales
+            return True
+        await interaction.response.defer(thinking=True)
+        # Les commandes répondent ou publient : une commande commencée n'est jamais rejouée
+        submitted = self.job_queue.submit({
+            'type': 'command',
+            'at_most_once': True,
+            'name': command.name,
+            'options': {name: value for name, value in interaction.namespace},
+            'application_id': interaction.application_id,
+            'token': interaction.token,
+            'author': str(interaction.user),
+            'permissions': interaction.permissions.value
+        })
+        if not submitted:
+            await interaction.followup.send("❌ File de travaux saturée, réessayez dans un instant.")
+        return False
+    
+    def handle_scheduled_event_change(self, action: str, event_id: int, name: Optional[str],
+                                      start_time: Optional[datetime]) -> None:
+        """Événement programmé créé, modifié ou supprimé : transmis aux workers, réconciliation programmée"""
+        if self.job_queue is not None:
+            self.job_queue.submit({'type': 'scheduled_event', 'action': action, 'event_id': event_id, 'name': name,
+                                   'start_time': start_time.isoformat() if start_time else None})
+        self.logger.debug(f"Événement programmé {event_id}: {action}")
+        self.schedule_reconcile(self.affected_kinds(event_id, name, start_time))
+    
+    def handle_poll_vote(self, action: str, payload: discord.RawPollVoteActionEvent) -> None:
+        """Vote de sondage : traité localement, y compris en mode gateway (le décompte est tenu par le
+        cache de messages de la connexion qui reçoit le vote ; rien à transmettre aux workers)"""
+        self.logger.debug(f"Vote {action} sur le sondage {payload.message_id}")
+        self.state.touch()
+    
+    async def handle_job(self, job: Dict[str, Any]) -> None:
+        """Exécute un travail reçu du gateway (mode worker)"""
+        kind = job.get('type')
+        if kind == 'hello':
+            await self._on_gateway_hello(job['guild_id'])
+        elif kind == 'scheduled_event':
+            start_time = datetime.fromisoformat(job['start_time']) if job.get('start_time') else None
+            self.handle_scheduled_event_change(job['action'], job['event_id'], job.get('name'), start_time)
+        elif kind == 'command':
+            await self._run_remote_command(job)
+        else:
+            self.logger.warning(f"Travail inconnu ignoré: {kind}")
+    
+    async def _on_gateway_hello(self, guild_id: int) -> None:
+        if self.remote_guild is not None and self.remote_guild.id == guild_id:
+            return
+        self.remote_guild = await self.resilience.call('guilds.fetch', lambda: self.fetch_guild(guild_id))
+        self.logger.info(f"Serveur géré (REST): {self.remote_guild.name}")
+        await self.recover_existing_messages()
+        await self.update_events_cache()
+        await self.ensure_scheduled_events()
+        self._worker_ready.set()
+    
+    async def _run_remote_command(self, job: Dict[str, Any]) -> None:
+        command = self.get_command(job['name'])
+        if command is None:
+            self.logger.warning(f"Commande transmise inconnue: {job['name']}")
+            return
+        self.logger.info(f"Commande transmise: {job['name']} par {job.get('author')}")
+        ctx = RemoteContext(self, job, command)
+        try:
+            # Les vérifications sont rejouées ici : le worker ne se fie pas au seul routage du gateway
+            if not await command.can_run(ctx):
+                raise commands.CheckFailure(f"Vérifications refusées pour {job['name']}")
+            await command.callback(self, ctx, **job.get('options', {}))
+        except commands.MissingPermissions:
+            self.logger.warning(f"Commande transmise {job['name']} refusée: permissions insuffisantes")
+            await ctx.send("❌ Permissions insuffisantes.")
+        except commands.CheckFailure as e:
+            self.logger.warning(f"Commande transmise {job['name']} refusée: {e}")
+            await ctx.send("❌ Commande refusée.")
+        except Exception as e:
+            self.logger.error(f"Erreur commande transmise {job['name']}: {e}")
+            await ctx.send("❌ Une erreur inattendue s'est produite.")
+    
+    # ======================== HAUTE DISPONIBILITÉ ========================
+    
+    def is_leader(self) -> bool:
+        """Vrai si cette instance exécute les travaux (toujours vrai sans mode haute disponibilité)"""
+        return self.lease is None or self.lease.is_leader
+    
+    def write_allowed(self) -> bool:
+        """Vérifie le jeton de fencing juste avant une écriture vers Discord"""
+        return self.lease is None or self.lease.validate()
+    
+    # Au-delà, une exécution interrompue n'est plus reprise (notification ou sondage périmés)
+    CLAIM_RESUME_WINDOW = timedelta(hours=1)
+    
+    def _due(self, action: str, value: Union[date, datetime]) -> bool:
+        """Vrai si l'action n'a pas encore été exécutée pour `value` ; en mode HA, l'exécution est
+        réservée pour l'ensemble des répliques et doit être terminée par `_finish`"""
+        if self.state.get_last_execution(action) == value:
+            return False
+        return self.lease is None or self.lease.claim(action, value.isoformat())
+    
+    def _finish(self, action: str, value: Union[date, datetime], ok: bool = True) -> None:
+        """Termine une exécution réservée par `_due` ; en échec, la réservation est reprise plus tard"""
+        if ok:
+            self.state.update_last_execution(action, value)
+            if self.lease is not None:
+                self.lease.complete(action, value.isoformat())
+        elif self.lease is not None:
+            self.logger.warning(f"Exécution '{action}' ({value.isoformat()}) en échec: reprise prévue")
+            self.lease.abandon(action, value.isoformat())
+    
+    async def resume_pending_claims(self, history_checked: bool = False) -> None:
+        """Reprend les exécutions réservées mais non terminées : leader précédent arrêté entre la
+        réservation et l'envoi, ou envoi en échec. L'historique des canaux est relu d'abord"""
+        if self.lease is None or not self.is_leader() or self.resilience.is_degraded():
+            return
+        pending = self.lease.pending()
+        if not pending:
+            return
+        if not history_checked:
+            await self.recover_existing_messages()
+        now = self.get_current_time()
+        for action, raw_value in pending:
+            if not self.lease.claim(action, raw_value, resume=True):
+                continue
+            value = datetime.fromisoformat(raw_value) if 'T' in raw_value else date.fromisoformat(raw_value)
+            try:
+                ok = await self._resume_claim(action, value, now)
+            except Exception as e:
+                self.logger.error(f"Erreur reprise de '{action}' ({raw_value}): {e}")
+                ok = False
+            self._finish(action, value, ok)
+    
+    async def _resume_claim(self, action: str, value: Union[date, datetime], now: datetime) -> bool:
+        """Rejoue une exécution interrompue si elle n'apparaît pas dans l'historique récupéré ;
+        True si elle est terminée (ou trop ancienne pour être reprise)"""
+        if isinstance(value, datetime):
+            name = action[:-len('_event')]
+            if not action.endswith('_event') or name not in self.kinds or now - value > self.CLAIM_RESUME_WINDOW:
+                self.logger.warning(f"Exécution interrompue '{action}' ({value.isoformat()}) non reprise")
+                return True
+            kind = self.kinds[name]
+            if any(kind.notification_marker(message.channel.id, value.date()) in message.content
+                   for message in self.state.kind_state(name).notification_messages):
+                return True
+            self.logger.info(f"Reprise de la notification {name} ({value.isoformat()})")
+            results = await self.send_notification(name)
+            return any(result.ok for result in results.values())
+        
+        if value != now.date():
+            self.logger.warning(f"Exécution interrompue '{action}' ({value.isoformat()}) non reprise")
+            return True
+        self.logger.info(f"Reprise de l'exécution interrompue '{action}' ({value.isoformat()})")
+        if action == 'poll_creation':
+            if self.state.poll_messages:
+                return True
+            results = await self.create_daily_poll()
+            return any(result.ok for result in results.values())
+        if action == 'poll_deletion':
+            await self.delete_poll_messages()
+        elif action == 'reminders':
+            # Journal des rappels : les membres déjà prévenus ne le sont pas deux fois
+            self.start_reminders(value)
+        elif action == 'weekly_update':
+            week_start = self.current_week_start(now)
+            await self.run_maintenance('weekly_update', lambda: self.weekly_update(week_start))
+        return True
+    
+    @tasks.loop(seconds=5)
+    async def lease_keeper(self) -> None:
+        """Renouvelle le bail de leader ; la réplique qui le prend reprend les travaux"""
+        was_leader = self.lease.is_leader
+        is_leader = self.lease.try_acquire()
+        if is_leader and not was_leader:
+            self.logger.warning(f"Bail de leader acquis (jeton {self.lease.token})")
+            self.state.touch()
+            # Les messages publiés par l'ancien leader sont retrouvés dans l'historique
+            await self.recover_existing_messages()
+            self.resume_interrupted_work()
+            await self.resume_pending_claims(history_checked=True)
+        elif was_leader and not is_leader:
+            self.logger.warning("Bail de leader perdu: passage en attente")
+            self.state.touch()
+    
+    @lease_keeper.before_loop
+    async def before_lease_keeper(self) -> None:
+        """Attendre que le bot soit prêt (un worker ne devient prêt qu'une fois leader)"""
+        if self.config.process_role != 'worker':
+            await self.wait_until_ready()
+    
+    def calendar_link(self) -> Optional[str]:
+        """Adresse du flux iCal, None si le serveur local est désactivé"""
+        if self.config.calendar_url:
+            return self.config.calendar_url
+        if self.dashboard is None:
+            return None
+        return f"http://{self.config.dashboard_host}:{self.config.dashboard_port}/calendar.ics"
+    
+    async def _serve_calendar(self, request: web.Request) -> web.Response:
+        """Sert le flux iCal depuis le cache (aucun appel à Discord)"""
+        self.calendar.update(self.state.cached_events, self.state.events_version)
+        headers = self.calendar.headers()
+        if self.calendar.is_fresh(request.headers):
+            return web.Response(status=304, headers=headers)
+        return web.Response(body=self.calendar.body, content_type='text/calendar', charset='utf-8', headers=headers)
+    
+    async def sync_command_tree(self) -> bool:
+        """Synchronise les commandes slash uniquement si leur définition a changé"""
+        guild = discord.Object(id=self.config.command_guild_id) if self.config.command_guild_id else None
+        if guild is not None:
+            # Synchronisation sur le serveur : propagation immédiate
+            self.tree.copy_global_to(guild=guild)
+        
+        payload = sorted((command.to_dict(self.tree) for command in self.tree.get_commands(guild=guild)),
+                         key=lambda command: command['name'])
+        digest = hashlib.sha256(
+            json.dumps([self.config.command_guild_id, payload], sort_keys=True, default=str).encode()
+        ).hexdigest()
+        
+        try:
+            with open(self.config.command_sync_file, encoding='utf-8') as sync_file:
+                if sync_file.read().strip() == digest:
+                    self.logger.info("Commandes slash inchangées, synchronisation ignorée")
+                    return False
+        except OSError:
+            pass
+        
+        try:
+            synced = await self.tree.sync(guild=guild)
+        except discord.HTTPException as e:
+            self.logger.error(f"Erreur synchronisation des commandes slash: {e}")
+            return False
+        
+        try:
+            with open(self.config.command_sync_file, 'w', encoding='utf-8') as sync_file:
+                sync_file.write(digest)
+        except OSError as e:
+            self.logger.error(f"Erreur écriture empreinte des commandes: {e}")
+        self.logger.info(f"{len(synced)} commande(s) slash synchronisée(s)")
+        return True
+    
+    async def _accepting_commands(self, ctx: commands.Context) -> bool:
+        """Refuse les nouvelles commandes pendant l'arrêt gracieux et sur les répliques en attente"""
+        return self.shutdown.accepting and self.is_leader()
+    
+    # ======================== PERSISTANCE DE L'ÉTAT ========================
+    
+    def save_state(self) -> None:
+        """Écrit l'état sur disque de manière atomique (fichier temporaire puis remplacement)"""
+        try:
+            tmp_path = f"{self.config.state_file}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as state_file:
+                json.dump(self.state.to_dict(), state_file)
+            os.replace(tmp_path, self.config.state_file)
+            self.logger.info(f"État sauvegardé dans {self.config.state_file}")
+        except OSError as e:
+            self.logger.error(f"Erreur sauvegarde état: {e}")
+    
+    def load_state(self) -> None:
+        """Recharge l'état sauvegardé (messages suivis sous forme de messages partiels)"""
+        try:
+            with open(self.config.state_file, encoding='utf-8') as state_file:
+                data = json.load(state_file)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            self.logger.error(f"Erreur lecture état: {e}")
+            return
+        
+        self.state.restore(
+            data, lambda cid, mid: self.get_partial_messageable(cid).get_partial_message(mid)
+        )
+        self.logger.info(f"État restauré depuis {self.config.state_file}")
+    
+    # ======================== GESTION DES SONDAGES ========================
+    
+    async def create_daily_poll(self) -> Dict[int, FanOutResult]:
+        """Crée le sondage quotidien dans tous les canaux du groupe DP"""
+        async def _job() -> Dict[int, FanOutResult]:
+            async with self.flights.lock(EventType.POLL.value):
+                return await self._create_daily_poll()
+        return await self.shutdown.run_job('poll_creation', _job)
+    
+    async def _create_daily_poll(self) -> Dict[int, FanOutResult]:
+        """Supprime l'ancien sondage puis diffuse le nouveau (verrou DP détenu)"""
+        try:
+            # Suppression des anciens sondages
+            await self._delete_poll_messages()
+            channels = self.config.channels_for(EventType.POLL)
             
-            if not siege_events:
-                self.logger.info("Aucun événement siege trouvé")
-                return
-            
-            # Nettoyage des anciens messages
-            await self.message_manager.delete_messages(self.state.siege_state.event_messages)
-            await self.message_manager.delete_messages(self.state.siege_state.notification_messages)
+            # Création du nouveau sondage (tous les canaux en parallèle)
+            if self.config.attendance_mode == 'buttons':
+                poll_results = await self._send_attendance_messages(channels)
+            else:
+                poll_results = await self.message_manager.broadcast_poll(
+                    channels,
+                    self.poll_question(),
+                    timedelta(hours=8)
+                )
             
-            # Création des nouveaux messages
-            for event_data in siege_events:
-                content = self.config.siege_template.format(siege_links=event_data['link'])
-                msg = await self.message_manager.send_message(self.config.channel_siege, content)
-                if msg:
-                    self.state.siege_state.event_messages.append(msg)
-                    self.logger.info(f"Message siege créé pour: {event_data['name']}")
+            # Message d'accompagnement, envoyé après le sondage dans chaque canal
+            text_results = await self.message_manager.broadcast_message(
+                channels,
+                self.config.notification_message
+            )
             
-            self.logger.info("Mise à jour siege terminée avec succès")
+            self.state.poll_messages = {cid: r.message for cid, r in poll_results.items() if r.ok}
+            self.state.text_messages = {cid: r.message for cid, r in text_results.items() if r.ok}
+            self.state.touch()
+            self.logger.info(f"Sondage quotidien créé dans {len(self.state.poll_messages)}/{len(channels)} canal(aux)")
+            return poll_results
             
         except Exception as e:
-            self.logger.error(f"Erreur mise à jour siege: {e}")
+            self.logger.error(f"Erreur création sondage: {e}")
+            return {}
+    
+    async def _send_attendance_messages(self, channels: List[int]) -> Dict[int, FanOutResult]:
+        """Publie le message de présence à boutons dans chaque canal"""
+        question = self.poll_question()
+        results = await self.message_manager.broadcast_message(
+            channels,
+            f"{question}\n\n" + " • ".join(f"{emoji} {label} : 0" for _, label, emoji in AttendanceTracker.STATUSES),
+            AttendanceView(self.attendance)
+        )
+        for result in results.values():
+            if result.ok:
+                self.attendance.open(result.message.id, question)
+        return results
+    
+    def schedule_attendance_refresh(self, message: discord.Message) -> None:
+        """Programme la mise à jour des compteurs affichés : une modification par message et par fenêtre"""
+        self._attendance_refresh[message.id] = message
+        if self._attendance_refresh_task is None or self._attendance_refresh_task.done():
+            self._attendance_refresh_task = asyncio.create_task(self._refresh_attendance_messages())
+    
+    async def _refresh_attendance_messages(self) -> None:
+        # Les clics reçus pendant les modifications sont traités à la fenêtre suivante
+        while self._attendance_refresh:
+            await asyncio.sleep(self.config.attendance_flush_delay)
+            pending, self._attendance_refresh = self._attendance_refresh, {}
+            for message_id, message in pending.items():
+                if message_id in self.attendance.questions:
+                    await self.message_manager.edit_message(message, self.attendance.render(message_id))
+            self.state.touch()
+    
+    def reminder_slot(self) -> Tuple[int, int]:
+        """Heure d'envoi des rappels en MP (N minutes avant le Donjon Party)"""
+        send_at = self.poll_event_start() - timedelta(minutes=self.config.reminder_minutes)
+        return send_at.hour, send_at.minute
+    
+    def start_reminders(self, day: date) -> None:
+        """Lance l'envoi des rappels en tâche de fond (le planificateur n'attend pas)"""
+        if self._reminder_task is not None and not self._reminder_task.done():
+            return
+        content = self.config.reminder_message.format(times=self.time_renderer.render(self.poll_event_start()))
+        
+        async def _job() -> None:
+            await self.wait_until_ready()
+            try:
+                await self.shutdown.run_job('reminders', lambda: self.reminders.run(day.isoformat(), content))
+            except Exception as e:
+                self.logger.error(f"Erreur envoi des rappels: {e}")
+            self.state.touch()
+        
+        self._reminder_task = asyncio.create_task(_job())
+    
+    async def delete_poll_messages(self) -> None:
+        """Supprime les messages de sondage"""
+        async def _job() -> None:
+            async with self.flights.lock(EventType.POLL.value):
+                await self._delete_poll_messages()
+        await self.shutdown.run_job('poll_deletion', _job)
+    
+    async def _delete_poll_messages(self) -> None:
+        """Supprime les messages de sondage (verrou DP détenu)"""
+        messages_to_delete = list(self.state.poll_messages.values()) + list(self.state.text_messages.values())
+        
+        if messages_to_delete:
+            self.attendance.close([message.id for message in self.state.poll_messages.values()])
+            await self.message_manager.delete_messages(messages_to_delete)
+            self.state.poll_messages = {}
+            self.state.text_messages = {}
+            self.state.touch()
+    
+    # ======================== GESTION DES ÉVÉNEMENTS ========================
+    
+    async def update_events_cache(self) -> Dict[int, Dict]:
+        """Met à jour le cache des événements (appels concurrents coalescés)"""
+        return await self.flights.run('events_cache', self._update_events_cache)
+    
+    async def _update_events_cache(self) -> Dict[int, Dict]:
+        """Récupère les événements et remplace le cache"""
+        try:
+            events = await self.event_manager.get_all_events()
+            self.state.set_cached_events(events)
+            self.calendar.update(events, self.state.events_version)
+            self.event_index.sync(event['name'] for event in events.values())
+            self.occurrences.prune([event['id'] for event in events.values()])
+            self.arm_event_timers()
+            # Liste vide : échec de récupération probable, aucune suppression n'est archivée
+            if self.archive is not None and events:
+                archived = self.archive.record(events, self.get_current_time())
+                if archived:
+                    self.logger.info(f"Archive des événements: {archived} modification(s)")
+            self.logger.info(f"Cache mis à jour: {len(events)} événement(s)")
+            self.stage_weekly_update(self.next_weekly_deadline())
+            return events
+        except Exception as e:
+            self.logger.error(f"Erreur mise à jour cache: {e}")
+            return {}
+    
+    @staticmethod
+    def links_flight(kind_names: List[str]) -> str:
+        """Clé de coalescence d'une mise à jour des liens"""
+        return f"links:{','.join(sorted(kind_names))}"
     
-    async def send_notification(self, event_type: EventType) -> None:
-        """Envoie une notification pour un type d'événement"""
+    async def update_link_messages(self, kind_names: Optional[List[str]] = None) -> None:
+        """Met à jour les messages de liens des types donnés, tous par défaut (appels concurrents coalescés)"""
+        names = sorted(kind_names or self.kinds.names())
+        key = self.links_flight(names)
+        await self.shutdown.run_job(key, lambda: self.flights.run(key, lambda: self._update_link_messages(names)))
+    
+    async def _update_link_messages(self, names: List[str]) -> None:
+        """Récupère les événements une fois, les classe en une passe puis réconcilie les types en parallèle"""
         try:
-            if event_type == EventType.BOSS:
-                channel_id = self.config.channel_boss
-                message_list = self.state.boss_state.notification_messages
-            elif event_type == EventType.SIEGE:
-                channel_id = self.config.channel_siege
-                message_list = self.state.siege_state.notification_messages
-            else:
-                self.logger.error(f"Type d'événement non supporté: {event_type}")
+            events = await self.event_manager.get_all_events()
+            if not events:
+                self.logger.info("Aucun événement pour la mise à jour des liens")
                 return
             
-            # Suppression des anciennes notifications
-            await self.message_manager.delete_messages(message_list)
+            selected = self.select_events(events)
+            await asyncio.gather(*(self._reconcile_kind(name, selected[name]) for name in names))
+        except Exception as e:
+            self.logger.error(f"Erreur mise à jour des liens: {e}")
+    
+    async def _reconcile_kind(self, name: str, selected: List[Dict]) -> None:
+        """Modifie sur place les messages de liens d'un type, sous le verrou du type"""
+        if not selected:
+            self.logger.info(f"Aucun événement {name} trouvé")
+            return
+        try:
+            async with self.flights.lock(name):
+                await self._swap_link_messages(name, self.render_link_messages(name, selected))
+            self.logger.info(f"Mise à jour {name} terminée avec succès")
+        except Exception as e:
+            self.logger.error(f"Erreur mise à jour {name}: {e}")
+    
+    def render_link_messages(self, name: str, selected: List[Dict]) -> List[str]:
+        """Construit le contenu des messages de liens d'un type d'événement"""
+        kind = self.kinds[name]
+        render_times = self.time_renderer.render
+        if not kind.group_by_day:
+            return [kind.format(e['link'], render_times(e['start_time'])) for e in selected]
+        
+        # Texte complet + liens du premier jour, puis les liens seuls des jours suivants
+        contents = []
+        for weekday in kind.weekdays:
+            day_events = [e for e in selected if e['start_time'].weekday() == weekday]
+            if not day_events:
+                continue
+            links = "\n".join(e['link'] for e in day_events)
+            contents.append(links if contents else kind.format(links, render_times(day_events[0]['start_time'])))
+        return contents
+    
+    async def _swap_link_messages(self, name: str, contents: List[str]) -> None:
+        """Aligne les messages de liens sur `contents` dans chaque canal du groupe
+        (verrou du type détenu) ; les anciennes notifications sont supprimées"""
+        state = self.state.kind_state(name)
+        channels = self.kinds[name].channels
+        
+        by_channel: Dict[int, List[discord.Message]] = {cid: [] for cid in channels}
+        outside_group: List[discord.Message] = []
+        for msg in state.event_messages:
+            by_channel.get(msg.channel.id, outside_group).append(msg)
+        
+        synced = await asyncio.gather(*(
+            self.message_manager.sync_channel_messages(cid, by_channel[cid], contents)
+            for cid in channels
+        ))
+        await self.message_manager.delete_messages(outside_group)
+        await self.message_manager.delete_messages(state.notification_messages)
+        
+        # Bascule en une seule affectation une fois tous les appels terminés
+        state.event_messages = [msg for messages in synced for msg in messages] + outside_group
+        self.state.touch()
+    
+    def select_events(self, events: Dict[int, Dict], week_start: Optional[datetime] = None) -> Dict[str, List[Dict]]:
+        """Événements par type : classement par mots-clés, ou IDs des événements créés par le bot
+        pour les types à modèles. Les séries récurrentes sont remplacées par leurs occurrences
+        de la semaine commençant à `week_start` (semaine courante par défaut)"""
+        week_start = week_start or self.next_weekly_deadline() - timedelta(days=7)
+        events = self.occurrences.expand(events.values(), week_start, week_start + timedelta(days=7))
+        selected = self.kinds.classify(events)
+        if self.auto_events is not None:
+            selected.update(self.auto_events.selection(events, week_start, week_start + timedelta(days=7)))
+        return selected
+    
+    async def ensure_scheduled_events(self) -> Counter:
+        """Crée ou corrige les événements des modèles (leader uniquement, appels concurrents coalescés)"""
+        if self.auto_events is None or self.config.process_role == 'gateway' or not self.is_leader():
+            return Counter()
+        return await self.shutdown.run_job(
+            'auto_events', lambda: self.flights.run('auto_events', self._ensure_scheduled_events)
+        )
+    
+    async def _ensure_scheduled_events(self) -> Counter:
+        outcomes = await self.auto_events.sync(self.state.cached_events, self.get_current_time())
+        if outcomes['created'] or outcomes['updated']:
+            # Les liens sont construits depuis le cache : il doit contenir les nouveaux IDs
+            await self.update_events_cache()
+        return outcomes
+    
+    def affected_kinds(self, event_id: int, name: Optional[str], start_time: Optional[datetime]) -> Set[str]:
+        """Types dont les liens changent : celui de la nouvelle version et celui de la version en cache"""
+        versions = [[{'name': name, 'start_time': start_time}]] if name else []
+        previous = self.state.cached_events.get(event_id)
+        if previous is not None:
+            versions.append([previous])
+        return {kind for version in versions for kind, selected in self.kinds.classify(version).items() if selected}
+    
+    def schedule_reconcile(self, kind_names: Set[str]) -> None:
+        """Programme le rafraîchissement du cache et la réconciliation des liens des types touchés :
+        une récupération et une passe d'écriture par rafale de modifications"""
+        if self._pending_reconcile is None:
+            self._pending_reconcile = set()
+        self._pending_reconcile |= kind_names
+        if self._reconcile_task is None or self._reconcile_task.done():
+            self._reconcile_task = asyncio.create_task(self._reconcile_pending())
+    
+    async def _reconcile_pending(self) -> None:
+        # Les modifications reçues pendant la réconciliation sont traitées à la fenêtre suivante
+        while self._pending_reconcile is not None:
+            await asyncio.sleep(self.config.reconcile_debounce)
+            names, self._pending_reconcile = sorted(self._pending_reconcile), None
+            try:
+                events = await self.update_events_cache()
+                # Le gateway tient seulement son cache à jour ; les liens sont écrits par le leader
+                if not names or not events or self.config.process_role == 'gateway' or not self.is_leader():
+                    continue
+                selected = self.select_events(events)
+                self.logger.info(f"Réconciliation après modification d'événements: {', '.join(names)}")
+                await self.shutdown.run_job(
+                    f"reconcile:{','.join(names)}",
+                    lambda: asyncio.gather(*(self._reconcile_kind(name, selected[name]) for name in names))
+                )
+            except Exception as e:
+                self.logger.error(f"Erreur réconciliation des liens: {e}")
+    
+    # ======================== PRÉPARATION DE LA MISE À JOUR HEBDOMADAIRE ========================
+    
+    def next_weekly_deadline(self, now: Optional[datetime] = None) -> datetime:
+        """Prochaine échéance de la mise à jour hebdomadaire (lundi 00:00)"""
+        now = now or self.get_current_time()
+        hour, minute = TimeSlot.WEEKLY_UPDATE.value
+        days_ahead = (self.config.weekly_update_day - now.weekday()) % 7
+        deadline = (now + timedelta(days=days_ahead)).replace(hour=hour, minute=minute,
+                                                               second=0, microsecond=0)
+        if deadline <= now:
+            deadline += timedelta(days=7)
+        return deadline
+    
+    def current_week_start(self, now: Optional[datetime] = None) -> datetime:
+        """Dernière échéance hebdomadaire atteinte : début de la semaine que la mise à jour doit afficher"""
+        return self.next_weekly_deadline(now) - timedelta(days=7)
+    
+    def stage_weekly_update(self, week_start: datetime) -> StagedUpdate:
+        """Prépare les messages de la semaine commençant à `week_start` à partir du cache (aucun appel REST)"""
+        week_end = week_start + timedelta(days=7)
+        contents: Dict[str, List[str]] = {}
+        event_names: Dict[str, List[str]] = {}
+        
+        for name, selected in self.select_events(self.state.cached_events, week_start).items():
+            selected = [e for e in selected if week_start <= e['start_time'] < week_end]
+            contents[name] = self.render_link_messages(name, selected)
+            event_names[name] = [e['name'] for e in selected]
+        
+        self.staged_update = StagedUpdate(week_start, contents, event_names, self.get_current_time())
+        self.state.touch()
+        self.logger.debug(f"Mise à jour hebdomadaire préparée: {self.staged_update.describe()}")
+        return self.staged_update
+    
+    async def apply_staged_update(self, staged: StagedUpdate) -> None:
+        """Applique les messages préparés pour tous les types en parallèle"""
+        async def _apply(name: str, contents: List[str]) -> None:
+            async with self.flights.lock(name):
+                await self._swap_link_messages(name, contents)
+        
+        # Un type sans événement garde ses messages actuels (comme la mise à jour directe)
+        await asyncio.gather(*(
+            _apply(name, contents) for name, contents in staged.contents.items()
+            if contents and name in self.kinds
+        ))
+        self.logger.info(f"Mise à jour préparée appliquée: {staged.describe()}")
+    
+    @tasks.loop(minutes=15)
+    async def staging_refresher(self) -> None:
+        """Rafraîchit régulièrement le cache, ce qui re-prépare la mise à jour hebdomadaire"""
+        try:
+            await self.run_maintenance('events_cache', self.update_events_cache)
+            # L'horizon des N semaines avance : les occurrences suivantes sont créées au fil de l'eau
+            await self.run_maintenance('auto_events', self.ensure_scheduled_events)
+        except Exception as e:
+            self.logger.error(f"Erreur préparation mise à jour hebdomadaire: {e}")
+    
+    @staging_refresher.before_loop
+    async def before_staging_refresher(self) -> None:
+        """Attendre que le bot soit prêt"""
+        await self.wait_until_ready()
+    
+    @tasks.loop(minutes=5)
+    async def memory_guard_loop(self) -> None:
+        """Relevé mémoire périodique (intervalle fixé par MEMORY_GUARD_MINUTES)"""
+        try:
+            self.memory_guard.check()
+        except Exception as e:
+            self.logger.error(f"Erreur surveillance mémoire: {e}")
+    
+    def trim_caches(self) -> None:
+        """Vide les caches reconstructibles (bot et discord.py), appelé par la surveillance mémoire"""
+        self.time_renderer.trim()
+        self.calendar.trim()
+        self.render_cache.trim()
+        self.occurrences.trim()
+        if self.dashboard is not None:
+            self.dashboard.trim()
+        # Cache des messages de discord.py (les messages suivis restent référencés par l'état)
+        if self._connection._messages is not None:
+            self._connection._messages.clear()
+    
+    def arm_event_timers(self) -> None:
+        """Arme une notification par type et par horaire d'événement (début moins le décalage configuré) ;
+        les minuteurs des événements annulés, supprimés ou déplacés sont retirés"""
+        if not self.deadlines.running:
+            return
+        now = self.get_current_time()
+        offset = timedelta(minutes=self.config.event_notify_offset)
+        horizon = now + timedelta(days=8)
+        # Fenêtre alignée sur le jour : les occurrences développées restent en cache d'un appel à l'autre
+        day_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        events = self.occurrences.expand(self.state.cached_events.values(), day_start,
+                                         day_start + timedelta(days=9) + offset)
+        selected = self.kinds.classify(events)
+        if self.auto_events is not None:
+            selected.update(self.auto_events.selection(events, now, horizon + offset))
+        
+        # Les événements d'un même type commençant à la même heure partagent une notification
+        wanted: Dict[str, Tuple[str, datetime]] = {}
+        for kind in self.kinds:
+            if not kind.notification_slot:
+                continue
+            for event in selected[kind.name]:
+                if event.get('status') in ('canceled', 'cancelled', 'completed'):
+                    continue
+                fire_at = event['start_time'].astimezone(self.tz) - offset
+                if now < fire_at <= horizon:
+                    wanted[f"notify:{kind.name}:{fire_at.isoformat()}"] = (kind.name, fire_at)
+        
+        for key in self.deadlines.keys():
+            if key.startswith('notify:') and key not in wanted:
+                self.deadlines.cancel(key)
+        for key, (name, fire_at) in wanted.items():
+            if self.deadlines.deadline(key) is None:
+                self.deadlines.arm(key, fire_at,
+                                   lambda name=name, fire_at=fire_at: self._fire_event_notification(name, fire_at))
+    
+    async def _fire_event_notification(self, name: str, fire_at: datetime) -> None:
+        """Minuteur échu : notification du type, une seule fois par horaire (toutes répliques confondues)"""
+        slot = fire_at.replace(second=0, microsecond=0)
+        if not self.is_leader() or not self._due(f'{name}_event', slot):
+            return
+        results = await self.send_notification(name)
+        self._finish(f'{name}_event', slot, any(result.ok for result in results.values()))
+        self.save_state()
+    
+    async def send_notification(self, name: str) -> Dict[int, FanOutResult]:
+        """Envoie une notification pour un type d'événement sur tout son groupe de canaux"""
+        return await self.shutdown.run_job(
+            f'{name}_notification', lambda: self._send_notification(name)
+        )
+    
+    async def _send_notification(self, name: str) -> Dict[int, FanOutResult]:
+        """Remplace les notifications précédentes, sous le verrou du type"""
+        try:
+            if name not in self.kinds:
+                self.logger.error(f"Type d'événement non supporté: {name}")
+                return {}
+            kind = self.kinds[name]
+            message_list = self.state.kind_state(name).notification_messages
+            day = self.get_current_time().date()
             
-            # Envoi de la nouvelle notification
-            msg = await self.message_manager.send_message(channel_id, self.config.notification_message)
-            if msg:
-                message_list.append(msg)
-                self.logger.info(f"Notification {event_type.value} envoyée")
+            async with self.flights.lock(name):
+                # Suppression des anciennes notifications
+                await self.message_manager.delete_messages(message_list)
+                
+                # Envoi de la nouvelle notification (tous les canaux en parallèle, marqueur par canal)
+                results = await self.message_manager.fan_out(
+                    kind.channels,
+                    lambda cid: self.message_manager.send_message(
+                        cid, f"{self.config.notification_message}\n{kind.notification_marker(cid, day)}"
+                    )
+                )
+                message_list.extend(self.message_manager.sent_messages(results))
+                self.state.touch()
+            self.logger.info(f"Notification {name} envoyée "
+                             f"({sum(r.ok for r in results.values())}/{len(results)} canaux)")
+            return results
                 
         except Exception as e:
-            self.logger.error(f"Erreur notification {event_type.value}: {e}")
+            self.logger.error(f"Erreur notification {name}: {e}")
+            return {}
     
     # ======================== PLANIFICATEUR ========================
     
@@ -494,56 +2712,149 @@ class EventBot(commands.Bot):
         now = self.get_current_time()
         current_date = now.date()
         current_datetime = now.replace(second=0, microsecond=0)
+        executions_before = dict(self.state.last_executions)
+        
+        # Répliques en attente : seul le détenteur du bail exécute les travaux
+        if not self.is_leader():
+            return
         
         try:
+            # Reprise des tâches de maintenance différées une fois Discord rétabli
+            await self.run_deferred_maintenance()
+            # Exécutions réservées mais non terminées (ancien leader arrêté, envoi en échec)
+            await self.resume_pending_claims()
+            
             # Création du sondage quotidien à 18:00
             if (now.hour, now.minute) == TimeSlot.POLL_CREATION.value:
-                if self.state.get_last_execution('poll_creation') != current_date:
-                    await self.create_daily_poll()
-                    self.state.update_last_execution('poll_creation', current_date)
+                if self._due('poll_creation', current_date):
+                    results = await self.create_daily_poll()
+                    self._finish('poll_creation', current_date, any(result.ok for result in results.values()))
+            
+            # Rappels en MP aux membres ayant répondu "Oui", N minutes avant le Donjon Party
+            if self.config.reminder_minutes and (now.hour, now.minute) == self.reminder_slot():
+                if self._due('reminders', current_date):
+                    self.start_reminders(current_date)
+                    self._finish('reminders', current_date)
             
             # Suppression du sondage à 00:00
             if (now.hour, now.minute) == TimeSlot.POLL_DELETION.value:
-                if self.state.get_last_execution('poll_deletion') != current_date:
+                if self._due('poll_deletion', current_date):
                     await self.delete_poll_messages()
-                    self.state.update_last_execution('poll_deletion', current_date)
+                    self._finish('poll_deletion', current_date)
             
             # Mise à jour hebdomadaire (lundi 00:00)
             if (now.weekday() == self.config.weekly_update_day and 
                 (now.hour, now.minute) == TimeSlot.WEEKLY_UPDATE.value):
-                if self.state.get_last_execution('weekly_update') != current_date:
-                    await self.weekly_update()
-                    self.state.update_last_execution('weekly_update', current_date)
+                if self._due('weekly_update', current_date):
+                    # Semaine visée fixée à l'échéance, même si la maintenance est différée
+                    week_start = self.current_week_start(now)
+                    await self.run_maintenance('weekly_update', lambda: self.weekly_update(week_start))
+                    self._finish('weekly_update', current_date)
             
-            # Notifications boss (samedi/dimanche 20:30)
-            elif (now.weekday() in [5, 6] and 
-                  (now.hour, now.minute) == TimeSlot.BOSS_NOTIFICATION.value):
-                if self.state.get_last_execution('boss_event') != current_datetime:
-                    await self.send_notification(EventType.BOSS)
-                    self.state.update_last_execution('boss_event', current_datetime)
-            
-            # Notification siege (dimanche 14:30)
-            elif (now.weekday() == 6 and 
-                  (now.hour, now.minute) == TimeSlot.SIEGE_NOTIFICATION.value):
-                if self.state.get_last_execution('siege_event') != current_datetime:
-                    await self.send_notification(EventType.SIEGE)
-                    self.state.update_last_execution('siege_event', current_datetime)
+            # Notifications des types d'événements (ex. boss sam/dim 20:30, siège dim 14:30),
+            # sauf si elles suivent l'horaire de chaque événement (minuteurs)
+            elif self.config.event_notify_offset is None:
+                due = [
+                    kind.name for kind in self.kinds
+                    if kind.notification_slot == (now.hour, now.minute) and now.weekday() in kind.weekdays
+                    and self._due(f'{kind.name}_event', current_datetime)
+                ]
+                results = await asyncio.gather(*(self.send_notification(name) for name in due))
+                for name, sent in zip(due, results):
+                    self._finish(f'{name}_event', current_datetime, any(result.ok for result in sent.values()))
                     
         except Exception as e:
             self.logger.error(f"Erreur dans le planificateur: {e}")
+        
+        # Sauvegarde après chaque travail planifié pour survivre à un arrêt brutal
+        if self.state.last_executions != executions_before:
+            self.save_state()
+    
+    def _next_slot(self, now: datetime, slot: Union[TimeSlot, Tuple[int, int]],
+                   weekdays: Optional[List[int]] = None) -> datetime:
+        """Prochaine occurrence d'un créneau horaire (éventuellement limité à certains jours)"""
+        hour, minute = slot.value if isinstance(slot, TimeSlot) else slot
+        for days_ahead in range(8):
+            candidate = (now + timedelta(days=days_ahead)).replace(hour=hour, minute=minute,
+                                                                   second=0, microsecond=0)
+            if candidate > now and (weekdays is None or candidate.weekday() in weekdays):
+                return candidate
+        return candidate
+    
+    def scheduled_jobs(self) -> List[Tuple[str, datetime]]:
+        """Travaux planifiés et leur prochaine exécution, triés par échéance"""
+        now = self.get_current_time()
+        jobs = [
+            ("Création du sondage", self._next_slot(now, TimeSlot.POLL_CREATION)),
+            ("Suppression du sondage", self._next_slot(now, TimeSlot.POLL_DELETION)),
+            ("Mise à jour hebdomadaire", self.next_weekly_deadline(now)),
+        ]
+        if self.config.event_notify_offset is None:
+            jobs.extend((f"Notification {kind.name}", self._next_slot(now, kind.notification_slot, kind.weekdays))
+                        for kind in self.kinds if kind.notification_slot)
+        else:
+            jobs.extend(
+                (f"Notification {key.split(':')[1]}", datetime.fromtimestamp(self.deadlines.deadline(key), self.tz))
+                for key in self.deadlines.keys() if key.startswith('notify:')
+            )
+        if self.config.reminder_minutes:
+            hour, minute = self.reminder_slot()
+            reminder = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+            jobs.append(("Rappels en MP", reminder if reminder > now else reminder + timedelta(days=1)))
+        if self.staging_refresher.next_iteration is not None:
+            jobs.append(("Rafraîchissement du cache", self.staging_refresher.next_iteration.astimezone(self.tz)))
+        return sorted(jobs, key=lambda job: job[1])
+    
+    async def run_maintenance(self, name: str, job: Callable[[], Awaitable[Any]]) -> bool:
+        """Exécute une tâche de maintenance, ou la diffère tant que Discord est dégradé"""
+        if self.resilience.is_degraded():
+            self.deferred_maintenance[name] = job
+            self.logger.warning(f"Discord dégradé: maintenance '{name}' différée")
+            return False
+        
+        self.deferred_maintenance.pop(name, None)
+        await job()
+        return True
+    
+    async def run_deferred_maintenance(self) -> None:
+        """Relance les tâches de maintenance différées si les disjoncteurs sont refermés"""
+        if not self.deferred_maintenance or self.resilience.is_degraded():
+            return
+        
+        for name, job in list(self.deferred_maintenance.items()):
+            self.logger.info(f"Reprise de la maintenance différée '{name}'")
+            await self.run_maintenance(name, job)
     
     @schedule_checker.before_loop
     async def before_schedule_checker(self) -> None:
         """Attendre que le bot soit prêt"""
         await self.wait_until_ready()
     
-    async def weekly_update(self) -> None:
-        """Mise à jour hebdomadaire complète"""
+    async def weekly_update(self, week_start: Optional[datetime] = None) -> None:
+        """Mise à jour hebdomadaire complète de la semaine commençant à `week_start` (semaine courante
+        par défaut ; appels concurrents coalescés)"""
+        week_start = week_start or self.current_week_start()
+        await self.shutdown.run_job(
+            'weekly_update', lambda: self.flights.run('weekly_update', lambda: self._weekly_update(week_start))
+        )
+    
+    async def _weekly_update(self, week_start: datetime) -> None:
+        """Applique la mise à jour préparée pour `week_start`, ou rafraîchit le cache puis les liens
+        de tous les types"""
         self.logger.info("=== DÉBUT MISE À JOUR HEBDOMADAIRE ===")
         try:
-            await self.update_events_cache()
-            await self.update_boss_messages()
-            await self.update_siege_messages()
+            staged = self.staged_update
+            if staged is not None and staged.week_start != week_start:
+                self.logger.info(f"Mise à jour préparée ignorée: semaine du {staged.week_start:%d/%m %H:%M}, "
+                                 f"semaine visée du {week_start:%d/%m %H:%M} (récupération directe)")
+                staged = None
+            if staged is not None:
+                await self.apply_staged_update(staged)
+                # Préparation de la semaine suivante à partir du cache courant
+                self.stage_weekly_update(week_start + timedelta(days=7))
+            else:
+                await self.update_events_cache()
+                await self.update_link_messages()
             self.logger.info("=== MISE À JOUR HEBDOMADAIRE TERMINÉE ===")
         except Exception as e:
             self.logger.error(f"Erreur mise à jour hebdomadaire: {e}")
@@ -551,122 +2862,179 @@ class EventBot(commands.Bot):
     # ======================== RÉCUPÉRATION MESSAGES ========================
     
     async def recover_existing_messages(self) -> None:
-        """Récupère les messages existants au redémarrage"""
+        """Récupère les messages existants au redémarrage (appels concurrents coalescés)"""
+        await self.shutdown.run_job(
+            'recover', lambda: self.flights.run('recover', self._recover_existing_messages)
+        )
+    
+    async def _recover_existing_messages(self) -> None:
+        """Parcourt l'historique des canaux DP et des canaux de chaque type d'événement"""
         try:
             # Récupération messages DP
             await self._recover_dp_messages()
-            # Récupération messages Boss
-            await self._recover_boss_messages()
-            # Récupération messages Siege
-            await self._recover_siege_messages()
+            # Récupération des messages de liens et de notification, tous types en parallèle
+            await asyncio.gather(*(self._recover_kind_messages(kind) for kind in self.kinds))
             
+            self.state.touch()
             self.logger.info("Récupération des messages terminée")
             
         except Exception as e:
             self.logger.error(f"Erreur récupération messages: {e}")
     
     async def _recover_dp_messages(self) -> None:
-        """Récupère les messages du canal DP"""
-        channel = self.get_channel(self.config.channel_dp)
-        if not channel:
-            return
-        
+        """Récupère les messages des canaux DP"""
+        for channel_id in self.config.channels_for(EventType.POLL):
+            channel = self.resolve_channel(channel_id)
+            if not channel:
+                continue
+            
+            async with self.flights.lock(EventType.POLL.value):
+                await self._recover_dp_channel(channel_id, channel)
+    
+    async def _recover_dp_channel(self, channel_id: int, channel: discord.abc.Messageable) -> None:
+        """Récupère le sondage et le message texte d'un canal DP"""
         async for message in channel.history(limit=50):
             if message.author == self.user:
-                if message.poll and not self.state.poll_message:
-                    self.state.poll_message = message
+                is_poll = message.poll or AttendanceView.is_attendance_message(message)
+                if is_poll and channel_id not in self.state.poll_messages:
+                    self.state.poll_messages[channel_id] = message
                     self.logger.info(f"Sondage récupéré: {message.id}")
-                elif "⬆️⬆️⬆️" in message.content and not self.state.text_message:
-                    self.state.text_message = message
+                elif "⬆️⬆️⬆️" in message.content and channel_id not in self.state.text_messages:
+                    self.state.text_messages[channel_id] = message
                     self.logger.info(f"Message texte récupéré: {message.id}")
     
-    async def _recover_boss_messages(self) -> None:
-        """Récupère les messages du canal Boss"""
-        channel = self.get_channel(self.config.channel_boss)
-        if not channel:
-            return
-        
-        async for message in channel.history(limit=10):
-            if message.author == self.user:
-                if "Présence pour l'événement Boss" in message.content:
-                    self.state.boss_state.event_messages.append(message)
-                    self.logger.info(f"Message boss (lien) récupéré: {message.id}")
-                elif "⬆️⬆️⬆️" in message.content:
-                    self.state.boss_state.notification_messages.append(message)
-                    self.logger.info(f"Message boss (notif) récupéré: {message.id}")
-    
-    async def _recover_siege_messages(self) -> None:
-        """Récupère les messages du canal Siege"""
-        channel = self.get_channel(self.config.channel_siege)
-        if not channel:
-            return
-        
-        async for message in channel.history(limit=10):
-            if message.author == self.user:
-                if "Présence pour le siège" in message.content:
-                    self.state.siege_state.event_messages.append(message)
-                    self.logger.info(f"Message siege (lien) récupéré: {message.id}")
-                elif "⬆️⬆️⬆️" in message.content:
-                    self.state.siege_state.notification_messages.append(message)
-                    self.logger.info(f"Message siege (notif) récupéré: {message.id}")
+    async def _recover_kind_messages(self, kind: EventKind) -> None:
+        """Récupère les messages de liens et de notification d'un type d'événement"""
+        state = self.state.kind_state(kind.name)
+        for channel_id in kind.channels:
+            channel = self.resolve_channel(channel_id)
+            if not channel:
+                continue
+            # Notification sans marqueur (versions précédentes) : attribuable seulement sans canal partagé
+            shared = any(channel_id in other.channels for other in self.kinds if other is not kind)
+            
+            async with self.flights.lock(kind.name):
+                known_ids = set(state.message_ids_by_channel().get(channel_id, []))
+                async for message in channel.history(limit=10):
+                    if message.author != self.user or message.id in known_ids:
+                        continue
+                    if kind.marker and kind.marker in message.content:
+                        state.event_messages.append(message)
+                        self.logger.info(f"Message {kind.name} (lien) récupéré: {message.id}")
+                    elif kind.owns_notification(message.content, channel_id) or (
+                            "⬆️⬆️⬆️" in message.content and "-# notif:" not in message.content and not shared):
+                        state.notification_messages.append(message)
+                        self.logger.info(f"Message {kind.name} (notif) récupéré: {message.id}")
 
 # ======================== COMMANDES BOT ========================
 
-@EventBot.command(name='events')
+@EventBot.hybrid_command(name='events')
+@app_commands.default_permissions(administrator=True)
 @commands.has_permissions(administrator=True)
 async def list_events(bot: EventBot, ctx: commands.Context) -> None:
     """Affiche tous les événements avec leurs liens"""
+    await ctx.defer()
     try:
-        events = await bot.update_events_cache()
+        # Cache tenu à jour par le planificateur et les modifications d'événements (appel REST si vide)
+        events = bot.state.cached_events or await bot.update_events_cache()
         if not events:
             await ctx.send("Aucun événement trouvé.")
             return
         
-        formatted_links = "**🎮 Liens des Événements 🎮**\n\n"
-        for name, data in events.items():
-            start_time = data['start_time']
-            start_str = start_time.strftime('%d/%m à %H:%M') if start_time else 'Date non définie'
-            formatted_links += f"**{name}**\n📅 {start_str}\n🔗 {data['link']}\n\n"
-        
-        # Gestion de la limite Discord
-        if len(formatted_links) > 1900:
-            chunks = [formatted_links[i:i+1900] for i in range(0, len(formatted_links), 1900)]
-            for chunk in chunks:
-                await ctx.send(chunk)
-        else:
-            await ctx.send(formatted_links)
+        # La date du jour fait partie de la clé : la prochaine occurrence des séries récurrentes avance
+        now = bot.get_current_time()
+        for chunk in bot.render_cache.get('events', (bot.state.events_version, now.date()),
+                                          lambda: _render_event_list(events, now, bot.tz)):
+            await ctx.send(chunk)
             
     except Exception as e:
         bot.logger.error(f"Erreur commande events: {e}")
         await ctx.send("❌ Erreur lors de la récupération des événements.")
 
-@EventBot.command(name='status')
+def _render_event_list(events: Dict[int, Dict], now: datetime, tz: Optional[tzinfo] = None) -> List[str]:
+    """Liste des événements découpée selon la limite Discord (prochaine occurrence des séries récurrentes)"""
+    formatted_links = "**🎮 Liens des Événements 🎮**\n\n"
+    for data in events.values():
+        name = data['name']
+        start_time, rule = data['start_time'], data.get('recurrence')
+        if start_time and rule:
+            start_time = next_occurrence(start_time, rule, now, tz)
+        start_str = start_time.strftime('%d/%m à %H:%M') if start_time else 'Date non définie'
+        formatted_links += f"**{name}**\n📅 {start_str}{' 🔁' if rule else ''}\n🔗 {data['link']}\n\n"
+    return [formatted_links[i:i+1900] for i in range(0, len(formatted_links), 1900)]
+
+@EventBot.hybrid_command(name='status')
+@app_commands.default_permissions(administrator=True)
 @commands.has_permissions(administrator=True)
 async def bot_status(bot: EventBot, ctx: commands.Context) -> None:
     """Affiche le statut complet du bot"""
     now = bot.get_current_time()
-    status_msg = f"""
-**🤖 Statut du Bot**
-**Heure:** {now.strftime('%H:%M:%S (%d/%m/%Y)')}
-**Sondage actif:** {'✅' if bot.state.poll_message else '❌'}
-**Boss (liens/notifs):** {len(bot.state.boss_state.event_messages)}/{len(bot.state.boss_state.notification_messages)}
-**Siege (liens/notifs):** {len(bot.state.siege_state.event_messages)}/{len(bot.state.siege_state.notification_messages)}
+    body = bot.render_cache.get('status', _status_key(bot), lambda: _render_status(bot))
+    await ctx.send(f"\n**🤖 Statut du Bot**\n**Heure:** {now.strftime('%H:%M:%S (%d/%m/%Y)')}\n{body}")
+
+def _status_key(bot: EventBot) -> tuple:
+    """Clé du rendu de /status : versions de l'état, du cache, de la mémoire et de la file de travaux,
+    compteurs REST et disjoncteurs ; le corps n'est reconstruit que si l'une d'elles change"""
+    stats = tuple((route, tuple(values.values())) for route, values in sorted(bot.resilience.stats.items()))
+    breakers = tuple((route, breaker.state) for route, breaker in sorted(bot.resilience.breakers.items()))
+    topology = bot.job_queue or bot.job_client
+    return (bot.state.version, bot.state.events_version, stats, breakers, tuple(bot.deferred_maintenance),
+            bot.schedule_checker.is_running(), bot.is_leader(),
+            bot.memory_guard.version if bot.memory_guard else 0, topology.version if topology else 0)
+
+def _render_status(bot: EventBot) -> str:
+    """Corps du statut, construit à partir de l'état en mémoire"""
+    deferred = f" — différé: {', '.join(bot.deferred_maintenance)}" if bot.deferred_maintenance else ""
+    resilience_lines = "\n".join(bot.resilience.summary()) or "• Aucun appel REST"
+    kind_lines = "\n".join(
+        f"**{kind.name.capitalize()} (canaux/liens/notifs):** {len(kind.channels)}/"
+        f"{len(bot.state.kind_state(kind.name).event_messages)}/"
+        f"{len(bot.state.kind_state(kind.name).notification_messages)}"
+        for kind in bot.kinds
+    )
+    if bot.lease is None:
+        ha_line = "Instance unique"
+    else:
+        ha_line = f"{'Leader' if bot.lease.is_leader else 'En attente'} ({bot.lease.holder}, jeton {bot.lease.token})"
+    if bot.job_queue is not None:
+        topology = bot.job_queue.describe()
+    elif bot.job_client is not None:
+        topology = bot.job_client.describe()
+    else:
+        topology = "Processus unique"
+    notification_lines = "\n".join(
+        f"• Notification {kind.name}: {bot.state.get_last_execution(f'{kind.name}_event') or 'Jamais'}"
+        for kind in bot.kinds
+    )
+    return f"""**Sondage actif:** {'✅' if bot.state.poll_messages else '❌'} ({len(bot.state.poll_messages)}/{len(bot.config.dp_channels)} canaux)
+**Canaux DP:** {len(bot.config.dp_channels)}
+{kind_lines}
 **Événements en cache:** {len(bot.state.cached_events)}
 **Planificateur:** {'✅' if bot.schedule_checker.is_running() else '❌'}
+**Haute disponibilité:** {ha_line}
+**Topologie:** {topology}
+**Discord dégradé:** {'⚠️ Oui' if bot.resilience.is_degraded() else 'Non'}{deferred}
+**Mémoire:** {bot.memory_guard.describe() if bot.memory_guard else 'Surveillance désactivée'}
 
 **📅 Dernières exécutions:**
 • Sondage créé: {bot.state.get_last_execution('poll_creation') or 'Jamais'}
 • Sondage supprimé: {bot.state.get_last_execution('poll_deletion') or 'Jamais'}
-• Notification boss: {bot.state.get_last_execution('boss_event') or 'Jamais'}
-• Notification siege: {bot.state.get_last_execution('siege_event') or 'Jamais'}
+{notification_lines}
 • Mise à jour hebdo: {bot.state.get_last_execution('weekly_update') or 'Jamais'}
+• Rappels en MP: {bot.reminders.describe() if bot.config.reminder_minutes else 'Désactivés'}
+• Prochaine mise à jour hebdo: {bot.staged_update.describe() if bot.staged_update else 'Non préparée'}
+• Événements automatiques: {bot.auto_events.describe() if bot.auto_events else 'Aucun modèle'}
+
+**🛡️ Résilience REST:**
+{resilience_lines}
 """
-    await ctx.send(status_msg)
 
-@EventBot.command(name='force_poll')
+@EventBot.hybrid_command(name='force_poll')
+@app_commands.default_permissions(administrator=True)
 @commands.has_permissions(administrator=True)
 async def force_poll(bot: EventBot, ctx: commands.Context) -> None:
     """Force la création d'un sondage"""
+    await ctx.defer()
     try:
         await bot.create_daily_poll()
         await ctx.send("✅ Sondage créé manuellement !")
@@ -675,35 +3043,73 @@ async def force_poll(bot: EventBot, ctx: commands.Context) -> None:
         bot.logger.error(f"Erreur force_poll: {e}")
         await ctx.send("❌ Erreur lors de la création du sondage.")
 
-@EventBot.command(name='force_boss')
-@commands.has_permissions(administrator=True)
-async def force_boss(bot: EventBot, ctx: commands.Context) -> None:
-    """Force l'envoi d'une notification boss"""
+async def _force_notification(bot: EventBot, ctx: commands.Context, kind: str) -> None:
+    """Envoi forcé d'une notification (commun aux commandes de notification)"""
+    await ctx.defer()
+    if kind not in bot.kinds:
+        await ctx.send(f"❌ Type d'événement inconnu: {kind}")
+        return
     try:
-        await bot.send_notification(EventType.BOSS)
-        await ctx.send("✅ Notification boss envoyée !")
-        bot.logger.info(f"Notification boss forcée par {ctx.author}")
+        results = await bot.send_notification(kind)
+        succeeded = sum(r.ok for r in results.values())
+        await ctx.send(f"✅ Notification {kind} envoyée ({succeeded}/{len(results)} canaux) !")
+        bot.logger.info(f"Notification {kind} forcée par {ctx.author}")
     except Exception as e:
-        bot.logger.error(f"Erreur force_boss: {e}")
+        bot.logger.error(f"Erreur notification forcée {kind}: {e}")
         await ctx.send("❌ Erreur lors de l'envoi de la notification.")
 
-@EventBot.command(name='force_siege')
+async def _update_kind_links(bot: EventBot, ctx: commands.Context, kind: str) -> None:
+    """Mise à jour forcée des liens d'un type (commun aux commandes de mise à jour)"""
+    await ctx.defer()
+    if kind not in bot.kinds:
+        await ctx.send(f"❌ Type d'événement inconnu: {kind}")
+        return
+    try:
+        if bot.flights.is_running(bot.links_flight([kind])):
+            await ctx.send(f"⏳ Mise à jour {kind} déjà en cours, en attente de son résultat...")
+        await bot.update_link_messages([kind])
+        await ctx.send(f"✅ Liens {kind} mis à jour !")
+        bot.logger.info(f"Mise à jour {kind} forcée par {ctx.author}")
+    except Exception as e:
+        bot.logger.error(f"Erreur mise à jour des liens {kind}: {e}")
+        await ctx.send("❌ Erreur lors de la mise à jour.")
+
+async def _kind_autocomplete(interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
+    """Types d'événements du registre"""
+    return [app_commands.Choice(name=name, value=name)
+            for name in interaction.client.kinds.names() if current.lower() in name]
+
+@EventBot.hybrid_command(name='notify')
+@app_commands.default_permissions(administrator=True)
+@app_commands.autocomplete(kind=_kind_autocomplete)
+@commands.has_permissions(administrator=True)
+async def notify(bot: EventBot, ctx: commands.Context, kind: str) -> None:
+    """Force l'envoi de la notification d'un type d'événement"""
+    await _force_notification(bot, ctx, kind)
+
+@EventBot.hybrid_command(name='force_boss')
+@app_commands.default_permissions(administrator=True)
+@commands.has_permissions(administrator=True)
+async def force_boss(bot: EventBot, ctx: commands.Context) -> None:
+    """Force l'envoi d'une notification boss"""
+    await _force_notification(bot, ctx, EventType.BOSS.value)
+
+@EventBot.hybrid_command(name='force_siege')
+@app_commands.default_permissions(administrator=True)
 @commands.has_permissions(administrator=True)
 async def force_siege(bot: EventBot, ctx: commands.Context) -> None:
     """Force l'envoi d'une notification siege"""
-    try:
-        await bot.send_notification(EventType.SIEGE)
-        await ctx.send("✅ Notification siege envoyée !")
-        bot.logger.info(f"Notification siege forcée par {ctx.author}")
-    except Exception as e:
-        bot.logger.error(f"Erreur force_siege: {e}")
-        await ctx.send("❌ Erreur lors de l'envoi de la notification.")
+    await _force_notification(bot, ctx, EventType.SIEGE.value)
 
-@EventBot.command(name='update_all_links')
+@EventBot.hybrid_command(name='update_all_links')
+@app_commands.default_permissions(administrator=True)
 @commands.has_permissions(administrator=True)
 async def update_all_links(bot: EventBot, ctx: commands.Context) -> None:
     """Force la mise à jour de tous les liens"""
+    await ctx.defer()
     try:
+        if bot.flights.is_running('weekly_update'):
+            await ctx.send("⏳ Mise à jour déjà en cours, en attente de son résultat...")
         await bot.weekly_update()
         await ctx.send("✅ Tous les liens mis à jour !")
         bot.logger.info(f"Mise à jour complète forcée par {ctx.author}")
@@ -711,27 +3117,240 @@ async def update_all_links(bot: EventBot, ctx: commands.Context) -> None:
         bot.logger.error(f"Erreur update_all_links: {e}")
         await ctx.send("❌ Erreur lors de la mise à jour.")
 
-@EventBot.command(name='help_admin')
+@EventBot.hybrid_command(name='update_events')
+@app_commands.default_permissions(administrator=True)
+@commands.has_permissions(administrator=True)
+async def update_events(bot: EventBot, ctx: commands.Context) -> None:
+    """Force la mise à jour du cache des événements"""
+    await ctx.defer()
+    try:
+        events = await bot.update_events_cache()
+        await ctx.send(f"✅ Cache mis à jour ! {len(events)} événement(s) trouvé(s).")
+        bot.logger.info(f"Cache des événements mis à jour par {ctx.author}")
+    except Exception as e:
+        bot.logger.error(f"Erreur update_events: {e}")
+        await ctx.send("❌ Erreur lors de la mise à jour du cache.")
+
+@EventBot.hybrid_command(name='update_links')
+@app_commands.default_permissions(administrator=True)
+@app_commands.autocomplete(kind=_kind_autocomplete)
+@commands.has_permissions(administrator=True)
+async def update_links(bot: EventBot, ctx: commands.Context, kind: str) -> None:
+    """Force la mise à jour des liens d'un type d'événement"""
+    await _update_kind_links(bot, ctx, kind)
+
+@EventBot.hybrid_command(name='update_boss_links')
+@app_commands.default_permissions(administrator=True)
+@commands.has_permissions(administrator=True)
+async def update_boss_links(bot: EventBot, ctx: commands.Context) -> None:
+    """Force la mise à jour des liens boss"""
+    await _update_kind_links(bot, ctx, EventType.BOSS.value)
+
+@EventBot.hybrid_command(name='update_siege_links')
+@app_commands.default_permissions(administrator=True)
+@commands.has_permissions(administrator=True)
+async def update_siege_links(bot: EventBot, ctx: commands.Context) -> None:
+    """Force la mise à jour des liens siege"""
+    await _update_kind_links(bot, ctx, EventType.SIEGE.value)
+
+@EventBot.hybrid_command(name='create_events')
+@app_commands.default_permissions(administrator=True)
+@commands.has_permissions(administrator=True)
+async def create_events(bot: EventBot, ctx: commands.Context) -> None:
+    """Crée ou corrige les événements programmés définis par les modèles"""
+    if bot.auto_events is None:
+        await ctx.send("❌ Aucun modèle d'événement (définir EVENT_TEMPLATES_FILE).")
+        return
+    await ctx.defer()
+    try:
+        await bot.update_events_cache()
+        outcomes = await bot.ensure_scheduled_events()
+        await ctx.send(f"✅ Événements programmés: {outcomes['created']} créé(s), {outcomes['updated']} modifié(s), "
+                       f"{outcomes['unchanged']} inchangé(s), {outcomes['skipped']} supprimé(s) à la main, "
+                       f"{outcomes['failed']} en échec.")
+        bot.logger.info(f"Création des événements lancée par {ctx.author}")
+    except Exception as e:
+        bot.logger.error(f"Erreur create_events: {e}")
+        await ctx.send("❌ Erreur lors de la création des événements.")
+
+@EventBot.hybrid_command(name='recover')
+@app_commands.default_permissions(administrator=True)
+@commands.has_permissions(administrator=True)
+async def recover(bot: EventBot, ctx: commands.Context) -> None:
+    """Récupère manuellement les messages existants"""
+    await ctx.defer()
+    try:
+        await bot.recover_existing_messages()
+        await ctx.send("✅ Récupération des messages terminée !")
+        bot.logger.info(f"Récupération manuelle lancée par {ctx.author}")
+    except Exception as e:
+        bot.logger.error(f"Erreur recover: {e}")
+        await ctx.send("❌ Erreur lors de la récupération.")
+
+@EventBot.hybrid_command(name='event_link')
+@app_commands.default_permissions(administrator=True)
+@commands.has_permissions(administrator=True)
+async def event_link(bot: EventBot, ctx: commands.Context, *, event_name: str) -> None:
+    """Récupère le lien d'un événement par son nom (recherche floue)"""
+    events = bot.state.events_by_name()
+    matches = [(name, score) for name, score in bot.event_index.search(event_name, limit=5) if name in events]
+    
+    if not matches:
+        await ctx.send(f"❌ Aucun événement trouvé proche de '{event_name}'")
+    elif len(matches) == 1 or matches[0][1] == 1.0:
+        name = matches[0][0]
+        await ctx.send(f"**{name}**\n🔗 {events[name]['link']}")
+    else:
+        result = "**Plusieurs événements trouvés:**\n"
+        for name, _ in matches:
+            result += f"• **{name}**: {events[name]['link']}\n"
+        await ctx.send(result)
+
+@event_link.autocomplete('event_name')
+async def event_link_autocomplete(interaction: discord.Interaction,
+                                  current: str) -> List[app_commands.Choice[str]]:
+    """Suggestions tirées de l'index de recherche (aucun appel à Discord)"""
+    names = interaction.client.event_index.suggest(current)
+    return [app_commands.Choice(name=name[:100], value=name[:100]) for name in names]
+
+@EventBot.hybrid_command(name='calendar')
+@app_commands.default_permissions(administrator=True)
+@commands.has_permissions(administrator=True)
+async def calendar(bot: EventBot, ctx: commands.Context) -> None:
+    """Donne le lien du flux iCal des événements"""
+    link = bot.calendar_link()
+    if link is None:
+        await ctx.send("❌ Flux iCal désactivé (définir DASHBOARD_PORT).")
+        return
+    await ctx.send(f"📅 Calendrier des événements (boss, siège...) à ajouter dans votre agenda :\n{link}")
+
+def _format_archived_value(bot: EventBot, field: str, value: Any) -> str:
+    if value is None:
+        return "—"
+    if field in ('start_time', 'end_time'):
+        return datetime.fromisoformat(value).astimezone(bot.tz).strftime('%d/%m %H:%M')
+    text = str(value)
+    return text if len(text) <= 40 else f"{text[:39]}…"
+
+def _format_archived_change(bot: EventBot, event_id: int, timestamp: int, op: str,
+                            fields: Dict[str, Tuple[Any, Any]]) -> str:
+    """Ligne d'historique : date, événement, champs modifiés (avant → après, décalage des horaires)"""
+    when = datetime.fromtimestamp(timestamp, bot.tz).strftime('%d/%m %H:%M')
+    name = bot.archive.names.get(event_id, str(event_id))
+    if op == 'create':
+        start = fields.get('start_time', (None, None))[1]
+        return f"• {when} — **{name}** créé ({_format_archived_value(bot, 'start_time', start)})"
+    if op == 'delete':
+        return f"• {when} — **{name}** supprimé ou terminé"
+    if op == 'snapshot':
+        return f"• {when} — **{name}** état archivé (versions antérieures compactées)"
+    parts = []
+    for field, (before, after) in fields.items():
+        part = f"{field}: {_format_archived_value(bot, field, before)} → {_format_archived_value(bot, field, after)}"
+        if field in ('start_time', 'end_time') and before and after:
+            shift = datetime.fromisoformat(after) - datetime.fromisoformat(before)
+            minutes = int(shift.total_seconds() // 60)
+            part += f" ({'+' if minutes >= 0 else '-'}{abs(minutes) // 60}h{abs(minutes) % 60:02d})"
+        parts.append(part)
+    return f"• {when} — **{name}** {', '.join(parts)}"
+
+@EventBot.hybrid_command(name='history')
+@app_commands.default_permissions(administrator=True)
+@commands.has_permissions(administrator=True)
+async def event_history(bot: EventBot, ctx: commands.Context, days: Optional[int] = 30, *,
+                        event_name: str = "") -> None:
+    """Historique des modifications des événements (archive locale, sans appel à Discord)"""
+    if bot.archive is None:
+        await ctx.send("❌ Archive des événements désactivée (définir EVENT_ARCHIVE_FILE).")
+        return
+    since = int((bot.get_current_time() - timedelta(days=days or 30)).timestamp())
+    event_ids = bot.archive.find(event_name) if event_name else bot.archive.changed_since(since)
+    entries = sorted(
+        (timestamp, event_id, op, fields)
+        for event_id in event_ids
+        for timestamp, op, fields in bot.archive.changes(event_id, since)
+    )
+    if not entries:
+        await ctx.send(f"Aucune modification archivée sur les {days or 30} derniers jours.")
+        return
+    
+    # Les plus récentes, dans la limite d'un message Discord
+    lines = [_format_archived_change(bot, event_id, timestamp, op, fields)
+             for timestamp, event_id, op, fields in entries[-20:]]
+    header = f"**🗂️ Historique des événements ({days or 30} j)**"
+    if len(entries) > 20:
+        header += f" — {len(entries) - 20} modification(s) plus ancienne(s) non affichée(s)"
+    message = "\n".join([header, *lines])
+    await ctx.send(message if len(message) <= 1900 else message[:1899] + "…")
+
+@EventBot.hybrid_command(name='profile')
+@app_commands.default_permissions(administrator=True)
+@commands.has_permissions(administrator=True)
+async def profile(bot: EventBot, ctx: commands.Context, action: Literal['start', 'stop'],
+                  seconds: int = 60) -> None:
+    """Démarre ou arrête le profilage de la boucle d'événements"""
+    if action == 'start':
+        if bot.profiler.running:
+            await ctx.send("⏳ Profilage déjà en cours.")
+            return
+        bot.profiler.start(seconds)
+        await ctx.send(f"🔬 Profilage démarré pour {seconds}s (`/profile stop` pour l'arrêter avant).")
+        bot.logger.info(f"Profilage lancé par {ctx.author}")
+        return
+    
+    if not bot.profiler.running:
+        await ctx.send("❌ Aucun profilage en cours.")
+        return
+    path = bot.profiler.stop()
+    if path is None:
+        await ctx.send("❌ Erreur lors de l'écriture du profil.")
+        return
+    summary = "\n".join(bot.profiler.summary()) or "• Boucle inactive"
+    await ctx.send(f"✅ Profil écrit dans `{path}`\n**Temps CPU de la boucle:**\n{summary}")
+
+@EventBot.hybrid_command(name='help_admin')
+@app_commands.default_permissions(administrator=True)
 @commands.has_permissions(administrator=True)
 async def help_admin(bot: EventBot, ctx: commands.Context) -> None:
     """Affiche l'aide administrateur"""
-    help_msg = """
+    days = ['Lun', 'Mar', 'Mer', 'Jeu', 'Ven', 'Sam', 'Dim']
+    if bot.config.event_notify_offset is None:
+        notifications = "\n".join(
+            f"• {'/'.join(days[d] for d in kind.weekdays)} {kind.notification_slot[0]:02d}:"
+            f"{kind.notification_slot[1]:02d} → Notif {kind.name}"
+            for kind in bot.kinds if kind.notification_slot
+        )
+    else:
+        notifications = "\n".join(
+            f"• {bot.config.event_notify_offset} min avant chaque événement {kind.name} → Notif {kind.name}"
+            for kind in bot.kinds if kind.notification_slot
+        )
+    help_msg = f"""
 **🔧 Commandes Administrateur**
 
 **📊 Consultation:**
-• `!events` - Afficher tous les événements
-• `!status` - Statut du bot
+• `/events` - Afficher tous les événements
+• `/status` - Statut du bot
+• `/event_link <nom>` - Lien d'un événement (recherche tolérante aux fautes, autocomplétion)
+• `/calendar` - Lien du flux iCal des événements
+• `/history [jours] [nom]` - Historique des modifications des événements (archive locale)
 
 **⚡ Actions forcées:**
-• `!force_poll` - Créer un sondage
-• `!force_boss` - Notification boss
-• `!force_siege` - Notification siege
-• `!update_all_links` - Mettre à jour tous les liens
+• `/force_poll` - Créer un sondage
+• `/force_boss` - Notification boss
+• `/force_siege` - Notification siege
+• `/update_all_links` - Mettre à jour tous les liens
+• `/update_boss_links` / `/update_siege_links` - Mettre à jour les liens boss / siege
+• `/update_links <type>` / `/notify <type>` - Liens / notification d'un type d'événement
+• `/update_events` - Mettre à jour le cache des événements
+• `/recover` - Récupérer les messages existants
+• `/create_events` - Créer ou corriger les événements des modèles (N prochaines semaines)
+• `/profile start|stop` - Profiler la boucle d'événements (flamegraph)
 
 **⏰ Automatisations:**
 • Lundi 00:00 → Mise à jour hebdomadaire
 • Quotidien 18:00 → Sondage / 00:00 → Suppression
-• Sam/Dim 20:30 → Notif boss / Dim 14:30 → Notif siege
+{notifications}
 """
     await ctx.send(help_msg)
 
@@ -739,9 +3358,15 @@ async def help_admin(bot: EventBot, ctx: commands.Context) -> None:
 
 @EventBot.event
 async def on_command_error(bot: EventBot, ctx: commands.Context, error: Exception) -> None:
-    """Gestionnaire d'erreurs global"""
-    if isinstance(error, commands.MissingPermissions):
+    """Gestionnaire d'erreurs global (commandes préfixées et slash)"""
+    if isinstance(error, commands.HybridCommandError):
+        error = error.original
+    if isinstance(error, (commands.MissingPermissions, app_commands.MissingPermissions)):
         await ctx.send("❌ Permissions insuffisantes.")
+    elif isinstance(error, commands.CheckFailure) and not bot.shutdown.accepting:
+        await ctx.send("⏳ Arrêt du bot en cours, commande refusée.")
+    elif isinstance(error, commands.CheckFailure) and not bot.is_leader():
+        pass  # Réplique en attente : le leader répond
     elif isinstance(error, commands.CommandNotFound):
         pass  # Ignorer les commandes inconnues
     else:
@@ -752,17 +3377,72 @@ async def on_command_error(bot: EventBot, ctx: commands.Context, error: Exceptio
 async def on_ready(bot: EventBot) -> None:
     """Événement de connexion du bot"""
     bot.logger.info(f"Bot connecté: {bot.user}")
+    await bot.start_job_queue()
+
+@EventBot.event
+async def on_scheduled_event_create(bot: EventBot, event: discord.ScheduledEvent) -> None:
+    bot.handle_scheduled_event_change('create', event.id, event.name, event.start_time)
+
+@EventBot.event
+async def on_scheduled_event_update(bot: EventBot, before: discord.ScheduledEvent,
+                                    after: discord.ScheduledEvent) -> None:
+    bot.handle_scheduled_event_change('update', after.id, after.name, after.start_time)
+
+@EventBot.event
+async def on_scheduled_event_delete(bot: EventBot, event: discord.ScheduledEvent) -> None:
+    bot.handle_scheduled_event_change('delete', event.id, None, None)
+
+@EventBot.event
+async def on_raw_poll_vote_add(bot: EventBot, payload: discord.RawPollVoteActionEvent) -> None:
+    bot.handle_poll_vote('add', payload)
+
+@EventBot.event
+async def on_raw_poll_vote_remove(bot: EventBot, payload: discord.RawPollVoteActionEvent) -> None:
+    bot.handle_poll_vote('remove', payload)
 
 # ======================== POINT D'ENTRÉE ========================
 
+async def run_replay(bot: EventBot) -> None:
+    """Rejoue une cassette hors ligne puis exécute les opérations à profiler"""
+    player = CassettePlayer(bot.config.cassette_path, bot.config.cassette_speed, bot.logger)
+    player.attach(bot)
+    
+    async with bot:
+        # login() et setup_hook() consomment les réponses REST enregistrées
+        await bot.login(bot.config.discord_token)
+        await player.replay_gateway(bot)
+        
+        for name, operation in (('recover_existing_messages', bot.recover_existing_messages),
+                                ('update_link_messages', bot.update_link_messages)):
+            started = time.perf_counter()
+            await operation()
+            bot.logger.info(f"Rejeu: {name} exécuté en {(time.perf_counter() - started) * 1000:.1f} ms")
+
+async def run_worker(bot: EventBot) -> None:
+    """Worker sans connexion gateway : REST uniquement, travaux reçus du gateway"""
+    async with bot:
+        # login() exécute setup_hook(), qui se connecte à la file du gateway
+        await bot.login(bot.config.discord_token)
+        while not bot.is_closed():
+            await asyncio.sleep(1)
+
 def main() -> None:
     """Point d'entrée principal"""
+    bot = None
     try:
         bot = EventBot()
-        bot.run(bot.config.discord_token)
+        if bot.config.cassette_mode == 'replay':
+            asyncio.run(run_replay(bot))
+        elif bot.config.process_role == 'worker':
+            asyncio.run(run_worker(bot))
+        else:
+            bot.run(bot.config.discord_token)
     except Exception as e:
         print(f"Erreur critique: {e}")
         logging.error(f"Erreur critique: {e}")
+    finally:
+        if bot is not None and bot.cassette:
+            bot.cassette.flush()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,133 @@
+"""
+Flux iCal des événements
+========================
+
+Export iCalendar (RFC 5545) des événements programmés en cache : un bloc
+VEVENT par événement, re-rendu seulement quand ses champs changent, et
+validateurs (ETag, Last-Modified) pour les requêtes conditionnelles. Le
+serveur HTTP (aiohttp) reste dans bot_discord_v2.py.
+"""
+
+import hashlib
+import logging
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Mapping, Optional, Tuple
+
+
+class CalendarFeed:
+    """Flux iCalendar (.ics) des événements en cache, régénéré de façon incrémentale"""
+    
+    DEFAULT_DURATION = timedelta(hours=2)
+    
+    def __init__(self, logger: logging.Logger):
+        self.logger = logger
+        # ID d'événement -> (empreinte des champs, bloc VEVENT rendu)
+        self._blocks: Dict[int, Tuple[tuple, str]] = {}
+        self._events_version: Optional[int] = None
+        self.body = b""
+        self.etag = ""
+        self.last_modified = datetime.now(timezone.utc).replace(microsecond=0)
+    
+    def trim(self) -> None:
+        """Libère les blocs VEVENT mémorisés ; le flux est rendu en entier à la prochaine mise à jour"""
+        self._blocks.clear()
+        self._events_version = None
+    
+    @staticmethod
+    def _escape(text: str) -> str:
+        """Échappement des valeurs texte (RFC 5545 §3.3.11)"""
+        return (text.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+                .replace('\r\n', '\\n').replace('\n', '\\n'))
+    
+    @staticmethod
+    def _fold(line: str) -> str:
+        """Repli des lignes à 75 octets sans couper un caractère UTF-8"""
+        folded, current, size = [], "", 0
+        for char in line:
+            char_size = len(char.encode('utf-8'))
+            if size + char_size > 75:
+                folded.append(current)
+                current, size = " ", 1
+            current += char
+            size += char_size
+        folded.append(current)
+        return "\r\n".join(folded)
+    
+    @staticmethod
+    def _format_time(value: datetime) -> str:
+        return value.astimezone(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+    
+    def _render_event(self, data: Dict) -> str:
+        start = data['start_time']
+        end = data.get('end_time') or start + self.DEFAULT_DURATION
+        description = "\n".join(part for part in (data.get('description'), data['link']) if part)
+        status = 'CANCELLED' if data.get('status', '').lower() in ('cancelled', 'canceled') else 'CONFIRMED'
+        lines = [
+            "BEGIN:VEVENT",
+            f"UID:{data['id']}@discord.com",
+            f"DTSTAMP:{self._format_time(datetime.now(timezone.utc))}",
+            f"DTSTART:{self._format_time(start)}",
+            f"DTEND:{self._format_time(end)}",
+            f"SUMMARY:{self._escape(data['name'])}",
+            f"DESCRIPTION:{self._escape(description)}",
+            f"URL:{data['link']}",
+            f"STATUS:{status}",
+        ]
+        if data.get('location'):
+            lines.append(f"LOCATION:{self._escape(data['location'])}")
+        lines.append("END:VEVENT")
+        return "\r\n".join(self._fold(line) for line in lines)
+    
+    def update(self, events: Dict[str, Dict], events_version: int) -> bool:
+        """Met à jour le flux ; seuls les événements modifiés sont re-rendus"""
+        if events_version == self._events_version:
+            return False
+        self._events_version = events_version
+        
+        changed = False
+        seen = set()
+        for data in events.values():
+            if not data.get('start_time'):
+                continue
+            fingerprint = (data['name'], data['start_time'], data.get('end_time'), data.get('description'),
+                           data['link'], data.get('status'), data.get('location'))
+            seen.add(data['id'])
+            cached = self._blocks.get(data['id'])
+            if cached is not None and cached[0] == fingerprint:
+                continue
+            self._blocks[data['id']] = (fingerprint, self._render_event(data))
+            changed = True
+        
+        for removed_id in set(self._blocks) - seen:
+            del self._blocks[removed_id]
+            changed = True
+        
+        if changed or not self.body:
+            blocks = [block for _, (_, block) in sorted(self._blocks.items())]
+            text = "\r\n".join(["BEGIN:VCALENDAR", "VERSION:2.0", "PRODID:-//j0k3r91//bot-discord//FR",
+                                 "CALSCALE:GREGORIAN", "METHOD:PUBLISH", *blocks, "END:VCALENDAR"]) + "\r\n"
+            self.body = text.encode('utf-8')
+            self.etag = f'"{hashlib.sha1(self.body).hexdigest()}"'
+            self.last_modified = datetime.now(timezone.utc).replace(microsecond=0)
+            self.logger.info(f"Flux iCal régénéré: {len(blocks)} événement(s)")
+        return changed
+    
+    def is_fresh(self, headers: Mapping[str, str]) -> bool:
+        """Requête conditionnelle : If-None-Match prioritaire, sinon If-Modified-Since"""
+        if_none_match = headers.get('If-None-Match')
+        if if_none_match is not None:
+            return self.etag in [tag.strip() for tag in if_none_match.split(',')]
+        
+        if_modified_since = headers.get('If-Modified-Since')
+        if if_modified_since:
+            try:
+                return self.last_modified <= parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+        return False
+    
+    def headers(self) -> Dict[str, str]:
+        """En-têtes de réponse, communs au flux complet et au 304"""
+        return {'ETag': self.etag, 'Last-Modified': format_datetime(self.last_modified, usegmt=True),
+                'Cache-Control': 'public, max-age=300'}
@@ -0,0 +1,109 @@
+"""
+File d'échéances
+================
+
+Minuteurs nommés à l'instant près (notifications par événement) servis par
+une seule tâche asyncio qui dort jusqu'à la prochaine échéance. Réarmer ou
+annuler un minuteur ne parcourt pas le tas : les entrées périmées sont
+écartées au dépilage. Les rappels échus s'exécutent en tâches suivies,
+attendues (puis annulées au-delà du délai) par `stop`.
+"""
+
+import asyncio
+import contextlib
+import heapq
+import logging
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+
+class DeadlineQueue:
+    """File d'échéances : une seule tâche dort jusqu'à la plus proche et se réveille à chaque
+    armement ou annulation (aucun coût au repos, précision inférieure à la seconde)"""
+    
+    # Réveil de sécurité (horloge système recalée, mise en veille)
+    MAX_SLEEP = 300.0
+    
+    def __init__(self, logger: logging.Logger):
+        self.logger = logger
+        # Tas (échéance, numéro) ; les entrées remplacées ou annulées sont ignorées au dépilage
+        self._heap: List[Tuple[float, int, str]] = []
+        self._timers: Dict[str, Tuple[float, int, Callable[[], Awaitable[Any]]]] = {}
+        self._sequence = 0
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        # Rappels en cours : référencés jusqu'à leur fin (la boucle ne garde qu'une référence faible)
+        self._callbacks: Set[asyncio.Task] = set()
+    
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+    
+    def start(self) -> None:
+        if not self.running:
+            self._task = asyncio.create_task(self._run())
+    
+    async def stop(self, timeout: Optional[float] = None) -> None:
+        """Plus aucun minuteur ne se déclenche ; les rappels en cours sont attendus, puis annulés
+        s'ils dépassent `timeout`"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if not self._callbacks:
+            return
+        _, pending = await asyncio.wait(set(self._callbacks), timeout=timeout)
+        if pending:
+            self.logger.warning(f"{len(pending)} rappel(s) de minuteur interrompu(s) à l'arrêt")
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+    
+    def arm(self, key: str, when: datetime, callback: Callable[[], Awaitable[Any]]) -> None:
+        """Arme (ou réarme) le minuteur `key` pour l'instant `when`"""
+        self._sequence += 1
+        deadline = when.timestamp()
+        self._timers[key] = (deadline, self._sequence, callback)
+        heapq.heappush(self._heap, (deadline, self._sequence, key))
+        if self._heap[0][1] == self._sequence:
+            self._wakeup.set()
+    
+    def cancel(self, key: str) -> bool:
+        return self._timers.pop(key, None) is not None
+    
+    def keys(self) -> Set[str]:
+        return set(self._timers)
+    
+    def deadline(self, key: str) -> Optional[float]:
+        timer = self._timers.get(key)
+        return timer[0] if timer else None
+    
+    def _is_live(self, entry: Tuple[float, int, str]) -> bool:
+        timer = self._timers.get(entry[2])
+        return timer is not None and timer[1] == entry[1]
+    
+    async def _run(self) -> None:
+        while True:
+            while self._heap and not self._is_live(self._heap[0]):
+                heapq.heappop(self._heap)
+            timeout = self.MAX_SLEEP
+            if self._heap:
+                timeout = min(timeout, max(0.0, self._heap[0][0] - time.time()))
+            self._wakeup.clear()
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            
+            now = time.time()
+            while self._heap and self._heap[0][0] <= now:
+                entry = heapq.heappop(self._heap)
+                if self._is_live(entry):
+                    _, _, callback = self._timers.pop(entry[2])
+                    task = asyncio.create_task(self._fire(entry[2], callback))
+                    self._callbacks.add(task)
+                    task.add_done_callback(self._callbacks.discard)
+    
+    async def _fire(self, key: str, callback: Callable[[], Awaitable[Any]]) -> None:
+        try:
+            await callback()
+        except Exception as e:
+            self.logger.error(f"Erreur minuteur '{key}': {e}")
@@ -0,0 +1,193 @@
+"""
+Archive des événements programmés
+=================================
+
+Journal en ajout seul (JSONL) des versions successives des événements
+programmés, alimenté à chaque mise à jour du cache et interrogé par
+/history. Seuls les champs modifiés sont écrits ; la compaction réduit les
+versions antérieures à la rétention à un instantané par événement.
+"""
+
+import bisect
+import json
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from event_search import normalize
+
+
+class EventArchive:
+    """Archive en ajout seul des versions successives des événements programmés
+
+    Chaque ligne du fichier est un enregistrement JSON {t, id, op, d} : `t` en secondes epoch,
+    `op` parmi create/update/delete/snapshot et `d` limité aux champs modifiés depuis la version
+    précédente. L'archive est indexée en mémoire par ID d'événement et par date ; la compaction
+    réduit les versions antérieures à la rétention à un instantané par événement.
+    """
+    
+    FIELDS = ('name', 'start_time', 'end_time', 'location', 'description', 'status')
+    
+    def __init__(self, path: str, retention_days: int, logger: logging.Logger, compact_every: int = 500):
+        self.path = path
+        self.retention = timedelta(days=retention_days)
+        self.compact_every = compact_every
+        self.logger = logger
+        # Dernière version des événements existants
+        self.current: Dict[int, Dict[str, Any]] = {}
+        # Index par événement, puis chronologique (dates en parallèle pour la bisection)
+        self.history: Dict[int, List[Dict[str, Any]]] = {}
+        self._timeline: List[Dict[str, Any]] = []
+        self._times: List[int] = []
+        self.names: Dict[int, str] = {}
+        self._appended = 0
+    
+    def __len__(self) -> int:
+        return len(self._timeline)
+    
+    @classmethod
+    def _version(cls, event: Dict[str, Any]) -> Dict[str, Any]:
+        version = {}
+        for field in cls.FIELDS:
+            value = event.get(field)
+            if isinstance(value, datetime):
+                value = value.isoformat()
+            elif value is not None and not isinstance(value, (str, int, float)):
+                value = str(value)
+            version[field] = value
+        return version
+    
+    def _index(self, record: Dict[str, Any]) -> None:
+        event_id = record['id']
+        self.history.setdefault(event_id, []).append(record)
+        self._timeline.append(record)
+        self._times.append(record['t'])
+        if record['op'] == 'delete':
+            self.current.pop(event_id, None)
+        elif record['op'] in ('create', 'snapshot'):
+            self.current[event_id] = dict(record['d'])
+        else:
+            self.current.setdefault(event_id, {}).update(record['d'])
+        if record['d'].get('name'):
+            self.names[event_id] = record['d']['name']
+    
+    def load(self) -> None:
+        skipped = 0
+        try:
+            with open(self.path, encoding='utf-8') as archive_file:
+                for line in archive_file:
+                    try:
+                        self._index(json.loads(line))
+                    except (ValueError, KeyError, TypeError):
+                        skipped += 1
+        except FileNotFoundError:
+            return
+        except OSError as e:
+            self.logger.error(f"Erreur lecture de l'archive des événements: {e}")
+            return
+        if skipped:
+            self.logger.warning(f"Archive des événements: {skipped} ligne(s) illisible(s) ignorée(s)")
+        self.logger.info(f"Archive des événements: {len(self._timeline)} version(s), {len(self.history)} événement(s)")
+    
+    def record(self, events: Dict[str, Dict], now: datetime) -> int:
+        """Archive les différences entre les événements récupérés et leur dernière version connue"""
+        timestamp = int(now.timestamp())
+        records = []
+        seen = set()
+        for event in events.values():
+            event_id = event['id']
+            seen.add(event_id)
+            version = self._version(event)
+            previous = self.current.get(event_id)
+            if previous is None:
+                records.append({'t': timestamp, 'id': event_id, 'op': 'create', 'd': version})
+                continue
+            diff = {field: value for field, value in version.items() if previous.get(field) != value}
+            if diff:
+                records.append({'t': timestamp, 'id': event_id, 'op': 'update', 'd': diff})
+        # Absent de la liste : supprimé, ou terminé et retiré par Discord
+        for event_id in self.current.keys() - seen:
+            records.append({'t': timestamp, 'id': event_id, 'op': 'delete', 'd': {}})
+        if not records:
+            return 0
+        
+        try:
+            with open(self.path, 'a', encoding='utf-8') as archive_file:
+                archive_file.writelines(json.dumps(record, separators=(',', ':')) + "\n" for record in records)
+        except OSError as e:
+            self.logger.error(f"Erreur écriture de l'archive des événements: {e}")
+            return 0
+        for record in records:
+            self._index(record)
+        self._appended += len(records)
+        if self._appended >= self.compact_every:
+            self.compact(now)
+        return len(records)
+    
+    def compact(self, now: datetime) -> None:
+        """Replie les versions antérieures à la rétention en un instantané par événement (réécriture atomique)"""
+        cutoff = int((now - self.retention).timestamp())
+        compacted: List[Dict[str, Any]] = []
+        for event_id, records in self.history.items():
+            old = [record for record in records if record['t'] < cutoff]
+            recent = records[len(old):]
+            if old:
+                state: Optional[Dict[str, Any]] = None
+                for record in old:
+                    if record['op'] == 'delete':
+                        state = None
+                    elif record['op'] in ('create', 'snapshot'):
+                        state = dict(record['d'])
+                    else:
+                        state = {**(state or {}), **record['d']}
+                # Événement supprimé avant la rétention : oublié, sauf s'il a été modifié depuis
+                if state is not None:
+                    compacted.append({'t': old[-1]['t'], 'id': event_id, 'op': 'snapshot', 'd': state})
+            compacted.extend(recent)
+        compacted.sort(key=lambda record: record['t'])
+        
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as archive_file:
+                archive_file.writelines(json.dumps(record, separators=(',', ':')) + "\n" for record in compacted)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            self.logger.error(f"Erreur compaction de l'archive des événements: {e}")
+            return
+        
+        before = len(self._timeline)
+        self.current, self.history, self.names = {}, {}, {}
+        self._timeline, self._times = [], []
+        for record in compacted:
+            self._index(record)
+        self._appended = 0
+        self.logger.info(f"Archive des événements compactée: {before} -> {len(compacted)} version(s)")
+    
+    def find(self, query: str) -> List[int]:
+        """IDs d'événements archivés correspondant à un ID ou à un nom (actuel ou passé, sans accents)"""
+        if query.isdigit():
+            return [int(query)] if int(query) in self.history else []
+        wanted = normalize(query)
+        return [event_id for event_id, name in self.names.items() if wanted in normalize(name)]
+    
+    def changes(self, event_id: int, since: int = 0) -> List[Tuple[int, str, Dict[str, Tuple[Any, Any]]]]:
+        """Modifications d'un événement depuis `since` : (date, opération, {champ: (avant, après)})"""
+        state: Dict[str, Any] = {}
+        result = []
+        for record in self.history.get(event_id, []):
+            fields = {field: (state.get(field), value) for field, value in record['d'].items()}
+            if record['op'] == 'delete':
+                state = {}
+            elif record['op'] in ('create', 'snapshot'):
+                state = dict(record['d'])
+            else:
+                state.update(record['d'])
+            if record['t'] >= since:
+                result.append((record['t'], record['op'], fields))
+        return result
+    
+    def changed_since(self, since: int) -> List[int]:
+        """IDs des événements modifiés depuis `since` (bisection sur l'index chronologique)"""
+        start = bisect.bisect_left(self._times, since)
+        return list(dict.fromkeys(record['id'] for record in self._timeline[start:]))
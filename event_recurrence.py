@@ -0,0 +1,248 @@
+"""
+Occurrences des événements récurrents
+=====================================
+
+Discord ne renvoie qu'une date de début pour un événement récurrent,
+accompagnée de sa règle de récurrence. Les occurrences sont générées à la
+demande sur une fenêtre bornée (jamais de liste complète de la série) et
+mises en cache par événement et par version de règle. Partagé par main.py
+et bot_discord_v2.py.
+
+La règle est appliquée en heure locale du serveur (fuseau `tz`) : une série
+créée l'hiver à 21:00 reste à 21:00 l'été, comme dans le client Discord.
+"""
+
+import calendar
+from collections import OrderedDict
+from datetime import datetime, timedelta, tzinfo
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Fréquences de l'API Discord (0 = annuelle ... 3 = quotidienne)
+FREQUENCIES = ('yearly', 'monthly', 'weekly', 'daily')
+
+# Horizon de recherche de la prochaine occurrence (une règle annuelle en produit au moins une)
+NEXT_OCCURRENCE_HORIZON = timedelta(days=400)
+
+
+def _value(item: Any) -> int:
+    """Valeur entière d'une énumération discord.py ou d'un entier brut"""
+    return int(getattr(item, 'value', item))
+
+
+def _field(rule: Any, *names: str) -> Any:
+    """Premier attribut (objet discord.py) ou clé (charge utile brute) renseigné"""
+    for name in names:
+        value = rule.get(name) if isinstance(rule, dict) else getattr(rule, name, None)
+        if value is not None:
+            return value
+    return None
+
+
+def rule_from_event(event: Any) -> Optional[Dict]:
+    """Règle de récurrence d'un événement programmé sous forme de dictionnaire, None si ponctuel"""
+    rule = getattr(event, 'recurrence_rule', None)
+    if rule is None:
+        return None
+
+    frequency = _field(rule, 'frequency')
+    name = getattr(frequency, 'name', None)
+    if name is None and isinstance(frequency, int) and 0 <= frequency < len(FREQUENCIES):
+        name = FREQUENCIES[frequency]
+    if name not in FREQUENCIES:
+        return None
+
+    n_weekdays = []
+    for item in _field(rule, 'n_weekdays', 'by_n_weekday') or ():
+        if isinstance(item, dict):
+            n_weekdays.append((int(item['n']), _value(item['day'])))
+        elif hasattr(item, 'n'):
+            n_weekdays.append((int(item.n), _value(item.day)))
+        else:
+            n_weekdays.append((int(item[0]), _value(item[1])))
+
+    end = _field(rule, 'end')
+    if isinstance(end, str):
+        end = datetime.fromisoformat(end.replace('Z', '+00:00'))
+    return {
+        'frequency': name,
+        'interval': int(_field(rule, 'interval') or 1),
+        'weekdays': sorted({_value(day) for day in _field(rule, 'weekdays', 'by_weekday') or ()}),
+        'n_weekdays': sorted(n_weekdays),
+        'months': sorted({_value(month) for month in _field(rule, 'months', 'by_month') or ()}),
+        'month_days': sorted({int(day) for day in _field(rule, 'month_days', 'by_month_day') or ()}),
+        'count': _field(rule, 'count'),
+        'end': end,
+    }
+
+
+def _nth_weekday(year: int, month: int, n: int, weekday: int) -> Optional[int]:
+    """Jour du mois du n-ième `weekday` (n négatif : en partant de la fin)"""
+    days = [week[weekday] for week in calendar.monthcalendar(year, month) if week[weekday]]
+    index = n - 1 if n > 0 else n
+    return days[index] if -len(days) <= index < len(days) else None
+
+
+def _candidates(start_time: datetime, rule: Dict, first: datetime, until: datetime) -> Iterator[datetime]:
+    """Dates candidates croissantes, de la période qui contient `first` jusqu'à `until`
+    (pas d'itération depuis le début de la série pour les fréquences régulières ; une règle
+    qui ne produit aucune date s'arrête aussi à `until`)"""
+    frequency = rule['frequency']
+    interval = max(1, rule.get('interval') or 1)
+    weekdays = rule.get('weekdays') or []
+
+    if frequency == 'daily':
+        period = timedelta(days=interval)
+        k = max(0, (first - start_time) // period)
+        moment = start_time + k * period
+        while moment < until:
+            if not weekdays or moment.weekday() in weekdays:
+                yield moment
+            k += 1
+            moment = start_time + k * period
+        return
+
+    if frequency == 'weekly':
+        period = timedelta(weeks=interval)
+        week0 = start_time - timedelta(days=start_time.weekday())
+        days = weekdays or [start_time.weekday()]
+        k = max(0, (first - week0) // period)
+        monday = week0 + k * period
+        while monday < until:
+            for day in days:
+                yield monday + timedelta(days=day)
+            k += 1
+            monday = week0 + k * period
+        return
+
+    # Mensuelle : parcours mois par mois ; annuelle : année par année (quelques candidats par période)
+    if frequency == 'monthly':
+        origin = start_time.year * 12 + start_time.month - 1
+        index = max(origin, first.year * 12 + first.month - 1)
+    else:
+        origin = start_time.year
+        index = max(origin, first.year)
+    index += (origin - index) % interval
+    while (index // 12 if frequency == 'monthly' else index) <= until.year:
+        if frequency == 'monthly':
+            year, month = divmod(index, 12)
+            months = [month + 1]
+        else:
+            year, months = index, rule.get('months') or [start_time.month]
+        for month in months:
+            if frequency == 'monthly' and rule.get('n_weekdays'):
+                days = [_nth_weekday(year, month, n, day) for n, day in rule['n_weekdays']]
+            else:
+                days = rule.get('month_days') or [start_time.day]
+            last_day = calendar.monthrange(year, month)[1]
+            for day in sorted({day for day in days if day and day <= last_day}):
+                yield start_time.replace(year=year, month=month, day=day)
+        index += interval
+
+
+def iter_occurrences(start_time: datetime, rule: Optional[Dict], window_start: datetime,
+                     window_end: datetime, tz: Optional[tzinfo] = None) -> Iterator[datetime]:
+    """Occurrences dans [window_start, window_end[, générées paresseusement. Les dates sont
+    calculées en heure murale du fuseau `tz` (défaut : celui de `start_time`) puis reconverties
+    dans le fuseau de `start_time`"""
+    if rule is None:
+        if window_start <= start_time < window_end:
+            yield start_time
+        return
+
+    zone = tz or start_time.tzinfo
+
+    def wall_clock(moment: datetime) -> datetime:
+        return moment.astimezone(zone).replace(tzinfo=None) if zone is not None else moment
+
+    count = rule.get('count')
+    end = rule.get('end')
+    # Avec un nombre d'occurrences limité, le décompte part du début de la série (borné par `count`)
+    first = start_time if count else max(start_time, window_start)
+    produced = 0
+    until = window_end if end is None else min(window_end, end + timedelta(microseconds=1))
+    # Marge d'un jour : l'écart entre heure murale et instant réel est inférieur à 24 h
+    candidates = _candidates(wall_clock(start_time), rule, wall_clock(first), wall_clock(until) + timedelta(days=1))
+    for local in candidates:
+        moment = local.replace(tzinfo=zone).astimezone(start_time.tzinfo) if zone is not None else local
+        if moment < start_time:
+            continue
+        if moment >= until:
+            return
+        produced += 1
+        if count and produced > count:
+            return
+        if moment >= window_start:
+            yield moment
+
+
+def next_occurrence(start_time: datetime, rule: Optional[Dict], after: datetime,
+                    tz: Optional[tzinfo] = None) -> Optional[datetime]:
+    """Première occurrence à partir de `after` (seule la première est générée)"""
+    if rule is None:
+        return start_time
+    return next(iter_occurrences(start_time, rule, after, after + NEXT_OCCURRENCE_HORIZON, tz), None)
+
+
+class OccurrenceCache:
+    """Occurrences développées par événement, version de règle et fenêtre (éviction LRU)"""
+
+    def __init__(self, tz: Optional[tzinfo] = None, max_entries: int = 512):
+        self.tz = tz
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[Tuple, Tuple[datetime, ...]]' = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def rule_version(start_time: datetime, rule: Dict) -> str:
+        """Empreinte de la règle : une règle ou une date de début modifiée invalide l'entrée"""
+        return repr((start_time.isoformat(), sorted(rule.items())))
+
+    def occurrences(self, event_id: int, start_time: datetime, rule: Optional[Dict],
+                    window_start: datetime, window_end: datetime) -> Tuple[datetime, ...]:
+        if rule is None:
+            return tuple(iter_occurrences(start_time, None, window_start, window_end, self.tz))
+        key = (event_id, self.rule_version(start_time, rule), window_start, window_end)
+        cached = self._entries.get(key)
+        if cached is None:
+            cached = tuple(iter_occurrences(start_time, rule, window_start, window_end, self.tz))
+            self._entries[key] = cached
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        else:
+            self._entries.move_to_end(key)
+        return cached
+
+    def expand(self, events: Iterable[Dict], window_start: datetime, window_end: datetime) -> List[Dict]:
+        """Liste des événements où chaque série récurrente est remplacée par ses occurrences de la
+        fenêtre ; les événements ponctuels sont conservés tels quels. Le nom reste celui de la série"""
+        expanded: List[Dict] = []
+        for data in events:
+            rule = data.get('recurrence')
+            if rule is None or not data.get('start_time'):
+                expanded.append(data)
+                continue
+            moments = self.occurrences(data['id'], data['start_time'], rule, window_start, window_end)
+            expanded.extend(self.occurrence(data, moment) for moment in moments)
+        return expanded
+
+    @staticmethod
+    def occurrence(data: Dict, moment: datetime) -> Dict:
+        """Copie de l'événement à la date d'une occurrence (durée conservée) ; le début de la
+        série reste disponible dans `series_start_time`"""
+        occurrence = dict(data, start_time=moment, series_start_time=data['start_time'])
+        if data.get('end_time'):
+            occurrence['end_time'] = moment + (data['end_time'] - data['start_time'])
+        return occurrence
+
+    def trim(self) -> None:
+        self._entries.clear()
+
+    def prune(self, event_ids: List[int]) -> int:
+        """Retire les entrées des événements disparus"""
+        wanted = set(event_ids)
+        stale = [key for key in self._entries if key[0] not in wanted]
+        for key in stale:
+            del self._entries[key]
+        return len(stale)
@@ -0,0 +1,114 @@
+"""
+Recherche floue des événements
+==============================
+
+Index de trigrammes sur les noms d'événements normalisés (minuscules, sans
+accents ni ponctuation), partagé par main.py et bot_discord_v2.py.
+Tolère les fautes de frappe et les accents, classe les résultats par
+similarité et fournit des suggestions pour l'autocomplétion.
+"""
+
+import unicodedata
+from collections import Counter
+from typing import Dict, Iterable, List, Set, Tuple
+
+
+def normalize(text: str) -> str:
+    """Minuscules, accents retirés, ponctuation remplacée par des espaces"""
+    decomposed = unicodedata.normalize('NFKD', text)
+    without_accents = "".join(char for char in decomposed if not unicodedata.combining(char))
+    cleaned = "".join(char if char.isalnum() else " " for char in without_accents.casefold())
+    return " ".join(cleaned.split())
+
+
+def trigrams(normalized: str) -> Set[str]:
+    """Trigrammes de chaque mot, complétés par des espaces pour favoriser les débuts de mots"""
+    grams = set()
+    for word in normalized.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class EventSearchIndex:
+    """Index de trigrammes des noms d'événements, mis à jour de façon incrémentale"""
+
+    def __init__(self, threshold: float = 0.35):
+        self.threshold = threshold
+        # Nom d'origine -> (nom normalisé, trigrammes)
+        self._entries: Dict[str, Tuple[str, Set[str]]] = {}
+        # Trigramme -> noms d'origine qui le contiennent
+        self._postings: Dict[str, Set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, name: str) -> None:
+        if name in self._entries:
+            return
+        normalized = normalize(name)
+        grams = trigrams(normalized)
+        self._entries[name] = (normalized, grams)
+        for gram in grams:
+            self._postings.setdefault(gram, set()).add(name)
+
+    def remove(self, name: str) -> None:
+        entry = self._entries.pop(name, None)
+        if entry is None:
+            return
+        for gram in entry[1]:
+            names = self._postings.get(gram)
+            if names is not None:
+                names.discard(name)
+                if not names:
+                    del self._postings[gram]
+
+    def sync(self, names: Iterable[str]) -> Tuple[int, int]:
+        """Aligne l'index sur la liste de noms ; seuls les ajouts et retraits sont traités"""
+        wanted = set(names)
+        added = wanted - self._entries.keys()
+        removed = self._entries.keys() - wanted
+        for name in removed:
+            self.remove(name)
+        for name in added:
+            self.add(name)
+        return len(added), len(removed)
+
+    def _score(self, query: str, query_grams: Set[str], name: str, shared: int) -> float:
+        normalized, grams = self._entries[name]
+        if query == normalized:
+            return 1.0
+        # Dice (similarité globale) et couverture de la requête (requêtes courtes)
+        dice = 2 * shared / (len(query_grams) + len(grams))
+        coverage = shared / len(query_grams)
+        score = (dice + coverage) / 2
+        if query in normalized:
+            score = max(score, 0.75 + 0.2 * len(query) / len(normalized))
+        return score
+
+    def search(self, query: str, limit: int = 5) -> List[Tuple[str, float]]:
+        """Noms les plus proches de la requête, classés par similarité décroissante"""
+        normalized = normalize(query)
+        query_grams = trigrams(normalized)
+        if not query_grams:
+            return []
+
+        shared_counts = Counter()
+        for gram in query_grams:
+            shared_counts.update(self._postings.get(gram, ()))
+
+        scored = [
+            (name, self._score(normalized, query_grams, name, shared))
+            for name, shared in shared_counts.items()
+        ]
+        ranked = sorted(
+            (item for item in scored if item[1] >= self.threshold),
+            key=lambda item: (-item[1], item[0])
+        )
+        return ranked[:limit]
+
+    def suggest(self, prefix: str, limit: int = 25) -> List[str]:
+        """Suggestions d'autocomplétion (25 au maximum côté Discord)"""
+        if not normalize(prefix):
+            return sorted(self._entries)[:limit]
+        return [name for name, _ in self.search(prefix, limit)]
@@ -0,0 +1,187 @@
+"""
+Banc de bascule haute disponibilité
+===================================
+
+Lance deux répliques (processus séparés) sur un même fichier de bail
+HA_LEASE_FILE. Chacune suit la boucle du bot : renouvellement du bail,
+reprise des réservations en attente (historique relu d'abord), réservation de
+l'exécution (`claim`), vérification du jeton de fencing (`validate`) juste
+avant l'envoi par un faux expéditeur qui journalise chaque publication, puis
+fin de l'exécution (`complete`). Le leader est tué (ou suspendu) au milieu du
+planning, juste après une publication (`--window post`) ou entre la
+réservation et l'envoi (`--window claim`) ; le banc vérifie que chaque
+créneau a été publié exactement une fois.
+
+Usage :
+    python failover_test.py --mode kill
+    python failover_test.py --mode pause --window claim --slots 10 --interval 1.5 --ttl 0.6
+"""
+
+import argparse
+import json
+import logging
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+from leader_lease import LeaderLease
+
+# ======================== RÉPLIQUE ========================
+
+def post(posts_file: str, slot: int, lease: LeaderLease, latency: float) -> None:
+    """Faux expéditeur : une ligne par publication, écrite de façon durable"""
+    time.sleep(latency)
+    with open(posts_file, 'a', encoding='utf-8') as handle:
+        handle.write(json.dumps({'slot': slot, 'holder': lease.holder, 'token': lease.token}) + "\n")
+        handle.flush()
+        os.fsync(handle.fileno())
+
+def hold_after_claim(args: argparse.Namespace, slot: int, lease: LeaderLease) -> None:
+    """Défaillance injectée une seule fois entre la réservation et l'envoi du créneau `fail_slot` :
+    la réplique signale la réservation puis se bloque plus longtemps que le bail"""
+    if slot != args.fail_slot or os.path.exists(args.marker):
+        return
+    with open(f"{args.marker}.tmp", 'w', encoding='utf-8') as handle:
+        json.dump({'slot': slot, 'holder': lease.holder}, handle)
+    os.replace(f"{args.marker}.tmp", args.marker)
+    time.sleep(2 * args.ttl)
+
+def run_replica(args: argparse.Namespace) -> None:
+    """Boucle d'une réplique : créneau `i` dû à start + i * interval, seul le plus récent est rattrapé
+    (comme le planificateur du bot)"""
+    logging.basicConfig(level=logging.WARNING, stream=sys.stderr)
+    lease = LeaderLease(args.lease, args.replica, args.ttl, logging.getLogger(args.replica))
+    tick = args.ttl / 5
+    end = args.start + args.slots * args.interval + 2 * args.ttl
+    while time.time() < end:
+        now = time.time()
+        if lease.try_acquire() and now >= args.start:
+            # Réservations interrompues par l'ancien leader : publiées seulement si absentes du journal
+            for action, value in lease.pending():
+                if lease.claim(action, value, resume=True) and lease.validate():
+                    if int(value) not in {entry['slot'] for entry in read_posts(args.posts)}:
+                        post(args.posts, int(value), lease, args.send_latency)
+                    lease.complete(action, value)
+            slot = min(int((now - args.start) // args.interval), args.slots - 1)
+            if lease.claim('notification', str(slot)):
+                hold_after_claim(args, slot, lease)
+                if lease.validate():
+                    post(args.posts, slot, lease, args.send_latency)
+                    lease.complete('notification', str(slot))
+        time.sleep(tick)
+    lease.release()
+
+# ======================== ORCHESTRATION ========================
+
+def read_posts(posts_file: str) -> List[Dict]:
+    try:
+        with open(posts_file, encoding='utf-8') as handle:
+            return [json.loads(line) for line in handle if line.strip()]
+    except FileNotFoundError:
+        return []
+
+def failing_leader(window: str, posts_file: str, marker_file: str, slots: int) -> Optional[str]:
+    """Réplique à faire défaillir : dès la moitié des créneaux publiée, ou dès la réservation injectée"""
+    if window == 'claim':
+        if not os.path.exists(marker_file):
+            return None
+        with open(marker_file, encoding='utf-8') as handle:
+            return json.load(handle)['holder']
+    posts = read_posts(posts_file)
+    return posts[-1]['holder'] if len(posts) >= slots // 2 else None
+
+def run_scenario(mode: str, slots: int = 8, interval: float = 2.0, ttl: float = 0.8,
+                 send_latency: float = 0.05, verbose: bool = True, window: str = 'post') -> bool:
+    """Deux répliques, défaillance du leader au milieu du planning ; True si chaque créneau
+    a été publié exactement une fois"""
+    with tempfile.TemporaryDirectory() as workdir:
+        lease_file = os.path.join(workdir, 'lease.sqlite3')
+        posts_file = os.path.join(workdir, 'posts.jsonl')
+        marker_file = os.path.join(workdir, 'claimed.json')
+        # Le bail doit durer moins qu'un demi-créneau : la réplique restante rattrape le créneau en cours
+        start = time.time() + 1.0
+        replicas = {}
+        for name in ('replica-a', 'replica-b'):
+            replicas[name] = subprocess.Popen([
+                sys.executable, os.path.abspath(__file__), '--replica', name,
+                '--lease', lease_file, '--posts', posts_file, '--start', repr(start),
+                '--slots', str(slots), '--interval', str(interval), '--ttl', str(ttl),
+                '--send-latency', str(send_latency), '--marker', marker_file,
+                '--fail-slot', str(slots // 2 if window == 'claim' else -1),
+            ])
+
+        failed_leader = None
+        deadline = start + slots * interval + 4 * ttl + 5
+        try:
+            # Défaillance au milieu du planning, juste après une publication ou après une réservation
+            while failed_leader is None and time.time() < deadline:
+                failed_leader = failing_leader(window, posts_file, marker_file, slots)
+                if failed_leader is not None:
+                    if mode == 'kill':
+                        replicas[failed_leader].kill()
+                    else:
+                        # Pause (GC, machine virtuelle figée) plus longue que le bail, puis reprise
+                        os.kill(replicas[failed_leader].pid, signal.SIGSTOP)
+                        time.sleep(3 * ttl)
+                        os.kill(replicas[failed_leader].pid, signal.SIGCONT)
+                time.sleep(0.01)
+            for process in replicas.values():
+                process.wait(timeout=max(1.0, deadline - time.time()))
+        finally:
+            for process in replicas.values():
+                if process.poll() is None:
+                    process.kill()
+                    process.wait()
+
+        posts = read_posts(posts_file)
+
+    counts = Counter(entry['slot'] for entry in posts)
+    wrong = {slot: counts[slot] for slot in range(slots) if counts[slot] != 1}
+    tokens = [entry['token'] for entry in posts]
+    ok = failed_leader is not None and not wrong and tokens == sorted(tokens)
+    if verbose:
+        print(f"Mode {mode} ({window}): leader défaillant {failed_leader or 'aucun'}, {len(posts)} publication(s) "
+              f"pour {slots} créneau(x)")
+        for entry in posts:
+            print(f"  créneau {entry['slot']:>2}  {entry['holder']}  jeton {entry['token']}")
+        if wrong:
+            print(f"❌ Créneaux publiés zéro ou plusieurs fois: {wrong}")
+        elif failed_leader is None:
+            print("❌ Aucune défaillance provoquée (aucune publication observée)")
+        elif tokens != sorted(tokens):
+            print("❌ Publication avec un jeton périmé après la bascule")
+        else:
+            print("✅ Chaque créneau publié exactement une fois")
+    return ok
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Banc de bascule à deux répliques sur un bail partagé")
+    parser.add_argument('--mode', choices=('kill', 'pause'), default='kill',
+                        help="défaillance du leader : arrêt brutal ou suspension plus longue que le bail")
+    parser.add_argument('--window', choices=('post', 'claim'), default='post',
+                        help="moment de la défaillance : juste après une publication, ou entre réservation et envoi")
+    parser.add_argument('--slots', type=int, default=8, help="nombre de créneaux planifiés")
+    parser.add_argument('--interval', type=float, default=2.0, help="écart entre deux créneaux (s)")
+    parser.add_argument('--ttl', type=float, default=0.8, help="durée du bail (s)")
+    parser.add_argument('--send-latency', type=float, default=0.05, help="latence du faux expéditeur (s)")
+    # Options internes des processus répliques
+    parser.add_argument('--replica', help=argparse.SUPPRESS)
+    parser.add_argument('--lease', help=argparse.SUPPRESS)
+    parser.add_argument('--posts', help=argparse.SUPPRESS)
+    parser.add_argument('--start', type=float, help=argparse.SUPPRESS)
+    parser.add_argument('--marker', help=argparse.SUPPRESS)
+    parser.add_argument('--fail-slot', type=int, default=-1, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.replica:
+        run_replica(args)
+        return
+    sys.exit(0 if run_scenario(args.mode, args.slots, args.interval, args.ttl, args.send_latency,
+                               window=args.window) else 1)
+
+if __name__ == "__main__":
+    main()
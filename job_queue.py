@@ -0,0 +1,237 @@
+"""
+File de travaux gateway / workers
+=================================
+
+Transport de la topologie PROCESS_ROLE : le gateway publie des travaux JSON
+(une ligne par message) sur un socket Unix local, les workers les exécutent
+et les acquittent. Les travaux non acquittés d'un worker déconnecté sont
+remis en file, sauf ceux marqués `at_most_once` que le worker avait commencés.
+Le contexte Discord des commandes transmises reste dans
+bot_discord_v2.py.
+"""
+
+import asyncio
+import contextlib
+import json
+import logging
+import os
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+
+class JobQueueServer:
+    """Côté gateway : file de travaux servie aux workers sur un socket Unix (JSON, une ligne par message)
+
+    Les workers se partagent la file ; chaque travail est acquitté une fois exécuté et ceux
+    d'un worker déconnecté sont remis en file pour un autre (livraison « au moins une fois »).
+    Un travail non idempotent (`at_most_once`, ex. commande qui publie) est signalé par le worker
+    avant son exécution ; commencé, il n'est jamais rejoué, même sans acquittement.
+    Les commandes passent avant les autres travaux et disposent d'une réserve de places :
+    une rafale de travaux de fond est délestée avant qu'une commande ne soit refusée.
+    """
+    
+    # Priorité de distribution par type de travail (plus petit = servi en premier)
+    PRIORITIES = {'command': 0}
+    BACKGROUND_PRIORITY = 1
+    
+    def __init__(self, path: str, logger: logging.Logger, max_pending: int = 1000):
+        self.path = path
+        # Premier message envoyé à chaque worker (serveur géré)
+        self.hello: Dict[str, Any] = {}
+        self.logger = logger
+        self.max_pending = max_pending
+        # Places réservées aux commandes quand la file se remplit de travaux de fond
+        self.reserved = max(1, max_pending // 10)
+        self._queue: asyncio.PriorityQueue = asyncio.PriorityQueue(maxsize=max_pending)
+        self._next_id = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+        self.workers = 0
+        self.stats: Counter = Counter()
+        # Incrémentée à chaque changement visible dans describe() (clé du rendu de /status)
+        self.version = 0
+    
+    @property
+    def is_serving(self) -> bool:
+        return self._server is not None
+    
+    async def start(self) -> None:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(self.path)  # Socket laissé par une exécution précédente
+        self._server = await asyncio.start_unix_server(self._serve_worker, path=self.path)
+        self.logger.info(f"File de travaux ouverte sur {self.path}")
+    
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(self.path)
+    
+    def _priority(self, job: Dict[str, Any]) -> int:
+        return self.PRIORITIES.get(job['type'], self.BACKGROUND_PRIORITY)
+    
+    def _enqueue(self, job: Dict[str, Any]) -> None:
+        # L'ID départage les travaux de même priorité (ordre d'arrivée)
+        self._queue.put_nowait((self._priority(job), job['id'], job))
+    
+    def submit(self, job: Dict[str, Any]) -> bool:
+        """Ajoute un travail sans jamais bloquer le gateway ; False si la file est saturée
+        (les travaux de fond sont refusés dès qu'il ne reste que la réserve des commandes)"""
+        self._next_id += 1
+        job = {**job, 'id': self._next_id}
+        try:
+            if (self._priority(job) != self.PRIORITIES['command']
+                    and self._queue.qsize() >= self.max_pending - self.reserved):
+                raise asyncio.QueueFull
+            self._enqueue(job)
+        except asyncio.QueueFull:
+            self.stats['dropped'] += 1
+            self.version += 1
+            self.logger.warning(f"File de travaux saturée: '{job['type']}' abandonné")
+            return False
+        self.stats['forwarded'] += 1
+        self.version += 1
+        return True
+    
+    async def _serve_worker(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.workers += 1
+        self.version += 1
+        self.logger.info(f"Worker connecté ({self.workers} au total)")
+        in_flight: Dict[int, Dict[str, Any]] = {}
+        started: Set[int] = set()
+        acks = asyncio.create_task(self._read_acks(reader, in_flight, started))
+        try:
+            writer.write(json.dumps({'type': 'hello', **self.hello}).encode() + b"\n")
+            await writer.drain()
+            while not acks.done():
+                getter = asyncio.create_task(self._queue.get())
+                done, _ = await asyncio.wait({getter, acks}, return_when=asyncio.FIRST_COMPLETED)
+                if getter not in done:
+                    # Worker parti : un travail retiré entre-temps reste dû
+                    if not getter.cancel():
+                        self._queue.put_nowait(getter.result())
+                    break
+                _, _, job = getter.result()
+                in_flight[job['id']] = job
+                self.version += 1
+                writer.write(json.dumps(job).encode() + b"\n")
+                await writer.drain()
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            acks.cancel()
+            outcomes: Counter = Counter()
+            for job_id, job in in_flight.items():
+                if job.get('at_most_once') and job_id in started:
+                    # Peut-être exécuté avant la coupure : pas de seconde exécution
+                    outcomes['lost'] += 1
+                elif self._queue.full():
+                    outcomes['dropped'] += 1
+                else:
+                    self._enqueue(job)
+                    outcomes['requeued'] += 1
+            self.stats.update(outcomes)
+            writer.close()
+            self.workers -= 1
+            self.version += 1
+            if outcomes['lost'] or outcomes['dropped']:
+                self.logger.warning(f"Worker déconnecté: {outcomes['requeued']} travail(aux) remis en file, "
+                                    f"{outcomes['lost']} commencé(s) non rejoué(s), "
+                                    f"{outcomes['dropped']} abandonné(s) (file saturée)")
+            else:
+                self.logger.info(f"Worker déconnecté, {outcomes['requeued']} travail(aux) remis en file")
+    
+    async def _read_acks(self, reader: asyncio.StreamReader, in_flight: Dict[int, Dict[str, Any]],
+                         started: Set[int]) -> None:
+        with contextlib.suppress(ConnectionError, OSError, ValueError):
+            async for line in reader:
+                message = json.loads(line)
+                if 'started' in message:
+                    started.add(message['started'])
+                elif in_flight.pop(message.get('ack'), None) is not None:
+                    self.stats['acked'] += 1
+                    self.version += 1
+    
+    def describe(self) -> str:
+        return (f"gateway — {self.workers} worker(s), {self._queue.qsize()} en file, "
+                f"{self.stats['forwarded']} transmis / {self.stats['acked']} acquittés"
+                + (f" / {self.stats['dropped']} abandonnés" if self.stats['dropped'] else "")
+                + (f" / {self.stats['lost']} non rejoués" if self.stats['lost'] else ""))
+
+class JobQueueClient:
+    """Côté worker : reçoit les travaux du gateway, les exécute et les acquitte une fois terminés"""
+    
+    def __init__(self, path: str, handler: Callable[[Dict[str, Any]], Awaitable[None]],
+                 concurrency: int, logger: logging.Logger):
+        self.path = path
+        self.handler = handler
+        self.concurrency = concurrency
+        self.logger = logger
+        self.connected = False
+        self.stats: Counter = Counter()
+        # Incrémentée à chaque changement visible dans describe() (clé du rendu de /status)
+        self.version = 0
+    
+    async def run(self, should_consume: Callable[[], bool]) -> None:
+        """Boucle de connexion ; le worker ne consomme que tant que `should_consume()` est vrai"""
+        while True:
+            if not should_consume():
+                await asyncio.sleep(1)
+                continue
+            try:
+                reader, writer = await asyncio.open_unix_connection(self.path)
+            except OSError as e:
+                self.logger.debug(f"Gateway injoignable sur {self.path}: {e}")
+                await asyncio.sleep(2)
+                continue
+            self.connected = True
+            self.version += 1
+            self.logger.info(f"Connecté au gateway ({self.path})")
+            try:
+                await self._consume(reader, writer, should_consume)
+            except (ConnectionError, OSError, ValueError) as e:
+                self.logger.warning(f"Connexion au gateway interrompue: {e}")
+            finally:
+                self.connected = False
+                self.version += 1
+                writer.close()
+            await asyncio.sleep(1)
+    
+    async def _consume(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                       should_consume: Callable[[], bool]) -> None:
+        semaphore = asyncio.Semaphore(self.concurrency)
+        async for line in reader:
+            if not should_consume():
+                # Le travail lu, non acquitté, sera remis en file par le gateway
+                break
+            job = json.loads(line)
+            if job.get('type') == 'hello':
+                await self.handler(job)
+                continue
+            # Au-delà de `concurrency` travaux en cours, la lecture s'arrête (contre-pression)
+            await semaphore.acquire()
+            asyncio.create_task(self._run_job(job, writer, semaphore))
+    
+    async def _run_job(self, job: Dict[str, Any], writer: asyncio.StreamWriter,
+                       semaphore: asyncio.Semaphore) -> None:
+        try:
+            if job.get('at_most_once'):
+                # Signalé avant l'exécution : le gateway ne rejouera pas ce travail après une coupure
+                writer.write(json.dumps({'started': job['id']}).encode() + b"\n")
+                await writer.drain()
+            await self.handler(job)
+            self.stats['done'] += 1
+        except Exception as e:
+            self.stats['failed'] += 1
+            self.logger.error(f"Erreur travail '{job.get('type')}' #{job.get('id')}: {e}")
+        finally:
+            self.version += 1
+            semaphore.release()
+            with contextlib.suppress(ConnectionError, OSError):
+                writer.write(json.dumps({'ack': job['id']}).encode() + b"\n")
+                await writer.drain()
+    
+    def describe(self) -> str:
+        return (f"worker — {'connecté' if self.connected else 'déconnecté'}, "
+                f"{self.stats['done']} travail(aux) exécuté(s), {self.stats['failed']} en échec")
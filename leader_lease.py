@@ -0,0 +1,166 @@
+"""
+Bail de leader partagé
+======================
+
+Bail renouvelable stocké dans un fichier SQLite partagé par les répliques de
+bot_discord_v2.py (mode haute disponibilité), avec jeton de fencing et
+réservation des exécutions : un travail planifié est réservé avant l'envoi et
+marqué terminé après. Une réservation restée en attente (leader arrêté entre
+la réservation et l'envoi, ou envoi en échec) est reprise par le leader
+suivant, qui vérifie d'abord que l'envoi n'a pas eu lieu.
+"""
+
+import contextlib
+import logging
+import sqlite3
+import time
+from typing import List, Optional, Tuple
+
+
+class LeaderLease:
+    """Bail de leader renouvelable stocké dans SQLite et partagé par les répliques.
+
+    Le jeton de fencing augmente à chaque changement de détenteur : une instance qui a perdu
+    le bail (pause, coupure réseau) voit ses écritures et ses réservations refusées.
+    """
+
+    def __init__(self, path: str, holder: str, ttl: float, logger: logging.Logger):
+        self.path = path
+        self.holder = holder
+        self.ttl = ttl
+        self.logger = logger
+        self.token = 0
+        self._expires_at = 0.0
+        # Transactions gérées explicitement (BEGIN IMMEDIATE) ; appels très courts sur fichier local
+        self._db = sqlite3.connect(path, timeout=1, isolation_level=None)
+        self._db.execute("CREATE TABLE IF NOT EXISTS lease "
+                         "(name TEXT PRIMARY KEY, holder TEXT, token INTEGER, expires_at REAL)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS executions "
+                         "(action TEXT PRIMARY KEY, value TEXT, token INTEGER, done INTEGER NOT NULL DEFAULT 1)")
+        if 'done' not in [row[1] for row in self._db.execute("PRAGMA table_info(executions)")]:
+            # Fichier d'une version précédente : les exécutions déjà réservées sont considérées terminées
+            with contextlib.suppress(sqlite3.OperationalError):
+                self._db.execute("ALTER TABLE executions ADD COLUMN done INTEGER NOT NULL DEFAULT 1")
+
+    @property
+    def is_leader(self) -> bool:
+        return time.time() < self._expires_at
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            yield self._db
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        else:
+            self._db.execute("COMMIT")
+
+    def _current(self, db: sqlite3.Connection) -> Optional[Tuple[str, int, float]]:
+        return db.execute("SELECT holder, token, expires_at FROM lease WHERE name = 'leader'").fetchone()
+
+    def try_acquire(self) -> bool:
+        """Prend ou renouvelle le bail ; retourne True si cette instance est leader"""
+        now = time.time()
+        try:
+            with self._transaction() as db:
+                current = self._current(db)
+                if current is None:
+                    token = 1
+                elif current[0] == self.holder and current[1] == self.token:
+                    token = self.token
+                elif current[2] < now:
+                    # Bail expiré : nouveau détenteur, nouveau jeton
+                    token = current[1] + 1
+                else:
+                    self._expires_at = 0.0
+                    return False
+                db.execute("INSERT OR REPLACE INTO lease VALUES ('leader', ?, ?, ?)",
+                           (self.holder, token, now + self.ttl))
+        except sqlite3.Error as e:
+            # Personne ne peut prendre le bail avant son expiration : l'état local reste valable
+            self.logger.error(f"Erreur bail de leader: {e}")
+            return self.is_leader
+        
+        self.token = token
+        self._expires_at = now + self.ttl
+        return True
+
+    def validate(self) -> bool:
+        """Vérifie dans le stockage que le bail et le jeton sont toujours les nôtres"""
+        if not self.is_leader:
+            return False
+        try:
+            current = self._current(self._db)
+        except sqlite3.Error:
+            return self.is_leader
+        if current is None or current[0] != self.holder or current[1] != self.token:
+            self._expires_at = 0.0
+            return False
+        return True
+
+    def _holds(self, db: sqlite3.Connection) -> bool:
+        current = self._current(db)
+        return self.is_leader and current is not None and current[0] == self.holder and current[1] == self.token
+
+    def claim(self, action: str, value: str, resume: bool = False) -> bool:
+        """Réserve l'exécution (action, valeur) pour l'ensemble des répliques ; False si elle est
+        terminée, déjà réservée ou si le jeton de cette instance est périmé.
+
+        Avec `resume`, une réservation en attente d'un autre jeton (voir `pending`) est reprise :
+        l'appelant vérifie d'abord que l'envoi n'a pas eu lieu.
+        """
+        try:
+            with self._transaction() as db:
+                if not self._holds(db):
+                    return False
+                row = db.execute("SELECT value, token, done FROM executions WHERE action = ?",
+                                 (action,)).fetchone()
+                if row is not None and row[0] == value and (row[2] or not resume or row[1] == self.token):
+                    return False
+                db.execute("INSERT OR REPLACE INTO executions VALUES (?, ?, ?, 0)", (action, value, self.token))
+            return True
+        except sqlite3.Error as e:
+            self.logger.error(f"Erreur réservation de '{action}': {e}")
+            return False
+
+    def complete(self, action: str, value: str) -> None:
+        """Marque terminée une exécution réservée avec le jeton courant (après l'envoi)"""
+        try:
+            with self._transaction() as db:
+                db.execute("UPDATE executions SET done = 1 WHERE action = ? AND value = ? AND token = ?",
+                           (action, value, self.token))
+        except sqlite3.Error as e:
+            # La réservation reste en attente : elle sera reprise après vérification de l'historique
+            self.logger.error(f"Erreur fin d'exécution de '{action}': {e}")
+
+    def abandon(self, action: str, value: str) -> None:
+        """Envoi en échec : la réservation repasse en attente, reprise par `pending` (jeton 0)"""
+        try:
+            with self._transaction() as db:
+                db.execute("UPDATE executions SET token = 0 WHERE action = ? AND value = ? AND token = ? AND done = 0",
+                           (action, value, self.token))
+        except sqlite3.Error as e:
+            self.logger.error(f"Erreur abandon de '{action}': {e}")
+
+    def pending(self) -> List[Tuple[str, str]]:
+        """Réservations en attente d'un autre jeton (leader arrêté avant la fin) ou abandonnées"""
+        try:
+            return self._db.execute("SELECT action, value FROM executions WHERE done = 0 AND token != ?",
+                                    (self.token,)).fetchall()
+        except sqlite3.Error as e:
+            self.logger.error(f"Erreur lecture des réservations en attente: {e}")
+            return []
+
+    def release(self) -> None:
+        """Libère le bail (arrêt gracieux) : une réplique en attente le reprend aussitôt"""
+        if not self.is_leader:
+            return
+        try:
+            with self._transaction() as db:
+                db.execute("UPDATE lease SET expires_at = 0 WHERE name = 'leader' AND holder = ? AND token = ?",
+                           (self.holder, self.token))
+        except sqlite3.Error as e:
+            self.logger.error(f"Erreur libération du bail: {e}")
+        self._expires_at = 0.0
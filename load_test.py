@@ -0,0 +1,277 @@
+"""
+Banc de charge synthétique des commandes
+========================================
+
+Pilote les commandes de main.py (list_events, get_specific_event_link,
+status_command, force_*, clean_*) avec des contextes factices et un faux
+backend REST à latence configurable, à débit constant et depuis de nombreux
+administrateurs. Rapporte les latences p50/p99 par commande, le retard de la
+boucle d'événements et le nombre d'appels REST par commande : une commande
+qui se remet à interroger l'API est visible immédiatement.
+
+Usage :
+    python load_test.py --rate 1000 --duration 10 --admins 50 --rest-latency 0.05
+    python load_test.py --mix list_events=1,status_command=1 --max-rest-per-command 0
+"""
+
+import argparse
+import asyncio
+import contextvars
+import itertools
+import logging
+import os
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+
+# Commande en cours d'exécution, pour imputer chaque appel REST
+_current_command: contextvars.ContextVar[str] = contextvars.ContextVar('current_command', default='-')
+
+DEFAULT_MIX = {
+    'list_events': 10,
+    'get_specific_event_link': 10,
+    'status_command': 10,
+    'force_poll': 1,
+    'force_boss': 1,
+    'force_siege': 1,
+    'clean_poll': 1,
+    'clean_events': 1,
+    'clean_all': 1,
+}
+
+# ======================== FAUX BACKEND REST ========================
+
+class FakeRest:
+    """Compte les appels REST par commande et par route, avec une latence simulée"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls: Dict[str, Counter] = defaultdict(Counter)
+
+    async def call(self, route: str) -> None:
+        self.calls[_current_command.get()][route] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+class FakeMessage:
+    _ids = itertools.count(1)
+
+    def __init__(self, rest: FakeRest, channel: 'FakeChannel', content: Optional[str], poll=None, author=None):
+        self.rest = rest
+        self.id = next(self._ids)
+        self.channel = channel
+        self.content = content or ""
+        self.poll = poll
+        self.author = author
+
+    async def delete(self) -> None:
+        await self.rest.call('messages.delete')
+        if self in self.channel.messages:
+            self.channel.messages.remove(self)
+
+    async def edit(self, content: Optional[str] = None, **kwargs) -> 'FakeMessage':
+        await self.rest.call('messages.edit')
+        if content is not None:
+            self.content = content
+        return self
+
+class FakeChannel:
+    def __init__(self, rest: FakeRest, channel_id: int, user):
+        self.rest = rest
+        self.id = channel_id
+        self.user = user
+        self.messages: List[FakeMessage] = []
+
+    async def send(self, content: Optional[str] = None, poll=None, **kwargs) -> FakeMessage:
+        await self.rest.call('messages.send')
+        message = FakeMessage(self.rest, self, content, poll, self.user)
+        # L'historique est borné comme celui que le bot relit réellement
+        self.messages = [message, *self.messages[:49]]
+        return message
+
+    async def history(self, limit: int = 100, **kwargs):
+        await self.rest.call('messages.history')
+        for message in self.messages[:limit]:
+            yield message
+
+class FakeGuild:
+    def __init__(self, rest: FakeRest, event_count: int):
+        self.rest = rest
+        self.id = 1
+        self.name = "Serveur de charge"
+        start = datetime.now().replace(hour=21, minute=0, second=0, microsecond=0)
+        names = ["Boss samedi", "Boss dimanche", "Siège Grotte de Cristal", "Donjon Party", "Raid"]
+        self.events = [
+            SimpleNamespace(id=1000 + i, name=f"{names[i % len(names)]} #{i}", guild=self,
+                            start_time=start + timedelta(days=i % 14), description="",
+                            status=SimpleNamespace(name='scheduled'))
+            for i in range(event_count)
+        ]
+
+    async def fetch_scheduled_events(self) -> List[SimpleNamespace]:
+        await self.rest.call('events.fetch')
+        return list(self.events)
+
+class FakeBot:
+    """Remplace le client discord.py de main.py : canaux et serveur servis par le faux backend"""
+
+    def __init__(self, rest: FakeRest, channel_ids: List[int], event_count: int):
+        self.user = SimpleNamespace(id=0, name="bot-de-charge")
+        self.guilds = [FakeGuild(rest, event_count)]
+        self.channels = {channel_id: FakeChannel(rest, channel_id, self.user) for channel_id in channel_ids}
+
+    def get_channel(self, channel_id: int) -> Optional[FakeChannel]:
+        return self.channels.get(channel_id)
+
+class FakeContext:
+    """Contexte de commande minimal ; les réponses ne sont pas comptées comme appels REST"""
+
+    def __init__(self, author: str):
+        self.author = author
+        self.replies = 0
+
+    async def send(self, content: Optional[str] = None, **kwargs) -> None:
+        self.replies += 1
+
+    async def defer(self) -> None:
+        pass
+
+# ======================== MESURES ========================
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+async def monitor_loop_lag(interval: float, samples: List[float], stop: asyncio.Event) -> None:
+    """Retard de réveil d'une tâche périodique : temps pendant lequel la boucle était occupée"""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        samples.append(max(0.0, loop.time() - expected))
+
+# ======================== GÉNÉRATEUR DE CHARGE ========================
+
+def parse_mix(value: Optional[str]) -> Dict[str, int]:
+    """Pondération des commandes ("list_events=5,status_command=1")"""
+    if not value:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        mix[name.strip()] = int(weight or 1)
+    return mix
+
+def load_main(channel_ids: List[int]):
+    """Importe main.py sans configuration réelle (variables factices, journal sur la sortie d'erreur)"""
+    logging.basicConfig(level=logging.WARNING, stream=sys.stderr)
+    for var, value in zip(('CHANNEL_ID_DP', 'CHANNEL_ID_BOSS', 'CHANNEL_ID_SIEGE'), channel_ids):
+        os.environ.setdefault(var, str(value))
+    os.environ.setdefault('TOKEN_DISCORD', 'load-test')
+    import main
+    return main
+
+async def run_load(args: argparse.Namespace) -> int:
+    channel_ids = [101, 102, 103]
+    main = load_main(channel_ids)
+    rest = FakeRest(args.rest_latency)
+    main.bot = FakeBot(rest, [main.CHANNEL_ID_DP, main.CHANNEL_ID_BOSS, main.CHANNEL_ID_SIEGE], args.events)
+    mix = parse_mix(args.mix)
+    unknown = [name for name in mix if not hasattr(main, name)]
+    if unknown:
+        print(f"Commandes inconnues: {', '.join(unknown)}")
+        return 2
+
+    # Cache chaud comme après on_ready ; recherches avec fautes de frappe
+    _current_command.set('warmup')
+    await main.update_event_links_cache()
+    queries = [event.name.lower().replace('è', 'e')[:-2] for event in main.bot.guilds[0].events]
+
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    invocations: Counter = Counter()
+    errors: Counter = Counter()
+
+    async def invoke(name: str, author: str) -> None:
+        _current_command.set(name)
+        ctx = FakeContext(author)
+        command = getattr(main, name)
+        started = time.perf_counter()
+        try:
+            if name == 'get_specific_event_link':
+                await command.callback(ctx, event_name=random.choice(queries))
+            else:
+                await command.callback(ctx)
+        except Exception as e:
+            errors[name] += 1
+            if errors[name] == 1:
+                print(f"Erreur {name}: {e!r}")
+        latencies[name].append(time.perf_counter() - started)
+        invocations[name] += 1
+
+    lag_samples: List[float] = []
+    stop = asyncio.Event()
+    monitor = asyncio.create_task(monitor_loop_lag(0.01, lag_samples, stop))
+
+    names, weights = list(mix), list(mix.values())
+    total = int(args.rate * args.duration)
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    tasks = set()
+    for i in range(total):
+        # Débit constant (boucle ouverte) : les retards ne ralentissent pas l'injection
+        delay = start + i / args.rate - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        task = asyncio.create_task(invoke(random.choices(names, weights)[0], f"admin{i % args.admins}"))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+    if tasks:
+        await asyncio.wait(set(tasks))
+    elapsed = loop.time() - start
+    stop.set()
+    await monitor
+
+    print(f"{total} commandes en {elapsed:.2f}s ({total / elapsed:.0f}/s), {args.admins} administrateurs, "
+          f"latence REST simulée {args.rest_latency * 1000:.0f} ms")
+    print(f"{'commande':<26}{'n':>7}{'p50 ms':>10}{'p99 ms':>10}{'REST/cmd':>10}  routes")
+    regressions = []
+    for name in sorted(invocations):
+        calls = rest.calls.get(name, Counter())
+        per_command = sum(calls.values()) / invocations[name]
+        routes = ", ".join(f"{route}={count / invocations[name]:.1f}" for route, count in calls.most_common())
+        print(f"{name:<26}{invocations[name]:>7}{percentile(latencies[name], 0.5) * 1000:>10.2f}"
+              f"{percentile(latencies[name], 0.99) * 1000:>10.2f}{per_command:>10.2f}  {routes or '-'}")
+        if args.max_rest_per_command is not None and per_command > args.max_rest_per_command:
+            regressions.append(name)
+    print(f"Retard de la boucle: p50 {percentile(lag_samples, 0.5) * 1000:.2f} ms, "
+          f"p99 {percentile(lag_samples, 0.99) * 1000:.2f} ms, max {max(lag_samples, default=0) * 1000:.2f} ms")
+    if errors:
+        print(f"Erreurs: {dict(errors)}")
+    if regressions:
+        print(f"❌ Plus de {args.max_rest_per_command} appel(s) REST par commande: {', '.join(regressions)}")
+        return 1
+    return 1 if errors else 0
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Banc de charge synthétique des commandes de main.py")
+    parser.add_argument('--rate', type=float, default=1000, help="commandes par seconde")
+    parser.add_argument('--duration', type=float, default=10, help="durée de l'injection en secondes")
+    parser.add_argument('--admins', type=int, default=50, help="nombre d'administrateurs simulés")
+    parser.add_argument('--events', type=int, default=40, help="événements programmés du faux serveur")
+    parser.add_argument('--rest-latency', type=float, default=0.05, help="latence d'un appel REST (s)")
+    parser.add_argument('--mix', help="pondération des commandes, ex. list_events=5,status_command=1")
+    parser.add_argument('--max-rest-per-command', type=float,
+                        help="échoue si une commande dépasse ce nombre moyen d'appels REST")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    random.seed(args.seed)
+    sys.exit(asyncio.run(run_load(args)))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Profilage de la boucle d'événements
+===================================
+
+Profileur par échantillonnage de la boucle asyncio du bot (commande
+/profile et PROFILE_DIR) : piles CPU relevées par un thread, chaînes
+d'attente des coroutines relevées par une tâche, et callbacks lents.
+Le résultat est écrit au format "folded" (flamegraph.pl, speedscope).
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+
+
+class EventLoopProfiler:
+    """Profileur par échantillonnage de la boucle asyncio.
+    
+    Un thread relève périodiquement la pile du thread de la boucle (temps CPU : journalisation,
+    formatage...) et repère les callbacks lents ; une tâche relève les chaînes d'attente des
+    coroutines (temps passé à attendre, par exemple une réponse REST). Le résultat est écrit au
+    format "folded" (flamegraph.pl, speedscope) avec trois racines : cpu, idle et await.
+    """
+    
+    MAX_DEPTH = 64
+    TASK_SAMPLE_INTERVAL = 0.05
+    
+    def __init__(self, output_dir: str, interval_ms: float, slow_callback_ms: float, logger: logging.Logger):
+        self.output_dir = output_dir
+        self.interval = interval_ms / 1000
+        self.slow_threshold = slow_callback_ms / 1000
+        self.logger = logger
+        self.started_at: Optional[datetime] = None
+        # Écrits par le thread d'échantillonnage (lus après son arrêt)
+        self._loop_samples: Counter = Counter()
+        self.slow_callbacks: List[Tuple[float, str]] = []
+        # Écrits par la tâche d'échantillonnage, dans la boucle
+        self._await_samples: Counter = Counter()
+        self._loop_thread: Optional[int] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._task_sampler: Optional[asyncio.Task] = None
+        self._auto_stop: Optional[asyncio.TimerHandle] = None
+    
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+    
+    def start(self, duration: Optional[float] = None) -> None:
+        """Démarre le profilage, arrêté automatiquement après `duration` secondes si fourni"""
+        if self.running:
+            return
+        loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._loop_samples.clear()
+        self._await_samples.clear()
+        self.slow_callbacks = []
+        self.started_at = datetime.now(timezone.utc)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample_loop, name='loop-profiler', daemon=True)
+        self._thread.start()
+        self._task_sampler = loop.create_task(self._sample_tasks())
+        if duration:
+            self._auto_stop = loop.call_later(duration, self.stop)
+        self.logger.info(f"Profilage démarré (échantillon toutes les {self.interval * 1000:.0f} ms)")
+    
+    def stop(self) -> Optional[str]:
+        """Arrête le profilage et écrit le fichier ; retourne son chemin"""
+        if not self.running:
+            return None
+        self._stop.set()
+        self._thread.join(timeout=1)
+        self._thread = None
+        if self._task_sampler is not None:
+            self._task_sampler.cancel()
+        if self._auto_stop is not None:
+            self._auto_stop.cancel()
+            self._auto_stop = None
+        return self._write()
+    
+    @staticmethod
+    def _describe_frame(frame) -> str:
+        code = frame.f_code
+        return f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+    
+    def _stack(self, frame) -> List[str]:
+        names = []
+        while frame is not None and len(names) < self.MAX_DEPTH:
+            names.append(self._describe_frame(frame))
+            frame = frame.f_back
+        names.reverse()
+        return names
+    
+    @staticmethod
+    def _is_idle(frame) -> bool:
+        # Boucle en attente d'E/S : la frame active est l'appel select/epoll du sélecteur
+        return frame.f_code.co_filename.endswith('selectors.py')
+    
+    def _sample_loop(self) -> None:
+        busy_since: Optional[float] = None
+        busy_stacks: Counter = Counter()
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is None:
+                continue
+            now = time.perf_counter()
+            if self._is_idle(frame):
+                if busy_since is not None and now - busy_since >= self.slow_threshold:
+                    self.slow_callbacks.append((now - busy_since, busy_stacks.most_common(1)[0][0]))
+                busy_since = None
+                busy_stacks.clear()
+                self._loop_samples['idle'] += 1
+                continue
+            stack = ";".join(self._stack(frame))
+            if busy_since is None:
+                busy_since = now
+            busy_stacks[stack] += 1
+            self._loop_samples[f"cpu;{stack}"] += 1
+    
+    def _await_chain(self, coro) -> List[str]:
+        """Chaîne des coroutines en attente (cr_await), jusqu'au futur attendu"""
+        names = []
+        while coro is not None and len(names) < self.MAX_DEPTH:
+            frame = getattr(coro, 'cr_frame', None) or getattr(coro, 'gi_frame', None)
+            if frame is None:
+                break
+            names.append(self._describe_frame(frame))
+            coro = getattr(coro, 'cr_await', None) or getattr(coro, 'gi_yieldfrom', None)
+        if coro is not None:
+            names.append(type(coro).__name__)
+        return names
+    
+    async def _sample_tasks(self) -> None:
+        current = asyncio.current_task()
+        # Pondération : un relevé des tâches représente plusieurs intervalles du thread
+        weight = max(1, round(self.TASK_SAMPLE_INTERVAL / self.interval))
+        while True:
+            await asyncio.sleep(self.TASK_SAMPLE_INTERVAL)
+            for task in asyncio.all_tasks():
+                if task is current or task.done():
+                    continue
+                chain = self._await_chain(task.get_coro())
+                if chain:
+                    self._await_samples[f"await;{';'.join(chain)}"] += weight
+    
+    def _write(self) -> Optional[str]:
+        samples = self._loop_samples + self._await_samples
+        path = os.path.join(self.output_dir,
+                            f"profile-{self.started_at.strftime('%Y%m%d-%H%M%S')}.folded")
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as profile_file:
+                for stack, count in samples.most_common():
+                    profile_file.write(f"{stack} {count}\n")
+        except OSError as e:
+            self.logger.error(f"Erreur écriture du profil: {e}")
+            return None
+        self.logger.info(f"Profil écrit dans {path} ({sum(self._loop_samples.values())} échantillon(s), "
+                         f"{len(self.slow_callbacks)} callback(s) lent(s))")
+        return path
+    
+    def summary(self, limit: int = 5) -> List[str]:
+        """Fonctions les plus présentes en tête de pile (temps CPU) et callbacks les plus lents"""
+        leaves: Counter = Counter()
+        for stack, count in self._loop_samples.items():
+            if stack.startswith('cpu;'):
+                leaves[stack.rsplit(';', 1)[-1]] += count
+        total = sum(self._loop_samples.values()) or 1
+        lines = [f"• {name} : {count * 100 / total:.1f}%" for name, count in leaves.most_common(limit)]
+        for duration, stack in sorted(self.slow_callbacks, reverse=True)[:3]:
+            lines.append(f"• Callback lent {duration * 1000:.0f} ms : {stack.rsplit(';', 1)[-1]}")
+        return lines
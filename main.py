@@ -6,6 +6,8 @@ from datetime import timedelta, datetime
 from discord.ext import commands, tasks
 import logging
 from zoneinfo import ZoneInfo  # Python 3.9+ (ou utilisez pytz pour versions antérieures)
+from event_search import EventSearchIndex
+from event_recurrence import OccurrenceCache, next_occurrence, rule_from_event
 
 # ======================== CONFIGURATION INITIALE ========================
 
@@ -85,6 +87,34 @@ class BotState:
         
         # Cache des événements Discord récupérés
         self.cached_event_links = {}
+        # Index de recherche floue sur les noms des événements en cache
+        self.event_index = EventSearchIndex()
+        # Occurrences des événements récurrents, par événement, version de règle et semaine
+        self.occurrences = OccurrenceCache(ZoneInfo(TIMEZONE))
+        
+        # Version du cache des événements et cache de rendu des commandes !status et !events
+        self.events_version = 0
+        self.render_cache = {}
+    
+    def set_event_links(self, events):
+        """Remplace le cache des événements (seul point de modification, versionné pour !events)"""
+        self.cached_event_links = events
+        self.events_version += 1
+        # Mise à jour incrémentale de l'index (seuls les noms ajoutés/retirés sont traités)
+        self.event_index.sync(events.keys())
+        self.occurrences.prune([event_data['id'] for event_data in events.values()])
+    
+    def status_key(self):
+        """Clé du rendu de !status : les valeurs affichées elles-mêmes (quelques champs, peu coûteux).
+        Toute modification de l'état change la clé, sans signalement à ajouter après chaque mutation"""
+        return (
+            bool(self.poll_message),
+            len(self.boss_event_messages), len(self.boss_notification_messages),
+            len(self.siege_event_messages), len(self.siege_notification_messages),
+            len(self.cached_event_links),
+            self.last_poll_creation, self.last_poll_deletion, self.last_boss_event,
+            self.last_siege_event, self.last_weekly_update,
+        )
 
 # ======================== INITIALISATION DU BOT ========================
 
@@ -98,6 +128,14 @@ bot = commands.Bot(command_prefix='!', intents=intents)
 # Instance globale de l'état du bot
 bot_state = BotState()
 
+def cached_render(name, key, render):
+    """Réutilise le rendu d'une commande tant que sa clé est inchangée"""
+    entry = bot_state.render_cache.get(name)
+    if entry is None or entry[0] != key:
+        entry = (key, render())
+        bot_state.render_cache[name] = entry
+    return entry[1]
+
 # ======================== GESTION DES VARIABLES D'ENVIRONNEMENT ========================
 
 def get_env_variables():
@@ -178,7 +216,8 @@ async def get_all_events():
                 'link': event_link,
                 'start_time': event.start_time,
                 'description': event.description,
-                'status': event.status.name
+                'status': event.status.name,
+                'recurrence': rule_from_event(event)
             }
             logging.info(f"Événement trouvé: {event.name} -> {event_link}")
         except Exception as e:
@@ -191,7 +230,7 @@ async def update_event_links_cache():
     """Met à jour le cache local des liens d'événements"""
     try:
         events = await get_all_events()
-        bot_state.cached_event_links = events
+        bot_state.set_event_links(events)
         logging.info(f"Cache des événements mis à jour: {len(events)} événement(s)")
         return events
     except Exception as e:
@@ -200,31 +239,51 @@ async def update_event_links_cache():
 
 async def get_event_links_formatted():
     """Retourne tous les événements dans un format lisible pour Discord"""
-    events = await update_event_links_cache()
+    # Cache rafraîchi au démarrage, chaque lundi et par !update_events : appel REST seulement s'il est vide
+    events = bot_state.cached_event_links or await update_event_links_cache()
     
     if not events:
         return "Aucun événement trouvé."
     
+    # La date du jour fait partie de la clé : la prochaine occurrence des séries récurrentes avance
+    now = get_current_time()
+    return cached_render('events', (bot_state.events_version, now.date()), lambda: render_event_links(events, now))
+
+def render_event_links(events, now):
+    """Formate la liste des événements avec leurs liens"""
     formatted_links = "**🎮 Liens des Événements 🎮**\n\n"
     
     # Formatage de chaque événement
     for event_name, event_data in events.items():
         start_time = event_data['start_time']
+        rule = event_data.get('recurrence')
+        if start_time and rule:
+            # Série récurrente : prochaine occurrence plutôt que la première
+            start_time = next_occurrence(start_time, rule, now, ZoneInfo(TIMEZONE))
         start_str = start_time.strftime('%d/%m à %H:%M') if start_time else 'Date non définie'
         
         formatted_links += f"**{event_name}**\n"
-        formatted_links += f"📅 {start_str}\n"
+        formatted_links += f"📅 {start_str}{' 🔁' if rule else ''}\n"
         formatted_links += f"🔗 {event_data['link']}\n\n"
     
     return formatted_links
 
 # ======================== FONCTIONS DE FILTRAGE DES ÉVÉNEMENTS ========================
 
+def current_week_window():
+    """Semaine en cours (lundi 00:00 au lundi suivant), fenêtre de développement des séries récurrentes"""
+    now = get_current_time()
+    week_start = (now - timedelta(days=now.weekday())).replace(hour=0, minute=0, second=0, microsecond=0)
+    return week_start, week_start + timedelta(days=7)
+
 async def filter_events_by_criteria(events, weekdays, keywords):
-    """Filtre les événements selon le jour de la semaine et des mots-clés"""
+    """Filtre les événements selon le jour de la semaine et des mots-clés
+    (chaque série récurrente est jugée sur ses occurrences de la semaine en cours)"""
     filtered_events = []
     
-    for event_name, event_data in events.items():
+    events = bot_state.occurrences.expand(events.values(), *current_week_window())
+    for event_data in events:
+        event_name = event_data['name']
         start_time = event_data.get('start_time')
         if not start_time:
             continue
@@ -500,7 +559,9 @@ async def delete_messages(message_list):
         if msg:
             try:
                 await msg.delete()
-                message_list.remove(msg)
+                # Une suppression concurrente a pu retirer le message entre-temps
+                if msg in message_list:
+                    message_list.remove(msg)
                 logging.info(f"Message supprimé : {msg.id}")
             except discord.DiscordException as e:
                 logging.error(f"Erreur lors de la suppression du message {msg.id if msg else 'None'} : {e}")
@@ -636,11 +697,11 @@ async def get_specific_event_link(ctx, *, event_name):
         await ctx.send(f"**{event_name}**\n🔗 {event_data['link']}")
         return
     
-    # Recherche partielle si pas de correspondance exacte
-    matching_events = []
-    for name, data in events.items():
-        if event_name.lower() in name.lower():
-            matching_events.append((name, data))
+    # Recherche floue classée par similarité (tolère fautes de frappe et accents)
+    matching_events = [
+        (name, events[name]) for name, _ in bot_state.event_index.search(event_name, limit=5)
+        if name in events
+    ]
     
     if matching_events:
         if len(matching_events) == 1:
@@ -648,11 +709,11 @@ async def get_specific_event_link(ctx, *, event_name):
             await ctx.send(f"**{name}**\n🔗 {data['link']}")
         else:
             result = "**Plusieurs événements trouvés:**\n"
-            for name, data in matching_events[:5]:  # Limiter à 5 résultats
+            for name, data in matching_events:  # Déjà classés et limités à 5 résultats
                 result += f"• **{name}**: {data['link']}\n"
             await ctx.send(result)
     else:
-        await ctx.send(f"❌ Aucun événement trouvé contenant '{event_name}'")
+        await ctx.send(f"❌ Aucun événement trouvé proche de '{event_name}'")
 
 # ======================== COMMANDES DE MISE À JOUR MANUELLE ========================
 
@@ -693,10 +754,16 @@ async def test_command(ctx):
 async def status_command(ctx):
     """Affiche le statut complet du bot avec toutes les informations importantes"""
     now = get_current_time()
-    status_msg = f"""
+    # Clé tirée des valeurs affichées : aucun mutateur n'a à invalider le rendu
+    body = cached_render('status', (bot_state.status_key(), schedule_checker.is_running()), render_status)
+    await ctx.send(f"""
 **Statut du Bot** 🤖
 **Heure actuelle:** {now.strftime('%H:%M:%S (%d/%m/%Y)')}
-**Sondage actif:** {'Oui' if bot_state.poll_message else 'Non'}
+{body}""")
+
+def render_status():
+    """Corps du statut (hors heure actuelle)"""
+    return f"""**Sondage actif:** {'Oui' if bot_state.poll_message else 'Non'}
 **Messages boss (liens):** {len(bot_state.boss_event_messages)}
 **Messages boss (notifs):** {len(bot_state.boss_notification_messages)}
 **Messages siege (liens):** {len(bot_state.siege_event_messages)}
@@ -711,7 +778,6 @@ async def status_command(ctx):
 • Siege event: {bot_state.last_siege_event or 'Jamais'}
 • Mise à jour hebdo: {bot_state.last_weekly_update or 'Jamais'}
     """
-    await ctx.send(status_msg)
 
 # ======================== COMMANDES DE FORCE ET DE NETTOYAGE ========================
 
@@ -0,0 +1,138 @@
+"""
+Surveillance mémoire
+====================
+
+Instantanés tracemalloc périodiques (MEMORY_GUARD_MINUTES) : tendance de
+croissance, principaux allocateurs et budget RSS (MEMORY_BUDGET_MB). Au-delà
+du budget, les caches reconstructibles sont vidés par le rappel `trim`, puis
+un redémarrage gracieux est demandé par `on_over_budget` si le budget reste
+dépassé.
+"""
+
+import gc
+import logging
+import os
+import time
+import tracemalloc
+from collections import deque
+from typing import Callable, List, Optional
+
+
+class MemoryGuard:
+    """Instantanés tracemalloc périodiques : tendance de croissance, principaux allocateurs
+    et budget RSS (vidage des caches, puis redémarrage gracieux si le budget reste dépassé)
+
+    `trim` vide les caches de l'application ; `on_over_budget` reçoit la raison de l'arrêt.
+    """
+    
+    HISTORY = 12
+    TOP_ALLOCATORS = 5
+    
+    def __init__(self, budget_mb: int, logger: logging.Logger, trim: Callable[[], None],
+                 on_over_budget: Callable[[str], None]):
+        self.trim = trim
+        self.on_over_budget = on_over_budget
+        self.budget = budget_mb * 1024 * 1024
+        self.logger = logger
+        # (instant, octets suivis par tracemalloc, RSS)
+        self.history: deque = deque(maxlen=self.HISTORY)
+        self.top_growth: List[str] = []
+        self.trims = 0
+        # Incrémentée à chaque relevé ou vidage (clé du rendu de /status)
+        self.version = 0
+        self._previous: Optional[tracemalloc.Snapshot] = None
+    
+    def start(self) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+    
+    def stop(self) -> None:
+        self._previous = None
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+    
+    @staticmethod
+    def rss() -> int:
+        """Mémoire résidente du processus en octets (0 si indisponible)"""
+        try:
+            with open('/proc/self/statm') as statm:
+                return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+        except (OSError, ValueError, IndexError):
+            return 0
+    
+    def _snapshot(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+            tracemalloc.Filter(False, '<unknown>'),
+        ))
+    
+    def growth_per_hour(self) -> Optional[float]:
+        """Croissance moyenne de la mémoire suivie, en octets par heure"""
+        if len(self.history) < 2:
+            return None
+        (first_at, first, _), (last_at, last, _) = self.history[0], self.history[-1]
+        hours = (last_at - first_at) / 3600
+        return (last - first) / hours if hours > 0 else None
+    
+    def check(self) -> None:
+        """Prend un instantané, le compare au précédent et applique le budget"""
+        snapshot = self._snapshot()
+        traced = sum(stat.size for stat in snapshot.statistics('filename'))
+        self.history.append((time.monotonic(), traced, self.rss()))
+        self.version += 1
+        
+        if self._previous is not None:
+            diff = snapshot.compare_to(self._previous, 'lineno')
+            self.top_growth = [
+                f"{stat.traceback[0].filename.rsplit(os.sep, 1)[-1]}:{stat.traceback[0].lineno} "
+                f"{stat.size_diff / 1024:+.0f} Ko ({stat.size / 1024:.0f} Ko)"
+                for stat in diff if stat.size_diff >= 1024
+            ][:self.TOP_ALLOCATORS]
+        self._previous = snapshot
+        
+        growth = self.growth_per_hour()
+        sizes = [entry[1] for entry in self.history]
+        if growth is not None and len(sizes) == self.HISTORY and all(b >= a for a, b in zip(sizes, sizes[1:])):
+            self.logger.warning(f"Mémoire en hausse continue: {growth / 1024 / 1024:+.2f} Mo/h ; "
+                                f"principaux allocateurs: {'; '.join(self.top_growth) or 'aucun'}")
+        else:
+            self.logger.info(f"Mémoire suivie: {traced / 1024 / 1024:.1f} Mo, RSS {self.history[-1][2] / 1024 / 1024:.1f} Mo")
+        
+        self.enforce_budget()
+    
+    def trim_caches(self) -> None:
+        """Vide les caches reconstructibles puis force un passage du ramasse-miettes"""
+        self.trim()
+        gc.collect()
+        self.trims += 1
+        self.version += 1
+    
+    def enforce_budget(self) -> None:
+        if not self.budget:
+            return
+        rss = self.rss()
+        if rss <= self.budget:
+            return
+        self.logger.warning(f"Budget mémoire dépassé ({rss / 1024 / 1024:.1f} Mo > "
+                            f"{self.budget / 1024 / 1024:.0f} Mo): vidage des caches")
+        self.trim_caches()
+        rss = self.rss()
+        if rss > self.budget:
+            # systemd relance le service après un arrêt propre (état sauvegardé)
+            self.logger.error(f"Budget mémoire toujours dépassé après vidage ({rss / 1024 / 1024:.1f} Mo): "
+                              f"redémarrage gracieux")
+            self.on_over_budget('budget mémoire')
+    
+    def describe(self) -> str:
+        """Résumé pour !status"""
+        if not self.history:
+            return "En attente du premier relevé"
+        _, traced, rss = self.history[-1]
+        budget = f" / budget {self.budget / 1024 / 1024:.0f} Mo" if self.budget else ""
+        growth = self.growth_per_hour()
+        trend = f", tendance {growth / 1024 / 1024:+.2f} Mo/h" if growth is not None else ""
+        lines = [f"RSS {rss / 1024 / 1024:.1f} Mo{budget}, suivie {traced / 1024 / 1024:.1f} Mo{trend}, "
+                 f"{self.trims} vidage(s)"]
+        lines.extend(f"• {line}" for line in self.top_growth)
+        return "\n".join(lines)
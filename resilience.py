@@ -0,0 +1,93 @@
+"""
+Briques de résilience des appels REST
+=====================================
+
+Politique de retry (backoff exponentiel avec jitter) et disjoncteur par route,
+utilisés par le ResilienceManager de bot_discord_v2.py, et limiteur de débit
+à seau de jetons des rappels en MP. Sans dépendance à discord.py.
+"""
+
+import asyncio
+import random
+import time
+from dataclasses import dataclass
+
+
+@dataclass
+class RetryPolicy:
+    """Politique de retry avec backoff exponentiel et jitter"""
+    max_attempts: int = 4
+    base_delay: float = 0.5
+    max_delay: float = 8.0
+
+    def backoff(self, attempt: int) -> float:
+        """Délai avant la tentative suivante ("full jitter")"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+class CircuitBreaker:
+    """Disjoncteur d'une route : fermé → ouvert après N échecs → semi-ouvert après délai"""
+
+    CLOSED = "fermé"
+    OPEN = "ouvert"
+    HALF_OPEN = "semi-ouvert"
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.trips = 0
+        self._probe_in_flight = False
+        self._probe_started = 0.0
+
+    def allow(self) -> bool:
+        """Indique si un appel peut passer : en semi-ouvert (après le délai), un seul appel
+        d'essai à la fois, les autres sont refusés jusqu'à son résultat"""
+        now = time.monotonic()
+        if self.state == self.OPEN:
+            if now - self.opened_at < self.reset_timeout:
+                return False
+            self.state = self.HALF_OPEN
+            self._probe_in_flight = False
+        if self.state == self.HALF_OPEN:
+            # Essai sans résultat (annulé) au-delà du délai : un autre appel peut essayer
+            if self._probe_in_flight and now - self._probe_started < self.reset_timeout:
+                return False
+            self._probe_in_flight = True
+            self._probe_started = now
+        return True
+
+    def record_success(self) -> None:
+        self.consecutive_failures = 0
+        self.state = self.CLOSED
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self._probe_in_flight = False
+        self.consecutive_failures += 1
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.trips += 1
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+
+class TokenBucket:
+    """Limiteur de débit à seau de jetons (débit moyen `rate` par seconde, rafale `capacity`)"""
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+
+    async def acquire(self) -> None:
+        while True:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self.rate)
@@ -0,0 +1,159 @@
+"""
+Tableau de bord local
+=====================
+
+Serveur HTTP (aiohttp) en lecture seule : travaux planifiés, messages suivis,
+événements en cache, votes des sondages et métriques REST. L'instantané est
+versionné en mémoire et reconstruit seulement quand ses sources changent ;
+chaque corps porte un ETag pour les requêtes conditionnelles (304).
+"""
+
+import hashlib
+import html
+import json
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from aiohttp import web
+
+
+class StatusDashboard:
+    """Tableau de bord HTTP local en lecture seule, servi depuis un instantané versionné en mémoire
+
+    `bot` est l'EventBot dont l'état en mémoire est affiché ; aucun appel REST n'est fait.
+    """
+    
+    def __init__(self, bot: Any, host: str, port: int, logger: logging.Logger):
+        self.bot = bot
+        self.host = host
+        self.port = port
+        self.logger = logger
+        self.app = web.Application()
+        self.app.router.add_get('/', self._handle_html)
+        self.app.router.add_get('/api/snapshot', self._handle_json)
+        self._runner: Optional[web.AppRunner] = None
+        
+        # Instantané courant et clé des sources qui l'ont produit
+        self.version = 0
+        self._key: Optional[tuple] = None
+        self._json_body = b""
+        self._html_body = b""
+        # ETag de chaque corps : empreinte du contenu, valable d'un redémarrage à l'autre
+        self._etags: Dict[str, str] = {}
+        self._built_at: Optional[datetime] = None
+    
+    def trim(self) -> None:
+        """Libère l'instantané ; il sera reconstruit à la prochaine requête"""
+        self._key = None
+        self._json_body = b""
+        self._html_body = b""
+    
+    async def start(self) -> None:
+        self._runner = web.AppRunner(self.app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        self.logger.info(f"Tableau de bord disponible sur http://{self.host}:{self.port}/")
+    
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+    
+    def _poll_tallies(self) -> Dict[int, Dict[str, int]]:
+        """Votes des sondages actifs (tenus à jour par la gateway, sans appel REST)"""
+        tallies = {}
+        for channel_id, message in self.bot.state.poll_messages.items():
+            poll = getattr(message, 'poll', None)
+            if poll is not None:
+                tallies[channel_id] = {answer.text: answer.vote_count for answer in poll.answers}
+            elif message.id in self.bot.attendance.questions:
+                tallies[channel_id] = self.bot.attendance.tally(message.id)
+        return tallies
+    
+    def _source_key(self) -> tuple:
+        """Clé peu coûteuse des données affichées ; l'instantané n'est reconstruit que si elle change"""
+        bot = self.bot
+        stats = tuple((route, tuple(values.values())) for route, values in sorted(bot.resilience.stats.items()))
+        tallies = tuple(sorted((cid, tuple(votes.items())) for cid, votes in self._poll_tallies().items()))
+        minute = bot.get_current_time().replace(second=0, microsecond=0)
+        return (bot.state.version, stats, tallies, bot.shutdown.in_flight, minute)
+    
+    def _build(self) -> Dict[str, Any]:
+        """Construit l'instantané à partir de l'état en mémoire uniquement"""
+        bot = self.bot
+        kinds = bot.state.kind_states
+        return {
+            'version': self.version,
+            'generated_at': bot.get_current_time().isoformat(),
+            'jobs': [{'name': name, 'next_run': when.isoformat()} for name, when in bot.scheduled_jobs()],
+            'messages': {
+                'polls': {str(cid): msg.id for cid, msg in bot.state.poll_messages.items()},
+                **{kind: {str(cid): ids for cid, ids in state.message_ids_by_channel().items()}
+                   for kind, state in kinds.items()},
+            },
+            'events': [
+                {'name': data['name'], 'start_time': data['start_time'].isoformat() if data.get('start_time') else None,
+                 'status': data.get('status'), 'link': data['link']}
+                for data in bot.state.cached_events.values()
+            ],
+            'poll_tallies': {str(cid): votes for cid, votes in self._poll_tallies().items()},
+            'metrics': {
+                'rest': bot.resilience.stats,
+                'breakers': {route: breaker.state for route, breaker in bot.resilience.breakers.items()},
+                'degraded': bot.resilience.is_degraded(),
+                'deferred_maintenance': list(bot.deferred_maintenance),
+                'jobs_in_flight': bot.shutdown.in_flight,
+                'staged_update': bot.staged_update.describe() if bot.staged_update else None,
+            },
+        }
+    
+    def _render_html(self, snapshot: Dict[str, Any]) -> str:
+        def rows(items: List[tuple]) -> str:
+            return "".join(
+                "<tr>" + "".join(f"<td>{html.escape(str(cell))}</td>" for cell in item) + "</tr>" for item in items
+            )
+        
+        sections = [
+            ("Travaux planifiés", [(job['name'], job['next_run']) for job in snapshot['jobs']]),
+            ("Événements en cache", [(e['name'], e['start_time'], e['status'], e['link']) for e in snapshot['events']]),
+            ("Messages suivis", [(kind, json.dumps(ids)) for kind, ids in snapshot['messages'].items()]),
+            ("Votes des sondages", [(cid, json.dumps(votes, ensure_ascii=False))
+                                    for cid, votes in snapshot['poll_tallies'].items()]),
+            ("Métriques", [(name, json.dumps(value, ensure_ascii=False, default=str))
+                           for name, value in snapshot['metrics'].items()]),
+        ]
+        body = "".join(f"<h2>{html.escape(title)}</h2><table>{rows(items)}</table>" for title, items in sections)
+        return (f"<!DOCTYPE html><html><head><meta charset='utf-8'><title>Statut du bot</title></head>"
+                f"<body><h1>🤖 Statut du bot</h1><p>Instantané v{snapshot['version']} "
+                f"({html.escape(snapshot['generated_at'])})</p>{body}</body></html>")
+    
+    def refresh(self) -> None:
+        """Reconstruit l'instantané seulement si les données sources ont changé"""
+        key = self._source_key()
+        if key == self._key:
+            return
+        self._key = key
+        self.version += 1
+        snapshot = self._build()
+        self._json_body = json.dumps(snapshot, ensure_ascii=False, default=str).encode('utf-8')
+        self._html_body = self._render_html(snapshot).encode('utf-8')
+        self._etags = {attr: f'"{hashlib.sha1(getattr(self, attr)).hexdigest()}"'
+                       for attr in ('_json_body', '_html_body')}
+        self._built_at = datetime.now(timezone.utc)
+    
+    def _respond(self, request: web.Request, body_attr: str, content_type: str) -> web.Response:
+        self.refresh()
+        etag = self._etags[body_attr]
+        headers = {'ETag': etag, 'Cache-Control': 'no-cache',
+                   'Last-Modified': self._built_at.strftime('%a, %d %b %Y %H:%M:%S GMT')}
+        if etag in [tag.strip() for tag in request.headers.get('If-None-Match', '').split(',')]:
+            return web.Response(status=304, headers=headers)
+        return web.Response(body=getattr(self, body_attr), content_type=content_type,
+                            charset='utf-8', headers=headers)
+    
+    async def _handle_html(self, request: web.Request) -> web.Response:
+        return self._respond(request, '_html_body', 'text/html')
+    
+    async def _handle_json(self, request: web.Request) -> web.Response:
+        return self._respond(request, '_json_body', 'application/json')
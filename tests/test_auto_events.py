@@ -0,0 +1,85 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from itertools import count
+from types import SimpleNamespace
+
+from auto_events import EventAutoCreator, EventTemplate
+
+# Lundi : les samedis des deux semaines à venir sont dans l'horizon
+NOW = datetime(2025, 3, 10, 9, 0, tzinfo=timezone.utc)
+TEMPLATE = EventTemplate(kind='boss', name="Boss Samedi", weekday=5, time=(21, 0),
+                         duration=timedelta(hours=1), location="Salle 1")
+
+
+class FakeEventManager:
+    """Événements créés, indexés par ID comme le cache construit par EventManager.get_all_events"""
+
+    def __init__(self):
+        self.ids = count(1000)
+        self.events = {}
+        self.calls = []
+
+    async def create_event(self, guild, template, start):
+        self.calls.append('create')
+        event = {'id': next(self.ids), 'name': template.name, 'start_time': start,
+                 'end_time': start + template.duration, 'location': template.location, 'description': None}
+        self.events[event['id']] = event
+        return event
+
+    async def edit_event(self, guild, event_id, changes):
+        self.calls.append('edit')
+        self.events[event_id].update(changes)
+        return self.events[event_id]
+
+    async def delete_event(self, guild, event_id):
+        self.calls.append('delete')
+        return self.events.pop(event_id, None) is not None
+
+
+def creator_for(tmp_path, manager, weeks=2):
+    bot = SimpleNamespace(primary_guild=lambda: object(), write_allowed=lambda: True,
+                          event_manager=manager, state=SimpleNamespace(touch=lambda: None))
+    return EventAutoCreator(bot, [TEMPLATE], weeks, 4, str(tmp_path / "created.json"), logging.getLogger(__name__))
+
+
+def test_every_weekly_occurrence_of_a_template_stays_tracked(tmp_path):
+    manager = FakeEventManager()
+    creator = creator_for(tmp_path, manager)
+    assert asyncio.run(creator.sync({}, NOW)) == {'created': 2}
+    cache = dict(manager.events)
+    assert {event['name'] for event in cache.values()} == {TEMPLATE.name}
+
+    # Même nom pour les deux occurrences : aucune n'est prise pour une suppression manuelle
+    assert asyncio.run(creator.sync(cache, NOW)) == {'unchanged': 2}
+    assert sorted(creator.created.values()) == sorted(cache)
+
+    selected = creator.selection(cache.values(), NOW, NOW + timedelta(weeks=2))
+    assert [event['id'] for event in selected['boss']] == sorted(cache)
+
+
+def test_lost_tracking_file_adopts_existing_occurrences(tmp_path):
+    manager = FakeEventManager()
+    asyncio.run(creator_for(tmp_path, manager).sync({}, NOW))
+    (tmp_path / "created.json").unlink()
+    manager.calls.clear()
+
+    restarted = creator_for(tmp_path, manager)
+    restarted.load()
+    # Chaque occurrence est retrouvée par (nom, début) : aucun doublon n'est créé
+    assert asyncio.run(restarted.sync(dict(manager.events), NOW)) == {'unchanged': 2}
+    assert manager.calls == []
+    assert sorted(restarted.created.values()) == sorted(manager.events)
+
+
+def test_manually_deleted_occurrence_is_not_recreated(tmp_path):
+    manager = FakeEventManager()
+    creator = creator_for(tmp_path, manager)
+    asyncio.run(creator.sync({}, NOW))
+    first_id = min(manager.events)
+    del manager.events[first_id]
+    manager.calls.clear()
+
+    assert asyncio.run(creator.sync(dict(manager.events), NOW)) == {'skipped': 1, 'unchanged': 1}
+    assert manager.calls == []
+    assert first_id in creator.created.values()
@@ -0,0 +1,78 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+from calendar_feed import CalendarFeed
+
+START = datetime(2025, 3, 1, 20, tzinfo=timezone.utc)
+
+
+def event(event_id=1, **fields):
+    data = {'id': event_id, 'name': f"Boss {event_id}", 'start_time': START, 'end_time': None,
+            'description': None, 'link': f"https://discord.com/events/1/{event_id}", 'status': 'scheduled',
+            'location': None}
+    data.update(fields)
+    return data
+
+
+def unfold(body: bytes) -> str:
+    return body.decode('utf-8').replace("\r\n ", "")
+
+
+def test_escape_special_characters():
+    assert CalendarFeed._escape('a;b,c\\d\ne\r\nf') == 'a\\;b\\,c\\\\d\\ne\\nf'
+
+
+def test_fold_limits_lines_to_75_octets_without_splitting_characters():
+    line = "SUMMARY:" + "é" * 60 + "🐉" * 10
+    folded = CalendarFeed._fold(line)
+    parts = folded.split("\r\n")
+    assert len(parts) > 1
+    assert all(len(part.encode('utf-8')) <= 75 for part in parts)
+    assert all(part.startswith(" ") for part in parts[1:])
+    assert "".join(part[1:] if i else part for i, part in enumerate(parts)) == line
+    assert CalendarFeed._fold("SHORT:x") == "SHORT:x"
+
+
+def test_event_block_fields():
+    feed = CalendarFeed(logging.getLogger(__name__))
+    feed.update({'Boss': event(description="Raid; étage 3", location="Salle, nord", status='CANCELLED')}, 1)
+    text = unfold(feed.body)
+    assert text.startswith("BEGIN:VCALENDAR\r\n") and text.endswith("END:VCALENDAR\r\n")
+    assert "DTSTART:20250301T200000Z" in text
+    assert "DTEND:20250301T220000Z" in text
+    assert "DESCRIPTION:Raid\\; étage 3\\nhttps://discord.com/events/1/1" in text
+    assert "LOCATION:Salle\\, nord" in text
+    assert "STATUS:CANCELLED" in text
+
+
+def test_update_is_incremental():
+    feed = CalendarFeed(logging.getLogger(__name__))
+    events = {'Boss 1': event(1), 'Boss 2': event(2)}
+    assert feed.update(events, 1)
+    etag = feed.etag
+    # Même version du cache : rien n'est recalculé
+    assert not feed.update(events, 1)
+    # Nouvelle version sans changement de champs : flux inchangé
+    assert not feed.update(dict(events), 2)
+    assert feed.etag == etag
+    events['Boss 2'] = event(2, start_time=START + timedelta(days=1))
+    assert feed.update(events, 3)
+    assert feed.etag != etag
+    del events['Boss 1']
+    assert feed.update(events, 4)
+    assert "UID:1@discord.com" not in unfold(feed.body)
+
+
+def test_conditional_requests():
+    feed = CalendarFeed(logging.getLogger(__name__))
+    feed.update({'Boss': event()}, 1)
+    assert feed.is_fresh({'If-None-Match': f'"other", {feed.etag}'})
+    assert not feed.is_fresh({'If-None-Match': '"other"'})
+    since = format_datetime(feed.last_modified, usegmt=True)
+    assert feed.is_fresh({'If-Modified-Since': since})
+    # If-None-Match est prioritaire sur If-Modified-Since
+    assert not feed.is_fresh({'If-None-Match': '"other"', 'If-Modified-Since': since})
+    assert not feed.is_fresh({'If-Modified-Since': 'pas une date'})
+    assert not feed.is_fresh({})
+    assert feed.headers()['ETag'] == feed.etag
@@ -0,0 +1,120 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+
+from deadline_queue import DeadlineQueue
+
+
+def soon(seconds):
+    return datetime.now(timezone.utc) + timedelta(seconds=seconds)
+
+
+def run(scenario):
+    async def main():
+        queue = DeadlineQueue(logging.getLogger(__name__))
+        queue.start()
+        try:
+            return await scenario(queue)
+        finally:
+            await queue.stop()
+    return asyncio.run(main())
+
+
+def recorder(fired, name):
+    async def callback():
+        fired.append(name)
+    return callback
+
+
+def test_fires_in_deadline_order():
+    async def scenario(queue):
+        fired = []
+        queue.arm('late', soon(0.06), recorder(fired, 'late'))
+        queue.arm('early', soon(0.02), recorder(fired, 'early'))
+        await asyncio.sleep(0.15)
+        return fired, queue.keys()
+    fired, keys = run(scenario)
+    assert fired == ['early', 'late']
+    assert keys == set()
+
+
+def test_rearm_and_cancel():
+    async def scenario(queue):
+        fired = []
+        queue.arm('moved', soon(0.02), recorder(fired, 'first'))
+        # Réarmé plus tard : l'ancienne échéance est ignorée
+        queue.arm('moved', soon(0.08), recorder(fired, 'second'))
+        queue.arm('cancelled', soon(0.02), recorder(fired, 'cancelled'))
+        assert queue.cancel('cancelled')
+        assert not queue.cancel('unknown')
+        await asyncio.sleep(0.05)
+        pending = queue.deadline('moved')
+        await asyncio.sleep(0.08)
+        return fired, pending
+    fired, pending = run(scenario)
+    assert fired == ['second']
+    assert pending is not None
+
+
+def test_earlier_timer_wakes_the_sleeper():
+    async def scenario(queue):
+        fired = []
+        queue.arm('far', soon(60), recorder(fired, 'far'))
+        await asyncio.sleep(0.01)
+        queue.arm('near', soon(0.02), recorder(fired, 'near'))
+        await asyncio.sleep(0.08)
+        return fired, queue.keys()
+    fired, keys = run(scenario)
+    assert fired == ['near']
+    assert keys == {'far'}
+
+
+def test_failing_callback_is_logged_and_queue_keeps_running(caplog):
+    async def failing():
+        raise RuntimeError("boom")
+
+    async def scenario(queue):
+        fired = []
+        queue.arm('failing', soon(0.01), failing)
+        queue.arm('next', soon(0.03), recorder(fired, 'next'))
+        await asyncio.sleep(0.08)
+        return fired, queue.running
+    with caplog.at_level(logging.ERROR):
+        fired, running = run(scenario)
+    assert fired == ['next']
+    assert running
+    assert "Erreur minuteur 'failing': boom" in caplog.text
+
+
+def test_stop_awaits_running_callbacks_and_cancels_late_ones():
+    async def main():
+        queue = DeadlineQueue(logging.getLogger(__name__))
+        queue.start()
+        finished, cancelled = [], []
+
+        async def quick():
+            await asyncio.sleep(0.05)
+            finished.append('quick')
+
+        async def slow():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append('slow')
+                raise
+
+        queue.arm('quick', soon(0.01), quick)
+        queue.arm('slow', soon(0.01), slow)
+        queue.arm('later', soon(0.3), quick)
+        await asyncio.sleep(0.03)
+        running = len(queue._callbacks)
+        await queue.stop(timeout=0.2)
+        await asyncio.sleep(0.4)
+        return running, finished, cancelled, queue._callbacks, queue.running
+    running, finished, cancelled, callbacks, still_running = asyncio.run(main())
+    assert running == 2
+    # Rappel rapide attendu, rappel lent annulé, minuteur non échu jamais déclenché
+    assert finished == ['quick']
+    assert cancelled == ['slow']
+    assert callbacks == set()
+    assert not still_running
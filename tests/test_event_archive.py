@@ -0,0 +1,92 @@
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from event_archive import EventArchive
+
+NOW = datetime(2025, 3, 1, 12, tzinfo=timezone.utc)
+
+
+def event(event_id, name, start):
+    return {'id': event_id, 'name': name, 'start_time': start, 'end_time': None, 'location': "Salle",
+            'description': None, 'status': 'SCHEDULED'}
+
+
+@pytest.fixture
+def archive(tmp_path):
+    return EventArchive(str(tmp_path / "archive.jsonl"), 7, logging.getLogger(__name__), compact_every=1000)
+
+
+def lines(archive):
+    with open(archive.path, encoding='utf-8') as archive_file:
+        return [json.loads(line) for line in archive_file]
+
+
+def test_records_only_changed_fields(archive):
+    boss = event(1, "Boss", NOW)
+    assert archive.record({'Boss': boss}, NOW) == 1
+    assert archive.record({'Boss': boss}, NOW + timedelta(hours=1)) == 0
+    moved = dict(boss, start_time=NOW + timedelta(days=1))
+    assert archive.record({'Boss': moved}, NOW + timedelta(hours=2)) == 1
+    assert archive.record({}, NOW + timedelta(hours=3)) == 1
+    assert [(record['op'], sorted(record['d'])) for record in lines(archive)] == [
+        ('create', sorted(EventArchive.FIELDS)), ('update', ['start_time']), ('delete', []),
+    ]
+    changes = archive.changes(1)
+    assert changes[1][2] == {'start_time': (NOW.isoformat(), (NOW + timedelta(days=1)).isoformat())}
+    assert 1 not in archive.current
+
+
+def test_find_and_changed_since(archive):
+    archive.record({'Boss': event(1, "Boss Élite", NOW)}, NOW)
+    archive.record({'Boss': event(1, "Boss Élite", NOW), 'Siège': event(2, "Siège", NOW)},
+                   NOW + timedelta(days=1))
+    assert archive.find("elite") == [1]
+    assert archive.find("2") == [2]
+    assert archive.find("99") == []
+    assert archive.changed_since(int((NOW + timedelta(hours=1)).timestamp())) == [2]
+
+
+def test_compaction_folds_old_versions_into_snapshots(archive):
+    start = NOW - timedelta(days=30)
+    archive.record({'Boss': event(1, "Boss", start)}, start)
+    archive.record({'Boss': event(1, "Boss renommé", start)}, start + timedelta(days=1))
+    # Supprimé avant la rétention : oublié à la compaction
+    archive.record({'Boss': event(1, "Boss renommé", start), 'Vieux': event(2, "Vieux", start)},
+                   start + timedelta(days=2))
+    archive.record({'Boss': event(1, "Boss renommé", start)}, start + timedelta(days=3))
+    archive.record({'Boss': event(1, "Boss récent", start)}, NOW - timedelta(days=1))
+    assert len(archive) == 5
+
+    archive.compact(NOW)
+    records = lines(archive)
+    assert [(record['id'], record['op']) for record in records] == [(1, 'snapshot'), (1, 'update')]
+    assert records[0]['d']['name'] == "Boss renommé"
+    assert archive.current[1]['name'] == "Boss récent"
+    assert archive.find("vieux") == []
+
+    # L'archive compactée se recharge à l'identique
+    reloaded = EventArchive(archive.path, 7, logging.getLogger(__name__))
+    reloaded.load()
+    assert reloaded.current == archive.current
+    assert len(reloaded) == 2
+
+
+def test_compaction_triggered_by_appended_records(tmp_path):
+    archive = EventArchive(str(tmp_path / "archive.jsonl"), 0, logging.getLogger(__name__), compact_every=3)
+    for day in range(3):
+        archive.record({'Boss': event(1, f"Boss {day}", NOW)}, NOW + timedelta(days=day))
+    # Au troisième ajout, les versions antérieures à la date courante sont repliées
+    assert [record['op'] for record in lines(archive)] == ['snapshot', 'update']
+    assert archive.current[1]['name'] == "Boss 2"
+
+
+def test_load_skips_unreadable_lines(archive):
+    archive.record({'Boss': event(1, "Boss", NOW)}, NOW)
+    with open(archive.path, 'a', encoding='utf-8') as archive_file:
+        archive_file.write("pas du json\n")
+    reloaded = EventArchive(archive.path, 7, logging.getLogger(__name__))
+    reloaded.load()
+    assert list(reloaded.current) == [1]
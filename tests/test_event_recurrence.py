@@ -0,0 +1,123 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from zoneinfo import ZoneInfo
+
+from event_recurrence import OccurrenceCache, iter_occurrences, next_occurrence, rule_from_event
+
+PARIS = ZoneInfo("Europe/Paris")
+UTC = timezone.utc
+
+
+def rule(frequency, **fields):
+    base = {'frequency': frequency, 'interval': 1, 'weekdays': [], 'n_weekdays': [],
+            'months': [], 'month_days': [], 'count': None, 'end': None}
+    base.update(fields)
+    return base
+
+
+def occurrences(start, recurrence, window_start, window_end, tz=None):
+    return list(iter_occurrences(start, recurrence, window_start, window_end, tz))
+
+
+def test_one_off_event_inside_window_only():
+    start = datetime(2025, 3, 1, 20, tzinfo=UTC)
+    assert occurrences(start, None, start - timedelta(days=1), start + timedelta(days=1)) == [start]
+    assert occurrences(start, None, start + timedelta(hours=1), start + timedelta(days=1)) == []
+
+
+def test_weekly_every_other_week():
+    start = datetime(2025, 1, 4, 20, tzinfo=UTC)  # samedi
+    found = occurrences(start, rule('weekly', interval=2), datetime(2025, 1, 1, tzinfo=UTC),
+                        datetime(2025, 2, 1, tzinfo=UTC))
+    assert [moment.day for moment in found] == [4, 18]
+
+
+def test_daily_restricted_to_weekdays():
+    start = datetime(2025, 1, 6, 8, tzinfo=UTC)  # lundi
+    found = occurrences(start, rule('daily', weekdays=[0, 1, 2, 3, 4]), start, start + timedelta(days=14))
+    assert len(found) == 10
+    assert all(moment.weekday() < 5 for moment in found)
+
+
+def test_monthly_nth_weekday():
+    start = datetime(2025, 1, 7, 19, tzinfo=UTC)
+    found = occurrences(start, rule('monthly', n_weekdays=[(-1, 4)]), start, datetime(2025, 4, 1, tzinfo=UTC))
+    # Dernier vendredi de janvier, février et mars
+    assert [moment.date().isoformat() for moment in found] == ['2025-01-31', '2025-02-28', '2025-03-28']
+
+
+def test_count_and_end_bound_the_series():
+    start = datetime(2025, 1, 1, 12, tzinfo=UTC)
+    window_end = datetime(2026, 1, 1, tzinfo=UTC)
+    assert len(occurrences(start, rule('daily', count=3), start, window_end)) == 3
+    # Le décompte part du début de la série, même pour une fenêtre plus tardive
+    assert occurrences(start, rule('daily', count=3), start + timedelta(days=5), window_end) == []
+    ended = occurrences(start, rule('weekly', end=start + timedelta(weeks=2)), start, window_end)
+    assert len(ended) == 3
+
+
+def test_rule_without_dates_stops_at_window_end():
+    start = datetime(2025, 1, 1, 12, tzinfo=UTC)
+    # Un 30 février n'existe jamais : la recherche s'arrête à l'horizon
+    assert next_occurrence(start, rule('yearly', months=[2], month_days=[30]), start) is None
+    # Les mois sans 31 sont sautés (septembre, novembre)
+    sparse = rule('monthly', month_days=[31], interval=2)
+    assert len(occurrences(start, sparse, start, datetime(2025, 12, 31, tzinfo=UTC))) == 4
+
+
+def test_weekly_series_keeps_local_time_across_dst():
+    # Créée l'hiver à 21:00 heure de Paris (20:00 UTC), telle que renvoyée par Discord
+    start = datetime(2025, 1, 4, 20, tzinfo=UTC)
+    window_start = datetime(2025, 7, 1, tzinfo=UTC)
+    summer = occurrences(start, rule('weekly'), window_start, window_start + timedelta(days=7), PARIS)
+    assert len(summer) == 1
+    assert summer[0].tzinfo is UTC
+    assert summer[0].astimezone(PARIS).hour == 21
+    assert summer[0].hour == 19
+    # Sans fuseau local, l'ancrage reste en UTC
+    anchored = occurrences(start, rule('weekly'), window_start, window_start + timedelta(days=7))
+    assert anchored[0].hour == 20
+
+
+def test_daily_series_on_dst_transition_day():
+    start = datetime(2025, 3, 28, 20, tzinfo=UTC)  # 21:00 à Paris
+    found = occurrences(start, rule('daily'), start, start + timedelta(days=4), PARIS)
+    # Le passage à l'heure d'été (30 mars) avance l'occurrence d'une heure en UTC : celle du
+    # 1er avril (19:00 UTC) tombe encore dans la fenêtre
+    assert [moment.astimezone(PARIS).hour for moment in found] == [21] * 5
+    assert found[2] - found[1] == timedelta(hours=23)
+
+
+def test_rule_from_event_reads_raw_payload():
+    event = SimpleNamespace(recurrence_rule={'frequency': 2, 'interval': 1, 'by_weekday': [5]})
+    parsed = rule_from_event(event)
+    assert parsed['frequency'] == 'weekly'
+    assert parsed['weekdays'] == [5]
+    assert rule_from_event(SimpleNamespace(recurrence_rule=None)) is None
+
+
+def test_expand_keeps_series_name():
+    start = datetime(2025, 1, 6, 19, tzinfo=UTC)
+    series = {'id': 1, 'name': 'Boss', 'start_time': start, 'end_time': start + timedelta(hours=1),
+              'recurrence': rule('daily')}
+    single = {'id': 2, 'name': 'Siège', 'start_time': start, 'recurrence': None}
+    cache = OccurrenceCache(PARIS)
+    expanded = cache.expand([series, single], start, start + timedelta(days=3))
+    assert [event['name'] for event in expanded] == ['Boss', 'Boss', 'Boss', 'Siège']
+    assert expanded[1]['start_time'] == start + timedelta(days=1)
+    assert expanded[1]['end_time'] == start + timedelta(days=1, hours=1)
+    assert expanded[1]['series_start_time'] == start
+    assert expanded[3] is single
+
+
+def test_cache_reuses_and_invalidates_entries():
+    start = datetime(2025, 1, 6, 19, tzinfo=UTC)
+    cache = OccurrenceCache(max_entries=2)
+    window = (start, start + timedelta(days=7))
+    first = cache.occurrences(1, start, rule('daily'), *window)
+    assert cache.occurrences(1, start, rule('daily'), *window) is first
+    assert cache.occurrences(1, start, rule('daily', interval=2), *window) is not first
+    cache.occurrences(2, start, rule('daily'), *window)
+    assert len(cache) == 2
+    assert cache.prune([2]) == 1
+    assert len(cache) == 1
@@ -0,0 +1,63 @@
+from event_search import EventSearchIndex, normalize, trigrams
+
+NAMES = ["Boss Samedi", "Boss Dimanche", "Siège du château", "Donjon Party", "Raid Élite"]
+
+
+def index_of(names=NAMES):
+    index = EventSearchIndex()
+    index.sync(names)
+    return index
+
+
+def test_normalize_strips_accents_case_and_punctuation():
+    assert normalize("  Siège — du CHÂTEAU !") == "siege du chateau"
+    assert normalize("") == ""
+
+
+def test_trigrams_are_padded_per_word():
+    assert trigrams("ab") == {"  a", " ab", "ab "}
+    assert trigrams("") == set()
+
+
+def test_exact_name_ranks_first():
+    results = index_of().search("boss samedi")
+    assert results[0] == ("Boss Samedi", 1.0)
+
+
+def test_tolerates_typos_and_accents():
+    assert index_of().search("siege chateu")[0][0] == "Siège du château"
+    assert index_of().search("elite")[0][0] == "Raid Élite"
+
+
+def test_unrelated_query_returns_nothing():
+    assert index_of().search("xyzzy") == []
+    assert index_of().search("!!!") == []
+
+
+def test_shorter_containing_name_ranks_higher_and_limit_applies():
+    results = index_of().search("boss")
+    assert [name for name, _ in results] == ["Boss Samedi", "Boss Dimanche"]
+    assert results[0][1] > results[1][1]
+    assert index_of().search("boss", limit=1) == results[:1]
+
+
+def test_equal_scores_are_sorted_by_name():
+    index = index_of(["Boss Y", "Boss X"])
+    assert [name for name, _ in index.search("boss")] == ["Boss X", "Boss Y"]
+
+
+def test_sync_adds_and_removes_incrementally():
+    index = index_of()
+    assert index.sync(NAMES[1:] + ["Boss Vendredi"]) == (1, 1)
+    assert len(index) == len(NAMES)
+    assert all(name != "Boss Samedi" for name, _ in index.search("boss samedi"))
+    # Les trigrammes orphelins sont retirés de l'index inversé
+    index.sync([])
+    assert len(index) == 0
+    assert not index._postings
+
+
+def test_suggest_lists_names_for_empty_prefix():
+    index = index_of()
+    assert index.suggest("", limit=2) == ["Boss Dimanche", "Boss Samedi"]
+    assert index.suggest("don") == ["Donjon Party"]
@@ -0,0 +1,155 @@
+import asyncio
+import logging
+
+from job_queue import JobQueueClient, JobQueueServer
+
+LOGGER = logging.getLogger(__name__)
+
+
+async def wait_for(condition, timeout=2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "délai dépassé"
+        await asyncio.sleep(0.01)
+
+
+def test_commands_are_served_first_and_keep_a_reserve():
+    async def main():
+        server = JobQueueServer("/unused.sock", LOGGER, max_pending=10)
+        background = [server.submit({'type': 'scheduled_event'}) for _ in range(12)]
+        commands = [server.submit({'type': 'command'}) for _ in range(2)]
+        order = [server._queue.get_nowait()[2]['type'] for _ in range(3)]
+        return background, commands, order, server.stats
+    background, commands, order, stats = asyncio.run(main())
+    # Les travaux de fond s'arrêtent à la réserve des commandes (10 % de la file)
+    assert background == [True] * 9 + [False] * 3
+    assert commands == [True, False]
+    assert order == ['command', 'scheduled_event', 'scheduled_event']
+    assert stats['dropped'] == 4
+
+
+def test_jobs_are_delivered_and_acknowledged(tmp_path):
+    async def main():
+        server = JobQueueServer(str(tmp_path / "jobs.sock"), LOGGER)
+        server.hello = {'guild_id': 42}
+        await server.start()
+        received = []
+
+        async def handler(job):
+            received.append(job)
+
+        client = JobQueueClient(server.path, handler, concurrency=2, logger=LOGGER)
+        task = asyncio.create_task(client.run(lambda: True))
+        try:
+            for number in range(3):
+                server.submit({'type': 'command', 'name': f"cmd{number}"})
+            await wait_for(lambda: server.stats['acked'] == 3)
+        finally:
+            task.cancel()
+            await server.stop()
+        return received, client.stats
+    received, stats = asyncio.run(main())
+    assert received[0] == {'type': 'hello', 'guild_id': 42}
+    assert sorted(job['name'] for job in received[1:]) == ['cmd0', 'cmd1', 'cmd2']
+    assert stats['done'] == 3
+
+
+def test_unacknowledged_jobs_are_requeued_for_another_worker(tmp_path):
+    async def main():
+        server = JobQueueServer(str(tmp_path / "jobs.sock"), LOGGER)
+        await server.start()
+        started, finished = asyncio.Event(), []
+
+        async def stuck(job):
+            if job['type'] != 'hello':
+                started.set()
+                await asyncio.sleep(60)
+
+        async def working(job):
+            if job['type'] != 'hello':
+                finished.append(job['name'])
+
+        first = JobQueueClient(server.path, stuck, concurrency=1, logger=LOGGER)
+        first_task = asyncio.create_task(first.run(lambda: True))
+        try:
+            server.submit({'type': 'command', 'name': 'long'})
+            await asyncio.wait_for(started.wait(), 2)
+            # Worker arrêté avant l'acquittement : le travail revient en file
+            first_task.cancel()
+            await wait_for(lambda: server.stats['requeued'] == 1)
+            second = JobQueueClient(server.path, working, concurrency=1, logger=LOGGER)
+            second_task = asyncio.create_task(second.run(lambda: True))
+            await wait_for(lambda: finished == ['long'])
+            second_task.cancel()
+        finally:
+            await server.stop()
+        return server.stats
+    stats = asyncio.run(main())
+    assert stats['forwarded'] == 1
+    assert stats['acked'] == 1
+
+
+def test_started_at_most_once_job_is_not_replayed(tmp_path):
+    async def main():
+        server = JobQueueServer(str(tmp_path / "jobs.sock"), LOGGER)
+        await server.start()
+        started = asyncio.Event()
+
+        async def stuck(job):
+            if job['type'] != 'hello':
+                started.set()
+                await asyncio.sleep(60)
+
+        worker = JobQueueClient(server.path, stuck, concurrency=1, logger=LOGGER)
+        task = asyncio.create_task(worker.run(lambda: True))
+        try:
+            server.submit({'type': 'command', 'name': 'force_poll', 'at_most_once': True})
+            await asyncio.wait_for(started.wait(), 2)
+            task.cancel()
+            await wait_for(lambda: server.workers == 0)
+        finally:
+            await server.stop()
+        return server.stats, server._queue.qsize()
+    stats, pending = asyncio.run(main())
+    assert stats['lost'] == 1
+    assert stats['requeued'] == 0
+    assert pending == 0
+
+
+class BlockedWriter:
+    """Écriture vers un worker bloquée après le premier travail, puis connexion coupée"""
+
+    def __init__(self):
+        self.lines = []
+        self.cut = asyncio.Event()
+
+    def write(self, data):
+        self.lines.append(data)
+
+    async def drain(self):
+        if len(self.lines) > 1:
+            await self.cut.wait()
+            raise ConnectionResetError
+
+    def close(self):
+        pass
+
+
+def test_jobs_dropped_on_full_queue_are_counted_separately(caplog):
+    async def main():
+        server = JobQueueServer("/unused.sock", LOGGER, max_pending=2)
+        server.submit({'type': 'command', 'name': 'update_links'})
+        writer = BlockedWriter()
+        serving = asyncio.create_task(server._serve_worker(asyncio.StreamReader(), writer))
+        await wait_for(lambda: len(writer.lines) == 2)
+        # File pleine pendant que le worker détient le premier travail
+        assert server.submit({'type': 'command', 'name': 'events'})
+        assert server.submit({'type': 'command', 'name': 'events'})
+        writer.cut.set()
+        await serving
+        return server.stats
+    with caplog.at_level(logging.INFO):
+        stats = asyncio.run(main())
+    assert stats['dropped'] == 1
+    assert stats['requeued'] == 0
+    assert "0 travail(aux) remis en file, 0 commencé(s) non rejoué(s), 1 abandonné(s)" in caplog.text
@@ -0,0 +1,108 @@
+import logging
+import sqlite3
+import time
+
+import pytest
+
+import failover_test
+from leader_lease import LeaderLease
+
+logger = logging.getLogger('test')
+
+
+@pytest.fixture
+def lease_file(tmp_path):
+    return str(tmp_path / 'lease.sqlite3')
+
+
+def test_single_holder(lease_file):
+    first = LeaderLease(lease_file, 'a', 30, logger)
+    second = LeaderLease(lease_file, 'b', 30, logger)
+    assert first.try_acquire()
+    assert not second.try_acquire()
+    # Le renouvellement conserve le jeton
+    assert first.try_acquire() and first.token == 1
+
+
+def test_takeover_bumps_token_and_fences_old_holder(lease_file):
+    first = LeaderLease(lease_file, 'a', 0.2, logger)
+    second = LeaderLease(lease_file, 'b', 30, logger)
+    assert first.try_acquire()
+    time.sleep(0.3)
+    assert second.try_acquire() and second.token == 2
+    # L'ancien détenteur ne peut ni renouveler, ni réserver, ni écrire
+    first._expires_at = time.time() + 30
+    assert not first.validate()
+    assert not first.claim('notification', 'slot')
+    assert not first.try_acquire()
+
+
+def test_claim_once_across_replicas(lease_file):
+    first = LeaderLease(lease_file, 'a', 0.2, logger)
+    assert first.try_acquire()
+    assert first.claim('notification', '2026-10-19T20:30')
+    assert not first.claim('notification', '2026-10-19T20:30')
+    time.sleep(0.3)
+    second = LeaderLease(lease_file, 'b', 30, logger)
+    assert second.try_acquire()
+    assert not second.claim('notification', '2026-10-19T20:30')
+    assert second.claim('notification', '2026-10-20T20:30')
+
+
+def test_unfinished_claim_is_resumed_by_next_leader(lease_file):
+    first = LeaderLease(lease_file, 'a', 0.2, logger)
+    assert first.try_acquire()
+    assert first.claim('notification', 'slot-1')
+    first.complete('notification', 'slot-1')
+    # Arrêt entre la réservation et l'envoi : la réservation reste en attente
+    assert first.claim('notification', 'slot-2')
+    assert first.pending() == []
+    time.sleep(0.3)
+    second = LeaderLease(lease_file, 'b', 30, logger)
+    assert second.try_acquire()
+    assert second.pending() == [('notification', 'slot-2')]
+    # La reprise est explicite : le planificateur seul ne renvoie pas le créneau
+    assert not second.claim('notification', 'slot-2')
+    assert second.claim('notification', 'slot-2', resume=True)
+    assert not second.claim('notification', 'slot-2', resume=True)
+    second.complete('notification', 'slot-2')
+    assert second.pending() == []
+    assert not second.claim('notification', 'slot-2', resume=True)
+
+
+def test_abandoned_claim_is_retried_by_same_leader(lease_file):
+    lease = LeaderLease(lease_file, 'a', 30, logger)
+    assert lease.try_acquire()
+    assert lease.claim('poll_creation', '2026-10-19')
+    lease.abandon('poll_creation', '2026-10-19')
+    assert lease.pending() == [('poll_creation', '2026-10-19')]
+    assert lease.claim('poll_creation', '2026-10-19', resume=True)
+    lease.complete('poll_creation', '2026-10-19')
+    assert lease.pending() == []
+
+
+def test_previous_schema_is_migrated_as_done(lease_file):
+    db = sqlite3.connect(lease_file)
+    db.execute("CREATE TABLE executions (action TEXT PRIMARY KEY, value TEXT, token INTEGER)")
+    db.execute("INSERT INTO executions VALUES ('weekly_update', '2026-10-19', 1)")
+    db.commit()
+    db.close()
+    lease = LeaderLease(lease_file, 'a', 30, logger)
+    assert lease.try_acquire()
+    assert lease.pending() == []
+    assert not lease.claim('weekly_update', '2026-10-19', resume=True)
+
+
+def test_release_hands_over_immediately(lease_file):
+    first = LeaderLease(lease_file, 'a', 30, logger)
+    second = LeaderLease(lease_file, 'b', 30, logger)
+    assert first.try_acquire()
+    first.release()
+    assert not first.is_leader
+    assert second.try_acquire() and second.token == 2
+
+
+@pytest.mark.parametrize('window', ['post', 'claim'])
+@pytest.mark.parametrize('mode', ['kill', 'pause'])
+def test_two_process_failover_posts_each_slot_once(mode, window):
+    assert failover_test.run_scenario(mode, slots=6, interval=1.0, ttl=0.4, verbose=False, window=window)
@@ -0,0 +1,56 @@
+import asyncio
+import logging
+import time
+
+from loop_profiler import EventLoopProfiler
+
+
+def busy(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+async def waiting_coroutine():
+    await asyncio.sleep(1)
+
+
+def test_profile_records_cpu_idle_and_await_stacks(tmp_path):
+    profiler = EventLoopProfiler(str(tmp_path), interval_ms=2, slow_callback_ms=50,
+                                 logger=logging.getLogger(__name__))
+
+    async def main():
+        waiter = asyncio.create_task(waiting_coroutine())
+        profiler.start()
+        await asyncio.sleep(0.1)
+        busy(0.15)
+        await asyncio.sleep(0.1)
+        path = profiler.stop()
+        waiter.cancel()
+        return path
+    path = asyncio.run(main())
+
+    assert not profiler.running
+    with open(path, encoding='utf-8') as profile_file:
+        stacks = dict(line.rsplit(" ", 1) for line in profile_file.read().splitlines())
+    assert 'idle' in stacks
+    assert any(stack.startswith("cpu;") and "busy (test_loop_profiler.py" in stack for stack in stacks)
+    assert any(stack.startswith("await;") and "waiting_coroutine" in stack for stack in stacks)
+    assert profiler.slow_callbacks
+    assert max(duration for duration, _ in profiler.slow_callbacks) >= 0.1
+    summary = profiler.summary()
+    assert any("Callback lent" in line for line in summary)
+
+
+def test_auto_stop_and_idempotent_stop(tmp_path):
+    profiler = EventLoopProfiler(str(tmp_path), interval_ms=5, slow_callback_ms=100,
+                                 logger=logging.getLogger(__name__))
+
+    async def main():
+        profiler.start(duration=0.05)
+        await asyncio.sleep(0.15)
+        return profiler.running, profiler.stop()
+    running, second_stop = asyncio.run(main())
+    assert not running
+    assert second_stop is None
+    assert len(list(tmp_path.glob("profile-*.folded"))) == 1
@@ -0,0 +1,88 @@
+import logging
+
+import pytest
+
+from memory_guard import MemoryGuard
+
+
+@pytest.fixture
+def calls():
+    return []
+
+
+def guard_with(calls, budget_mb=0):
+    return MemoryGuard(budget_mb, logging.getLogger(__name__), lambda: calls.append('trim'),
+                       lambda reason: calls.append(f"shutdown: {reason}"))
+
+
+def test_growth_per_hour_from_history(calls):
+    guard = guard_with(calls)
+    assert guard.growth_per_hour() is None
+    guard.history.append((0.0, 10 * 1024 * 1024, 0))
+    guard.history.append((1800.0, 11 * 1024 * 1024, 0))
+    assert guard.growth_per_hour() == 2 * 1024 * 1024
+
+
+def test_check_records_snapshots_and_top_allocators(calls):
+    guard = guard_with(calls)
+    guard.start()
+    try:
+        guard.check()
+        retained = [bytearray(4096) for _ in range(64)]
+        guard.check()
+    finally:
+        guard.stop()
+    assert len(guard.history) == 2
+    assert guard.version == 2
+    assert any("test_memory_guard.py" in line for line in guard.top_growth)
+    assert "RSS" in guard.describe()
+    assert retained
+
+
+def test_continuous_growth_is_reported(calls, caplog, monkeypatch):
+    guard = guard_with(calls)
+    sizes = iter(range(0, MemoryGuard.HISTORY * 1024, 1024))
+    monkeypatch.setattr(guard, '_snapshot', lambda: FakeSnapshot(next(sizes)))
+    clock = iter(range(0, MemoryGuard.HISTORY * 600, 600))
+    monkeypatch.setattr('memory_guard.time.monotonic', lambda: float(next(clock)))
+    with caplog.at_level(logging.WARNING):
+        for _ in range(MemoryGuard.HISTORY):
+            guard.check()
+    assert "Mémoire en hausse continue" in caplog.text
+
+
+def test_budget_trims_then_requests_shutdown(calls, monkeypatch):
+    guard = guard_with(calls, budget_mb=100)
+    rss = iter([150, 90])
+    monkeypatch.setattr(MemoryGuard, 'rss', staticmethod(lambda: next(rss) * 1024 * 1024))
+    guard.enforce_budget()
+    # Vidage suffisant : pas de redémarrage
+    assert calls == ['trim']
+    assert guard.trims == 1
+
+    rss = iter([150, 120])
+    guard.enforce_budget()
+    assert calls == ['trim', 'trim', 'shutdown: budget mémoire']
+
+
+def test_no_budget_never_trims(calls, monkeypatch):
+    guard = guard_with(calls)
+    monkeypatch.setattr(MemoryGuard, 'rss', staticmethod(lambda: 10 ** 12))
+    guard.enforce_budget()
+    assert calls == []
+
+
+class FakeStat:
+    def __init__(self, size):
+        self.size = size
+
+
+class FakeSnapshot:
+    def __init__(self, size):
+        self.size = size
+
+    def statistics(self, key_type):
+        return [FakeStat(self.size)]
+
+    def compare_to(self, previous, key_type):
+        return []
@@ -0,0 +1,56 @@
+import time
+
+from resilience import CircuitBreaker, RetryPolicy
+
+
+def open_breaker(reset_timeout=0.05):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=reset_timeout)
+    breaker.record_failure()
+    breaker.record_failure()
+    return breaker
+
+
+def test_opens_after_threshold():
+    breaker = open_breaker()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.trips == 1
+    assert not breaker.allow()
+
+
+def test_half_open_lets_exactly_one_probe_through():
+    breaker = open_breaker()
+    time.sleep(0.06)
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    # Les appels concurrents sont refusés tant que l'essai n'a pas de résultat
+    assert not any(breaker.allow() for _ in range(10))
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert all(breaker.allow() for _ in range(10))
+
+
+def test_failed_probe_reopens():
+    breaker = open_breaker()
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.trips == 2
+    assert not breaker.allow()
+    time.sleep(0.06)
+    assert breaker.allow()
+
+
+def test_lost_probe_is_replaced_after_timeout():
+    breaker = open_breaker()
+    time.sleep(0.06)
+    assert breaker.allow()
+    assert not breaker.allow()
+    time.sleep(0.06)
+    assert breaker.allow()
+
+
+def test_backoff_is_bounded():
+    policy = RetryPolicy(max_attempts=4, base_delay=0.5, max_delay=2.0)
+    for attempt in range(10):
+        assert 0 <= policy.backoff(attempt) <= min(2.0, 0.5 * 2 ** attempt)
@@ -0,0 +1,84 @@
+import asyncio
+import json
+import logging
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("aiohttp")
+from aiohttp.test_utils import make_mocked_request
+
+from status_dashboard import StatusDashboard
+
+NOW = datetime(2025, 3, 14, 18, 30, tzinfo=timezone.utc)
+
+
+def fake_bot():
+    state = SimpleNamespace(
+        version=1, kind_states={}, poll_messages={},
+        cached_events={1: {'id': 1, 'name': "Boss <Samedi>", 'start_time': NOW, 'status': 1,
+                           'link': "https://example.org/1"}},
+    )
+    return SimpleNamespace(
+        state=state,
+        resilience=SimpleNamespace(stats={'messages': {'ok': 3, 'failed': 0}}, breakers={},
+                                   is_degraded=lambda: False),
+        shutdown=SimpleNamespace(in_flight=0),
+        attendance=SimpleNamespace(questions={}),
+        deferred_maintenance=[],
+        staged_update=None,
+        get_current_time=lambda: NOW,
+        scheduled_jobs=lambda: [("daily_poll", NOW)],
+    )
+
+
+def get(dashboard, path, headers=None):
+    handler = dashboard._handle_json if path == '/api/snapshot' else dashboard._handle_html
+    return asyncio.run(handler(make_mocked_request('GET', path, headers=headers or {})))
+
+
+def test_snapshot_is_rebuilt_only_when_sources_change():
+    bot = fake_bot()
+    dashboard = StatusDashboard(bot, "127.0.0.1", 0, logging.getLogger(__name__))
+    dashboard.refresh()
+    dashboard.refresh()
+    assert dashboard.version == 1
+    bot.state.version += 1
+    dashboard.refresh()
+    assert dashboard.version == 2
+
+
+def test_json_snapshot_and_escaped_html():
+    dashboard = StatusDashboard(fake_bot(), "127.0.0.1", 0, logging.getLogger(__name__))
+    snapshot = json.loads(get(dashboard, '/api/snapshot').body)
+    assert snapshot['jobs'] == [{'name': "daily_poll", 'next_run': NOW.isoformat()}]
+    assert snapshot['events'][0]['name'] == "Boss <Samedi>"
+    assert snapshot['metrics']['rest'] == {'messages': {'ok': 3, 'failed': 0}}
+    page = get(dashboard, '/').body.decode('utf-8')
+    assert "Boss &lt;Samedi&gt;" in page
+    assert "<Samedi>" not in page
+
+
+def test_matching_etag_returns_not_modified():
+    bot = fake_bot()
+    dashboard = StatusDashboard(bot, "127.0.0.1", 0, logging.getLogger(__name__))
+    response = get(dashboard, '/api/snapshot')
+    etag = response.headers['ETag']
+    assert get(dashboard, '/').headers['ETag'] != etag
+
+    cached = get(dashboard, '/api/snapshot', {'If-None-Match': f'"autre", {etag}'})
+    assert cached.status == 304
+    assert cached.headers['ETag'] == etag
+    # Nouvelles données : l'ancien ETag ne correspond plus
+    bot.state.version += 1
+    bot.state.cached_events.clear()
+    assert get(dashboard, '/api/snapshot', {'If-None-Match': etag}).status == 200
+
+
+def test_trim_releases_snapshot_until_next_request():
+    dashboard = StatusDashboard(fake_bot(), "127.0.0.1", 0, logging.getLogger(__name__))
+    first = get(dashboard, '/api/snapshot').body
+    dashboard.trim()
+    assert dashboard._json_body == b""
+    assert get(dashboard, '/api/snapshot').body.replace(b'"version": 2', b'"version": 1') == first
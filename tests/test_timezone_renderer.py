@@ -0,0 +1,47 @@
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from timezone_renderer import TimezoneRenderer
+
+ZONES = [("heure de Paris", "Europe/Paris"), ("heure du Québec", "America/Toronto")]
+
+
+def test_render_in_every_zone():
+    renderer = TimezoneRenderer(ZONES)
+    instant = datetime(2025, 1, 11, 20, 0, tzinfo=timezone.utc)
+    assert renderer.render(instant) == "21h00 (heure de Paris) - 15h00 (heure du Québec)"
+
+
+@pytest.mark.parametrize("key", ["Europe/Paris", "America/Toronto"])
+def test_offsets_match_zoneinfo_across_a_year(key):
+    renderer = TimezoneRenderer(ZONES)
+    tz = ZoneInfo(key)
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    for hours in range(0, 365 * 24, 7):
+        instant = start + timedelta(hours=hours)
+        assert renderer.offset(tz, instant) == instant.astimezone(tz).utcoffset()
+
+
+@pytest.mark.parametrize("key, day", [("Europe/Paris", 30), ("America/Toronto", 9)])
+def test_transition_located_to_the_minute(key, day):
+    renderer = TimezoneRenderer(ZONES)
+    tz = ZoneInfo(key)
+    # Passage à l'heure d'été 2025 : 30 mars en Europe, 9 mars en Amérique du Nord
+    renderer.offset(tz, datetime(2025, 3, day, tzinfo=timezone.utc))
+    transitions = [entry[0] for entry in renderer._week_offsets.values() if entry[0] is not None]
+    assert len(transitions) == 1
+    assert transitions[0].day == day
+    for minutes in range(-3, 3):
+        instant = transitions[0] + timedelta(minutes=minutes)
+        assert renderer.offset(tz, instant) == instant.astimezone(tz).utcoffset()
+
+
+def test_week_cache_and_trim():
+    renderer = TimezoneRenderer(ZONES)
+    renderer.render(datetime(2025, 6, 1, 12, tzinfo=timezone.utc))
+    renderer.render(datetime(2025, 6, 1, 18, tzinfo=timezone.utc))
+    assert len(renderer._week_offsets) == 2
+    renderer.trim()
+    assert not renderer._week_offsets
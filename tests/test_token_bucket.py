@@ -0,0 +1,50 @@
+import asyncio
+import time
+
+from resilience import TokenBucket
+
+
+def timed_acquires(bucket, count):
+    async def main():
+        started = time.monotonic()
+        for _ in range(count):
+            await bucket.acquire()
+        return time.monotonic() - started
+    return asyncio.run(main())
+
+
+def test_burst_up_to_capacity_is_immediate():
+    assert timed_acquires(TokenBucket(rate=1.0, capacity=5), 5) < 0.05
+
+
+def test_sustained_rate_is_bounded():
+    # Un jeton disponible au départ, puis 50 par seconde : 10 jetons en 0,18 s au moins
+    elapsed = timed_acquires(TokenBucket(rate=50.0), 10)
+    assert 0.17 <= elapsed < 0.5
+
+
+def test_idle_time_refills_without_exceeding_capacity():
+    async def main():
+        bucket = TokenBucket(rate=100.0, capacity=3)
+        for _ in range(3):
+            await bucket.acquire()
+        await asyncio.sleep(0.1)
+        started = time.monotonic()
+        for _ in range(3):
+            await bucket.acquire()
+        burst = time.monotonic() - started
+        # La capacité borne la rafale : le quatrième jeton attend le débit
+        await bucket.acquire()
+        return burst, time.monotonic() - started
+    burst, total = asyncio.run(main())
+    assert burst < 0.02
+    assert total >= 0.009
+
+
+def test_concurrent_consumers_share_the_rate():
+    async def main():
+        bucket = TokenBucket(rate=100.0)
+        started = time.monotonic()
+        await asyncio.gather(*(bucket.acquire() for _ in range(11)))
+        return time.monotonic() - started
+    assert asyncio.run(main()) >= 0.095
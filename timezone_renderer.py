@@ -0,0 +1,73 @@
+"""
+Rendu des horaires multi-fuseaux
+================================
+
+Affiche un instant dans les fuseaux configurés (DISPLAY_TIMEZONES). Les
+décalages UTC sont précalculés par semaine ISO et par fuseau ; une semaine
+qui contient un changement d'heure garde l'instant de la transition, localisé
+à la minute près.
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+
+class TimezoneRenderer:
+    """Rendu d'un horaire dans plusieurs fuseaux, avec décalages UTC précalculés par semaine"""
+    
+    def __init__(self, zones: List[Tuple[str, str]]):
+        self.zones = [(label, ZoneInfo(key)) for label, key in zones]
+        # (fuseau, année ISO, semaine ISO) -> (instant de transition, décalage avant, décalage après)
+        self._week_offsets: Dict[Tuple[str, int, int], Tuple[Optional[datetime], timedelta, timedelta]] = {}
+    
+    @staticmethod
+    def _offset_at(tz: ZoneInfo, instant: datetime) -> timedelta:
+        return instant.astimezone(tz).utcoffset()
+    
+    def _compute_week(self, tz: ZoneInfo, week_start: datetime):
+        """Décalages d'une semaine UTC ; un changement d'heure est localisé à la minute près"""
+        week_end = week_start + timedelta(days=7)
+        before = self._offset_at(tz, week_start)
+        after = self._offset_at(tz, week_end)
+        if before == after:
+            return None, before, before
+        
+        # Recherche dichotomique : low garde l'ancien décalage, high le nouveau
+        low, high = week_start, week_end
+        while high - low > timedelta(minutes=1):
+            middle = low + (high - low) / 2
+            middle = middle.replace(second=0, microsecond=0)
+            if middle <= low:
+                middle = low + timedelta(minutes=1)
+            if self._offset_at(tz, middle) == before:
+                low = middle
+            else:
+                high = middle
+        return high, before, after
+    
+    def trim(self) -> None:
+        """Vide le cache des décalages (recalculés à la demande)"""
+        self._week_offsets.clear()
+    
+    def offset(self, tz: ZoneInfo, instant: datetime) -> timedelta:
+        """Décalage UTC d'un fuseau à un instant donné (cache par semaine)"""
+        utc = instant.astimezone(timezone.utc)
+        iso_year, iso_week, iso_weekday = utc.isocalendar()
+        key = (tz.key, iso_year, iso_week)
+        entry = self._week_offsets.get(key)
+        if entry is None:
+            week_start = (utc - timedelta(days=iso_weekday - 1)).replace(hour=0, minute=0, second=0, microsecond=0)
+            entry = self._week_offsets[key] = self._compute_week(tz, week_start)
+        
+        transition, before, after = entry
+        return before if transition is None or utc < transition else after
+    
+    def render(self, instant: datetime) -> str:
+        """Ex. : 21h00 (heure de Paris) - 15h00 (heure du Québec)"""
+        utc = instant.astimezone(timezone.utc)
+        parts = []
+        for label, tz in self.zones:
+            local = utc + self.offset(tz, utc)
+            parts.append(f"{local.hour}h{local.minute:02d} ({label})")
+        return " - ".join(parts)